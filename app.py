@@ -1,133 +1,261 @@
-from flask import Flask, render_template_string, request, jsonify
-import pandas as pd
+from flask import Flask, Response, render_template_string, request, jsonify, g
+import os
+import threading
+import time
+from datetime import datetime
 import numpy as np
 
-app = Flask(__name__)
+from modele import (
+    CHAMPIONNATS, CHAMPIONNAT_DEFAUT, MOTEURS, MAX_BUTS, MARCHES, MAX_SIMULATIONS_ADAPTATIF,
+    CACHE_DONNEES, generateur_aleatoire, buts_attendus, predire_affiches, predire_et_simuler, lire_affiche,
+    regrouper_affiches, affiches_connues, url_donnees
+)
+from cache_reponses import CacheReponses, cache_reponses_depuis_env
+from donnees_async import ChargeurAsync
+from metriques import METRIQUES, TYPE_CONTENU
+from registre import RegistreModeles
+from ressources import Ressource
+from saison import projeter_saison
+from snapshot import charger_snapshot
 
-CHAMPIONNATS = {
-    'F1': 'Ligue 1 (France)',
-    'E0': 'Premier League (Angleterre)',
-    'SP1': 'LaLiga (Espagne)',
-    'D1': 'Bundesliga (Allemagne)',
-    'I1': 'Serie A (Italie)'
-}
-CHAMPIONNAT_DEFAUT = 'F1'
-MODELES_CHAMPIONNAT = {}
-
-# --- CHARGEMENT DES DONNÉES ---
-def charger_donnees(championnat=CHAMPIONNAT_DEFAUT):
-    if championnat not in CHAMPIONNATS:
-        raise ValueError("Championnat invalide")
-
-    df = pd.read_csv(f'https://www.football-data.co.uk/mmz4281/2526/{championnat}.csv')
-    df = df[['HomeTeam', 'AwayTeam', 'FTHG', 'FTAG']]
-    df.columns = ['home_team', 'away_team', 'home_goals', 'away_goals']
-    
-    df['home_goals_adj'] = df['home_goals'].clip(upper=3.5) 
-    df['away_goals_adj'] = df['away_goals'].clip(upper=3.5)
-    df['match_order'] = range(len(df))
-    
-    return df
+app = Flask(__name__)
 
-def entrainer_modele(df, span=10):
-    """Entraîne le modèle avec EWMA"""
-    avg_h = df['home_goals_adj'].mean()
-    avg_a = df['away_goals_adj'].mean()
-    
-    stats_globales = pd.DataFrame()
-    
-    # DOMICILE
-    for team in df['home_team'].unique():
-        mask = df['home_team'] == team
-        home_data = df[mask].copy().sort_values('match_order')
-        
-        if len(home_data) > 0:
-            att_ewma = home_data['home_goals_adj'].ewm(span=span).mean().iloc[-1]
-            def_ewma = home_data['away_goals_adj'].ewm(span=span).mean().iloc[-1]
-            
-            stats_globales.loc[team, 'attaque_domicile'] = att_ewma
-            stats_globales.loc[team, 'defense_domicile'] = def_ewma
-    
-    # EXTÉRIEUR
-    for team in df['away_team'].unique():
-        mask = df['away_team'] == team
-        away_data = df[mask].copy().sort_values('match_order')
-        
-        if len(away_data) > 0:
-            att_ewma = away_data['away_goals_adj'].ewm(span=span).mean().iloc[-1]
-            def_ewma = away_data['home_goals_adj'].ewm(span=span).mean().iloc[-1]
-            
-            stats_globales.loc[team, 'attaque_exterieur'] = att_ewma
-            stats_globales.loc[team, 'defense_exterieur'] = def_ewma
-    
-    stats_globales = stats_globales.fillna(avg_h)
-    
-    stats_globales['force_att_domicile'] = stats_globales['attaque_domicile'] / avg_h
-    stats_globales['force_att_exterieur'] = stats_globales['attaque_exterieur'] / avg_a
-    stats_globales['faibl_def_domicile'] = stats_globales['defense_domicile'] / avg_a
-    stats_globales['faibl_def_exterieur'] = stats_globales['defense_exterieur'] / avg_h
-    
-    return stats_globales, avg_h, avg_a
-
-def predire_et_simuler(equipe_dom, equipe_ext, stats, avg_h, avg_a, n_simulations=10000):
-    """Prédit le résultat d'un match"""
-    
-    force_att_dom = stats.loc[equipe_dom, 'force_att_domicile']
-    faibl_def_ext = stats.loc[equipe_ext, 'faibl_def_exterieur']
-    buts_projetes_dom = force_att_dom * faibl_def_ext * avg_h
-    
-    force_att_ext = stats.loc[equipe_ext, 'force_att_exterieur']
-    faibl_def_dom = stats.loc[equipe_dom, 'faibl_def_domicile']
-    buts_projetes_ext = force_att_ext * faibl_def_dom * avg_a
-    
-    # Simulation Monte Carlo
-    buts_simules_dom = np.random.poisson(buts_projetes_dom, n_simulations)
-    buts_simules_ext = np.random.poisson(buts_projetes_ext, n_simulations)
-    
-    victoires_dom = np.sum(buts_simules_dom > buts_simules_ext)
-    nuls = np.sum(buts_simules_dom == buts_simules_ext)
-    victoires_ext = np.sum(buts_simules_dom < buts_simules_ext)
-    
-    prob_1 = (victoires_dom / n_simulations) * 100
-    prob_N = (nuls / n_simulations) * 100
-    prob_2 = (victoires_ext / n_simulations) * 100
-    
-    return {
-        'buts_dom': round(buts_projetes_dom, 2),
-        'buts_ext': round(buts_projetes_ext, 2),
-        'prob_1': round(prob_1, 1),
-        'prob_N': round(prob_N, 1),
-        'prob_2': round(prob_2, 1),
-        'cote_1': round(100 / prob_1, 2) if prob_1 > 0 else float('inf'),
-        'cote_N': round(100 / prob_N, 2) if prob_N > 0 else float('inf'),
-        'cote_2': round(100 / prob_2, 2) if prob_2 > 0 else float('inf')
-    }
+MODELES_CHAMPIONNAT = RegistreModeles()
+CACHE_REPONSES = cache_reponses_depuis_env()
+# Une nouvelle version d'un championnat rend ses réponses en cache inutiles
+MODELES_CHAMPIONNAT.abonner(lambda championnat, version: CACHE_REPONSES.invalider(championnat))
+MODELES_CHAMPIONNAT.abonner(lambda championnat, version: METRIQUES.incrementer('foot_publications_total', league=championnat))
+RESSOURCES_PRECALCULEES = {}
+MAX_MATCHS_LOT = 500
+MAX_SIMULATIONS_SAISON = 200000
+CHEMIN_SNAPSHOT = os.getenv('FOOT_SNAPSHOT')
+PRECHAUFFAGE = os.getenv('FOOT_PRECHAUFFAGE', '1') == '1'
+PROCESSUS_ENTRAINEMENT = int(os.getenv('FOOT_PROCESSUS_ENTRAINEMENT', '0'))
+# Secondes entre deux comparaisons du modèle publié avec la copie disque partagée (0 : jamais)
+INTERVALLE_SYNCHRONISATION = float(os.getenv('FOOT_SYNCHRONISATION', '5'))
+# Téléchargements concurrents et publication des modèles hors des threads de requête
+CHARGEUR_ASYNC = ChargeurAsync(MODELES_CHAMPIONNAT, processus=PROCESSUS_ENTRAINEMENT)
+
+def lire_marches(data):
+    """
+    Marchés demandés par le paramètre markets (corps JSON ou URL) : liste ou chaîne séparée
+    par des virgules. Renvoie () si absent, None si un marché est inconnu.
+    """
+    marches = data.get('markets', request.args.get('markets')) if isinstance(data, dict) else request.args.get('markets')
+    if not marches:
+        return ()
+    if isinstance(marches, str):
+        marches = [marche.strip() for marche in marches.split(',') if marche.strip()]
+    if not isinstance(marches, list) or any(marche not in MARCHES for marche in marches):
+        return None
+    return tuple(dict.fromkeys(marches))
+
+def lire_graine(data):
+    """
+    Graine du paramètre seed (corps JSON ou URL) : entier >= 0, None si absente.
+    ValueError si elle est invalide.
+    """
+    graine = data.get('seed', request.args.get('seed')) if isinstance(data, dict) else request.args.get('seed')
+    if graine is None:
+        return None
+    if isinstance(graine, bool) or not isinstance(graine, (int, str)) or not str(graine).isdigit():
+        raise ValueError("Graine invalide (entier positif attendu)")
+    return int(graine)
+
+def lire_precision(data):
+    """
+    Paramètres du Monte Carlo adaptatif : tolerance (erreur standard visée, en points de %),
+    max_simulations et antithetic. Renvoie {} sans tolerance ; ValueError si invalides.
+    """
+    if not isinstance(data, dict) or data.get('tolerance') is None:
+        return {}
+    tolerance = data['tolerance']
+    max_simulations = data.get('max_simulations', MAX_SIMULATIONS_ADAPTATIF)
+    antithetique = data.get('antithetic', True)
+    if isinstance(tolerance, bool) or not isinstance(tolerance, (int, float)) or tolerance <= 0:
+        raise ValueError("tolerance invalide (nombre positif attendu, en points de %)")
+    if isinstance(max_simulations, bool) or not isinstance(max_simulations, int) \
+            or not 2 <= max_simulations <= MAX_SIMULATIONS_ADAPTATIF:
+        raise ValueError(f"max_simulations doit être compris entre 2 et {MAX_SIMULATIONS_ADAPTATIF}")
+    if not isinstance(antithetique, bool):
+        raise ValueError("antithetic doit être un booléen")
+    return {'tolerance': float(tolerance), 'max_simulations': max_simulations, 'antithetique': antithetique}
+
+def ressource_modele(nom, championnat, modele, rendre, type_contenu):
+    """Ressource rendue une seule fois par version du modèle (page d'accueil, /teams)"""
+    entree = RESSOURCES_PRECALCULEES.get((nom, championnat))
+    if entree is None or entree[0] != modele['version']:
+        entree = (modele['version'], Ressource(rendre(), type_contenu))
+        RESSOURCES_PRECALCULEES[(nom, championnat)] = entree
+    return entree[1]
+
+def predire_lot(matchs, n_simulations=10000, engine='montecarlo', max_buts=MAX_BUTS, marches=(), generateur=None,
+                tolerance=None, max_simulations=MAX_SIMULATIONS_ADAPTATIF, antithetique=True):
+    """
+    Prédit une liste d'affiches {league, home_team, away_team} en une passe vectorisée.
+    Les résultats suivent l'ordre d'entrée ; une affiche invalide reçoit {'error': ...}.
+    Avec tolerance (Monte Carlo), chaque affiche s'arrête dès qu'elle atteint la précision demandée.
+    """
+    if engine not in MOTEURS:
+        raise ValueError("Moteur invalide")
+
+    affiches, resultats, par_championnat = regrouper_affiches(matchs)
+
+    # Buts attendus regroupés par championnat (un chargement de modèle chacun)
+    positions, versions, tous_buts_dom, tous_buts_ext, tous_rho = [], [], [], [], []
+    for championnat, indices in par_championnat.items():
+        try:
+            modele = charger_modele_championnat(championnat)
+        except Exception as e:
+            for i in indices:
+                resultats[i] = {**affiches[i], 'error': str(e)}
+            continue
+        forces = modele['forces']
+
+        valides = affiches_connues(affiches, indices, forces, resultats)
+        if not valides:
+            continue
+
+        with METRIQUES.chrono('foot_etape_duree_secondes', etape='lookup'):
+            buts_dom, buts_ext = buts_attendus(
+                forces, modele['avg_home'], modele['avg_away'],
+                [affiches[i]['home_team'] for i in valides],
+                [affiches[i]['away_team'] for i in valides],
+                modele['parametres']['avantage_domicile']
+            )
+        positions.extend(valides)
+        versions.extend([(modele['version'], modele['publie_le'])] * len(valides))
+        tous_buts_dom.append(buts_dom)
+        tous_buts_ext.append(buts_ext)
+        tous_rho.append(np.full(len(valides), modele['rho']))
+
+    if positions:
+        predictions = predire_affiches(
+            np.concatenate(tous_buts_dom), np.concatenate(tous_buts_ext), n_simulations, engine, max_buts,
+            marches, generateur, tolerance, max_simulations, antithetique, np.concatenate(tous_rho)
+        )
+        for k, i in enumerate(positions):
+            resultats[i] = {**affiches[i], **predictions[k]}
+            resultats[i]['version_modele'], resultats[i]['modele_publie_le'] = versions[k]
+    return resultats
 
 def charger_modele_championnat(championnat=CHAMPIONNAT_DEFAUT, force_reload=False):
+    """Version publiée du championnat ; sinon (ou avec force_reload) chargement par la boucle asynchrone"""
     if championnat not in CHAMPIONNATS:
         raise ValueError("Championnat invalide")
 
-    if force_reload or championnat not in MODELES_CHAMPIONNAT:
-        df = charger_donnees(championnat)
-        stats_equipes, avg_home, avg_away = entrainer_modele(df, span=10)
-        equipes = sorted(stats_equipes.index.tolist())
-        MODELES_CHAMPIONNAT[championnat] = {
-            'stats_equipes': stats_equipes,
-            'avg_home': avg_home,
-            'avg_away': avg_away,
-            'equipes': equipes
-        }
-
-    return MODELES_CHAMPIONNAT[championnat]
+    modele = MODELES_CHAMPIONNAT.get(championnat)
+    if modele is None or force_reload:
+        bilan = CHARGEUR_ASYNC.soumettre([championnat], force_reload).result()
+        if 'error' in bilan.get(championnat, {}):
+            raise RuntimeError(bilan[championnat]['error'])
+        modele = MODELES_CHAMPIONNAT.get(championnat)
+    else:
+        synchroniser_championnat(championnat, modele)
+    return modele
+
+DERNIERES_SYNCHRONISATIONS = {}
+
+def synchroniser_championnat(championnat, modele):
+    """
+    Workers gunicorn : un /refresh ne met à jour que le registre du worker qui le reçoit, mais il réécrit
+    la copie du CSV dans le cache disque partagé (FOOT_CACHE_DIR). Au plus une fois par intervalle, la
+    copie disque est comparée au modèle publié ; si elle est plus récente et différente, un rafraîchissement
+    est lancé en arrière-plan (requête conditionnelle, donc un 304) et la requête en cours garde le modèle publié.
+    """
+    maintenant = time.monotonic()
+    if INTERVALLE_SYNCHRONISATION <= 0:
+        return
+    if maintenant - DERNIERES_SYNCHRONISATIONS.get(championnat, -np.inf) < INTERVALLE_SYNCHRONISATION:
+        return
+    DERNIERES_SYNCHRONISATIONS[championnat] = maintenant
+
+    meta = CACHE_DONNEES.metadonnees(url_donnees(championnat))
+    if meta is None or meta['sha256'] == modele['empreinte']:
+        return
+    # Copie plus ancienne que le modèle (snapshot publié au démarrage par exemple) : rien de nouveau
+    if meta['telecharge_le'] < datetime.fromisoformat(modele['publie_le']).timestamp():
+        return
+    CHARGEUR_ASYNC.soumettre([championnat], force_reload=True)
+
+def prechauffer_championnats(championnats=None, force_reload=False):
+    """
+    Télécharge en parallèle (boucle asyncio, pool de connexions) et entraîne les championnats.
+    Avec FOOT_PROCESSUS_ENTRAINEMENT > 0, le premier entraînement passe par un pool de processus.
+    Renvoie {championnat: {'duree': secondes} ou {'error': message}}.
+    """
+    return CHARGEUR_ASYNC.soumettre(championnats, force_reload).result()
 
 # --- CHARGEMENT AU DÉMARRAGE ---
-print(f"⏳ Chargement des données {CHAMPIONNATS[CHAMPIONNAT_DEFAUT]}...")
+if CHEMIN_SNAPSHOT and os.path.exists(CHEMIN_SNAPSHOT):
+    # Modèles pré-entraînés hors ligne (python snapshot.py build) : ni téléchargement ni entraînement
+    print(f"⏳ Chargement du snapshot {CHEMIN_SNAPSHOT}...")
+    for championnat, modele in charger_snapshot(CHEMIN_SNAPSHOT).items():
+        MODELES_CHAMPIONNAT.publier(championnat, modele)
+else:
+    print(f"⏳ Chargement des données {CHAMPIONNATS[CHAMPIONNAT_DEFAUT]}...")
+debut_chargement = time.perf_counter()
 modele_defaut = charger_modele_championnat(CHAMPIONNAT_DEFAUT)
-stats_equipes = modele_defaut['stats_equipes']
 avg_home = modele_defaut['avg_home']
 avg_away = modele_defaut['avg_away']
 equipes = modele_defaut['equipes']
-print("✅ Modèle prêt!")
+print(f"✅ Modèle prêt! ({time.perf_counter() - debut_chargement:.2f}s)")
+
+# Prêt (/ready) quand le préchauffage est terminé ; wsgi.py le fait avant le fork des workers
+PRET = threading.Event()
+
+def prechauffer_puis_marquer_pret():
+    try:
+        prechauffer_championnats()
+    finally:
+        PRET.set()
+
+# Les autres championnats se chargent en arrière-plan pendant que le serveur répond déjà
+if PRECHAUFFAGE:
+    threading.Thread(target=prechauffer_puis_marquer_pret, name='prechauffage', daemon=True).start()
+else:
+    PRET.set()
+
+# --- MÉTRIQUES ---
+# Routes dont le championnat par défaut s'applique quand la requête n'en précise pas
+ROUTES_CHAMPIONNAT = {'/', '/teams', '/refresh', '/matrix', '/predict', '/season'}
+
+def etat_pour_metriques():
+    """Valeurs lues à l'export : compteurs du cache de réponses et versions publiées"""
+    stats = CACHE_REPONSES.statistiques()
+    compteurs = ('hits', 'hits_partages', 'misses', 'evictions', 'expirations', 'invalidations', 'erreurs_partage')
+    return [
+        ('foot_cache_reponses_total', 'counter', "Accès au cache des réponses de /predict par résultat",
+         [({'resultat': nom}, stats[nom]) for nom in compteurs]),
+        ('foot_cache_reponses_entrees', 'gauge', "Entrées du cache local des réponses",
+         [({}, stats['entrees'])]),
+        ('foot_modele_version', 'gauge', "Version publiée du modèle par championnat",
+         [({'league': championnat}, MODELES_CHAMPIONNAT.get(championnat)['version'])
+          for championnat in CHAMPIONNATS if championnat in MODELES_CHAMPIONNAT])
+    ]
+
+if METRIQUES.actif:
+    METRIQUES.collecter(etat_pour_metriques)
+
+    @app.before_request
+    def demarrer_chrono():
+        g.debut_requete = time.perf_counter()
+
+    @app.after_request
+    def mesurer_requete(reponse):
+        debut = g.pop('debut_requete', None)
+        if debut is None:
+            return reponse
+        route = request.url_rule.rule if request.url_rule is not None else 'inconnue'
+        donnees = request.get_json(silent=True) if request.is_json else None
+        championnat = request.args.get('league') or (donnees.get('league') if isinstance(donnees, dict) else None)
+        if championnat is None and route in ROUTES_CHAMPIONNAT:
+            championnat = CHAMPIONNAT_DEFAUT
+        # Étiquettes bornées : un championnat inconnu ne crée pas de nouvelle série
+        championnat = championnat if championnat in CHAMPIONNATS else ''
+        METRIQUES.observer('foot_requete_duree_secondes', time.perf_counter() - debut, route=route, league=championnat)
+        METRIQUES.incrementer('foot_requetes_total', route=route, code=str(reponse.status_code))
+        return reponse
 
 # --- TEMPLATE HTML ---
 HTML_TEMPLATE = """
@@ -636,7 +764,7 @@ HTML_TEMPLATE = """
             <h3>Méthodologie</h3>
             <ul>
                 <li>Data en temps réel depuis football-data.co.uk</li>
-                <li>EWMA (span=10) pour privilégier la forme récente</li>
+                <li>EWMA (span=10 par défaut, réglé par championnat) pour privilégier la forme récente</li>
                 <li>Statistiques domicile/extérieur séparées</li>
                 <li>Simulation Monte Carlo (distribution de Poisson)</li>
             </ul>
@@ -711,7 +839,8 @@ HTML_TEMPLATE = """
                     body: JSON.stringify({
                         league: league,
                         home_team: homeTeam,
-                        away_team: awayTeam
+                        away_team: awayTeam,
+                        tolerance: 0.5
                     })
                 });
                 
@@ -830,18 +959,57 @@ HTML_TEMPLATE = """
 @app.route('/')
 def index():
     modele = charger_modele_championnat(CHAMPIONNAT_DEFAUT)
-    return render_template_string(
-        HTML_TEMPLATE,
-        equipes=modele['equipes'],
-        championnats=CHAMPIONNATS,
-        championnat_defaut=CHAMPIONNAT_DEFAUT
+    page = ressource_modele(
+        'index', CHAMPIONNAT_DEFAUT, modele,
+        lambda: render_template_string(
+            HTML_TEMPLATE,
+            equipes=modele['equipes'],
+            championnats=CHAMPIONNATS,
+            championnat_defaut=CHAMPIONNAT_DEFAUT
+        ),
+        'text/html; charset=utf-8'
     )
+    return page.servir(request)
 
 @app.route('/teams')
 def teams():
     try:
         championnat = request.args.get('league', CHAMPIONNAT_DEFAUT)
         modele = charger_modele_championnat(championnat)
+        liste = ressource_modele(
+            'teams', championnat, modele,
+            lambda: app.json.dumps({
+                'league': championnat,
+                'league_name': CHAMPIONNATS[championnat],
+                'equipes': list(modele['equipes'])
+            }),
+            'application/json'
+        )
+        return liste.servir(request)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/health')
+def health():
+    return jsonify({'status': 'ok'})
+
+@app.route('/ready')
+def ready():
+    charges = [championnat for championnat in CHAMPIONNATS if championnat in MODELES_CHAMPIONNAT]
+    if not PRET.is_set():
+        return jsonify({'status': 'warming_up', 'leagues': charges}), 503
+    return jsonify({'status': 'ready', 'leagues': charges})
+
+@app.route('/refresh')
+async def refresh():
+    try:
+        championnat = request.args.get('league', CHAMPIONNAT_DEFAUT)
+        if championnat not in CHAMPIONNATS:
+            raise ValueError("Championnat invalide")
+        bilan = await CHARGEUR_ASYNC.charger([championnat], force_reload=True)
+        if 'error' in bilan[championnat]:
+            raise RuntimeError(bilan[championnat]['error'])
+        modele = MODELES_CHAMPIONNAT.get(championnat)
         return jsonify({
             'league': championnat,
             'league_name': CHAMPIONNATS[championnat],
@@ -850,15 +1018,40 @@ def teams():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
-@app.route('/refresh')
-def refresh():
+@app.route('/refresh_all')
+async def refresh_all():
+    try:
+        bilan = await CHARGEUR_ASYNC.charger(force_reload=True)
+        return jsonify({
+            championnat: {'league_name': CHAMPIONNATS[championnat], **resultat}
+            for championnat, resultat in bilan.items()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/matrix')
+def matrix():
     try:
         championnat = request.args.get('league', CHAMPIONNAT_DEFAUT)
-        modele = charger_modele_championnat(championnat, force_reload=True)
+        modele = charger_modele_championnat(championnat)
+        matrice = modele['matrice']
+
+        def tableau(valeurs, decimales):
+            # NaN (diagonale) -> null, inf (probabilité nulle) -> Infinity comme dans /predict
+            return [[None if np.isnan(v) else round(float(v), decimales) for v in ligne] for ligne in valeurs]
+
         return jsonify({
             'league': championnat,
             'league_name': CHAMPIONNATS[championnat],
-            'equipes': modele['equipes']
+            'equipes': modele['equipes'],
+            'buts_dom': tableau(matrice['buts_dom'], 2),
+            'buts_ext': tableau(matrice['buts_ext'], 2),
+            'prob_1': tableau(matrice['prob_1'], 1),
+            'prob_N': tableau(matrice['prob_N'], 1),
+            'prob_2': tableau(matrice['prob_2'], 1),
+            'cote_1': tableau(matrice['cote_1'], 2),
+            'cote_N': tableau(matrice['cote_N'], 2),
+            'cote_2': tableau(matrice['cote_2'], 2)
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -870,12 +1063,26 @@ def predict():
         championnat = data.get('league', CHAMPIONNAT_DEFAUT)
         home_team = data.get('home_team')
         away_team = data.get('away_team')
+        engine = data.get('engine', 'montecarlo')
+        marches = lire_marches(data)
 
         if championnat not in CHAMPIONNATS:
             return jsonify({'error': 'Championnat invalide'}), 400
 
+        if engine not in MOTEURS:
+            return jsonify({'error': 'Moteur invalide'}), 400
+
+        if marches is None:
+            return jsonify({'error': f"Marché invalide (choix : {', '.join(MARCHES)})"}), 400
+
+        try:
+            graine = lire_graine(data)
+            precision = lire_precision(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         modele = charger_modele_championnat(championnat)
-        stats_equipes = modele['stats_equipes']
+        forces = modele['forces']
         avg_home = modele['avg_home']
         avg_away = modele['avg_away']
         
@@ -885,21 +1092,142 @@ def predict():
         if home_team == away_team:
             return jsonify({'error': 'Les deux équipes doivent être différentes'}), 400
         
-        if home_team not in stats_equipes.index:
+        if home_team not in forces:
             return jsonify({'error': f"L'équipe '{home_team}' n'existe pas"}), 400
         
-        if away_team not in stats_equipes.index:
+        if away_team not in forces:
             return jsonify({'error': f"L'équipe '{away_team}' n'existe pas"}), 400
         
-        resultats = predire_et_simuler(home_team, away_team, stats_equipes, avg_home, avg_away)
-        return jsonify(resultats)
+        # Clé indépendante du worker : empreinte des données et paramètres plutôt que le numéro de version local
+        parametres = modele['parametres']
+        cle = CacheReponses.cle(
+            championnat, modele['empreinte'], [parametres['span'], parametres['plafond'], parametres['avantage_domicile'], parametres['type_modele']],
+            home_team, away_team, engine, 10000, graine, list(marches), precision
+        )
+        resultats = CACHE_REPONSES.obtenir(cle)
+        statut_cache = 'HIT' if resultats is not None else 'MISS'
+        if resultats is None:
+            if engine == 'exact':
+                # Affiche déjà calculée au chargement du modèle
+                with METRIQUES.chrono('foot_etape_duree_secondes', etape='lookup'):
+                    resultats = lire_affiche(modele['matrice'], home_team, away_team, marches)
+            else:
+                resultats = predire_et_simuler(
+                    home_team, away_team, forces, avg_home, avg_away, engine=engine,
+                    avantage_domicile=parametres['avantage_domicile'], marches=marches,
+                    generateur=generateur_aleatoire(graine), rho=modele['rho'], **precision
+                )
+            if graine is not None:
+                resultats['seed'] = graine
+            CACHE_REPONSES.stocker(cle, resultats)
+        resultats['version_modele'] = modele['version']
+        resultats['modele_publie_le'] = modele['publie_le']
+        with METRIQUES.chrono('foot_etape_duree_secondes', etape='serialize'):
+            reponse = jsonify(resultats)
+        reponse.headers['X-Cache'] = statut_cache
+        return reponse
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/cache_stats')
+def cache_stats():
+    return jsonify(CACHE_REPONSES.statistiques())
+
+@app.route('/metrics')
+def metrics():
+    if not METRIQUES.actif:
+        return jsonify({'error': 'Métriques désactivées (FOOT_METRIQUES=0)'}), 404
+    return Response(METRIQUES.exporter(), content_type=TYPE_CONTENU)
+
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    try:
+        data = request.json
+        if isinstance(data, list):
+            data = {'matches': data}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Liste de matchs manquante'}), 400
+        matchs = data.get('matches')
+        engine = data.get('engine', 'montecarlo')
+        marches = lire_marches(data)
+
+        if not isinstance(matchs, list):
+            return jsonify({'error': 'Liste de matchs manquante'}), 400
+
+        if len(matchs) > MAX_MATCHS_LOT:
+            return jsonify({'error': f'Trop de matchs (maximum {MAX_MATCHS_LOT})'}), 400
+
+        if engine not in MOTEURS:
+            return jsonify({'error': 'Moteur invalide'}), 400
+
+        if marches is None:
+            return jsonify({'error': f"Marché invalide (choix : {', '.join(MARCHES)})"}), 400
+
+        try:
+            graine = lire_graine(data)
+            precision = lire_precision(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Une graine rend tout le lot reproductible : un seul flux pour l'unique tirage vectorisé
+        resultats = predire_lot(
+            matchs, engine=engine, marches=marches, generateur=generateur_aleatoire(graine), **precision
+        )
+        with METRIQUES.chrono('foot_etape_duree_secondes', etape='serialize'):
+            return jsonify(resultats)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/season', methods=['GET', 'POST'])
+def season():
+    try:
+        data = (request.get_json(silent=True) or {}) if request.method == 'POST' else {}
+        championnat = data.get('league', request.args.get('league', CHAMPIONNAT_DEFAUT))
+        n_simulations = int(data.get('n', request.args.get('n', 10000)))
+        calendrier = data.get('fixtures')
+        graine = lire_graine(data)
+
+        if championnat not in CHAMPIONNATS:
+            return jsonify({'error': 'Championnat invalide'}), 400
+
+        if not 1 <= n_simulations <= MAX_SIMULATIONS_SAISON:
+            return jsonify({'error': f'n doit être compris entre 1 et {MAX_SIMULATIONS_SAISON}'}), 400
+
+        # Calendrier optionnel (POST) : liste d'affiches {home_team, away_team} ; sinon matchs aller-retour non joués
+        if calendrier is not None:
+            if not isinstance(calendrier, list) or not all(isinstance(m, dict) for m in calendrier):
+                return jsonify({'error': 'Calendrier invalide'}), 400
+            calendrier = [(m.get('home_team'), m.get('away_team')) for m in calendrier]
+            if not all(isinstance(dom, str) and isinstance(ext, str) and dom and dom != ext for dom, ext in calendrier):
+                return jsonify({'error': 'Calendrier invalide (deux équipes différentes par affiche)'}), 400
+
+        # Classement des matchs du modèle publié : ni téléchargement sur le thread de requête,
+        # ni décalage entre classement actuel et forces
+        modele = charger_modele_championnat(championnat)
+        if modele.get('classement') is None:
+            return jsonify({'error': "Classement indisponible pour ce modèle (snapshot à reconstruire)"}), 503
+        projection = projeter_saison(
+            modele['classement'], modele['forces'], modele['avg_home'], modele['avg_away'], championnat, n_simulations,
+            calendrier, modele['parametres']['avantage_domicile'], generateur_aleatoire(graine), modele['rho']
+        )
+        return jsonify({
+            'league': championnat,
+            'league_name': CHAMPIONNATS[championnat],
+            'n_simulations': n_simulations,
+            **({'seed': graine} if graine is not None else {}),
+            **projection,
+            'version_modele': modele['version'],
+            'modele_publie_le': modele['publie_le']
+        })
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 if __name__ == '__main__':
-    import os
-    
     # Déterminer le port et l'host
     port = int(os.getenv('PORT', 7860))  # HF Spaces utilise le port 7860
     host = '0.0.0.0'  # Écouter sur toutes les interfaces
@@ -0,0 +1,212 @@
+"""
+Backtest walk-forward du modèle EWMA.
+
+La saison est rejouée dans l'ordre match_order : avant chaque match, les buts attendus ne dépendent
+que des matchs précédents. L'état EWMA est mis à jour de façon incrémentale, une journée à la fois
+(aucune équipe ne joue deux fois dans une journée, la mise à jour est donc vectorisée), au lieu de
+réentraîner le modèle avant chaque match. Les probabilités 1/N/2 viennent du moteur exact et sont
+évaluées par log-loss, score de Brier et RPS (ranked probability score).
+
+Un match n'est noté que si chaque équipe a déjà joué --warmup matchs dans son rôle (domicile pour
+l'équipe qui reçoit, extérieur pour l'autre) : sans historique, l'EWMA d'une équipe tient à un ou deux
+scores et donne des probabilités proches de 0 % qui ne disent rien du modèle.
+
+Avec --seasons, l'historique de plusieurs saisons (historique.py) est rejoué d'un bloc, l'état
+EWMA continuant d'une saison à l'autre.
+
+Usage :
+    python backtest.py [--leagues F1 E0] [--span 10] [--warmup 5] [--details resultats.csv]
+                       [--seasons 2005-2025] [--store historique]
+"""
+import argparse
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from historique import DOSSIER_MAGASIN, charger_historique, plage_saisons
+from modele import CHAMPIONNATS, charger_donnees, simuler_1n2
+
+# Matchs déjà joués par chaque équipe dans son rôle avant qu'un match compte dans les scores
+ECHAUFFEMENT_DEFAUT = 5
+
+def tableaux_matchs(df):
+    """Matchs joués sous forme de tableaux NumPy (codes d'équipes, buts bruts), triés par match_order"""
+    df = df.dropna(subset=['home_team', 'away_team']).sort_values('match_order', kind='stable')
+    codes, equipes = pd.factorize(pd.concat([df['home_team'], df['away_team']], ignore_index=True))
+    n = len(df)
+    return {
+        'equipes': pd.Index(equipes),
+        'dom': codes[:n].astype(np.int32),
+        'ext': codes[n:].astype(np.int32),
+        'buts_dom': df['home_goals'].to_numpy(dtype=float),
+        'buts_ext': df['away_goals'].to_numpy(dtype=float),
+        'match_order': df['match_order'].to_numpy()
+    }
+
+def _journees(dom, ext):
+    """Découpe les matchs en tranches consécutives où aucune équipe n'apparaît deux fois"""
+    bornes = [0]
+    vues = set()
+    for i, (h, a) in enumerate(zip(dom.tolist(), ext.tolist())):
+        if h in vues or a in vues:
+            bornes.append(i)
+            vues = set()
+        vues.add(h)
+        vues.add(a)
+    bornes.append(len(dom))
+    return list(zip(bornes[:-1], bornes[1:]))
+
+def matchs_notes(dom, ext, echauffement=ECHAUFFEMENT_DEFAUT):
+    """
+    Masque des matchs notés : l'équipe à domicile a déjà reçu `echauffement` fois et l'équipe
+    à l'extérieur a déjà joué `echauffement` fois dehors.
+    """
+    def anterieurs(codes):
+        # Rang de chaque match dans la série de son équipe (matchs triés par match_order)
+        tri = np.argsort(codes, kind='stable')
+        effectifs = np.bincount(codes)
+        rang = np.empty(len(codes), dtype=np.int64)
+        rang[tri] = np.arange(len(codes)) - np.repeat(np.cumsum(effectifs) - effectifs, effectifs)
+        return rang
+
+    return (anterieurs(dom) >= echauffement) & (anterieurs(ext) >= echauffement)
+
+def _moyenne_anterieure(x):
+    """Moyenne de x sur les lignes strictement antérieures (NaN ignorés), pour chaque ligne"""
+    present = ~np.isnan(x)
+    somme = np.concatenate([[0.0], np.cumsum(np.where(present, x, 0.0))[:-1]])
+    effectif = np.concatenate([[0], np.cumsum(present)[:-1]])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return somme / effectif
+
+def rejouer(dom, ext, buts_dom, buts_ext, n_equipes, span=10, plafond=3.5, avantage_domicile=1.0):
+    """
+    Buts attendus (domicile, extérieur) de chaque match, calculés avant le match à partir des
+    seuls matchs précédents. Identique à entrainer_modele sur df.iloc[:i] pour chaque ligne i,
+    aux arrondis près. NaN pour les matchs sans historique (premier match).
+    """
+    adj_dom = np.minimum(buts_dom, plafond)
+    adj_ext = np.minimum(buts_ext, plafond)
+    avg_h = _moyenne_anterieure(adj_dom)
+    avg_a = _moyenne_anterieure(adj_ext)
+
+    # État EWMA [attaque, défense] par équipe : somme pondérée et poids de normalisation
+    decroissance = 1 - 2 / (span + 1)
+    somme_dom = np.zeros((n_equipes, 2))
+    norme_dom = np.zeros((n_equipes, 2))
+    somme_ext = np.zeros((n_equipes, 2))
+    norme_ext = np.zeros((n_equipes, 2))
+    x_dom = np.column_stack([adj_dom, adj_ext])
+    x_ext = np.column_stack([adj_ext, adj_dom])
+
+    # Colonnes : attaque_domicile, defense_domicile (équipe dom.), attaque_exterieur, defense_exterieur (équipe ext.)
+    ewma = np.empty((len(dom), 4))
+    for debut, fin in _journees(dom, ext):
+        h = dom[debut:fin]
+        a = ext[debut:fin]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ewma[debut:fin, :2] = somme_dom[h] / norme_dom[h]
+            ewma[debut:fin, 2:] = somme_ext[a] / norme_ext[a]
+
+        present = ~np.isnan(x_dom[debut:fin])
+        somme_dom[h] = somme_dom[h] * decroissance + np.where(present, x_dom[debut:fin], 0.0)
+        norme_dom[h] = norme_dom[h] * decroissance + present
+        present = ~np.isnan(x_ext[debut:fin])
+        somme_ext[a] = somme_ext[a] * decroissance + np.where(present, x_ext[debut:fin], 0.0)
+        norme_ext[a] = norme_ext[a] * decroissance + present
+
+    # Équipe sans match dans ce rôle : moyenne domicile, comme entrainer_modele
+    ewma = np.where(np.isnan(ewma), avg_h[:, None], ewma)
+    attaque_domicile, defense_domicile, attaque_exterieur, defense_exterieur = ewma.T
+
+    # Début de saison sans but marqué (moyenne nulle) : pas de prédiction possible, NaN
+    with np.errstate(invalid='ignore', divide='ignore'):
+        buts_attendus_dom = (attaque_domicile / avg_h) * (defense_exterieur / avg_h) * avg_h * avantage_domicile
+        buts_attendus_ext = (attaque_exterieur / avg_a) * (defense_domicile / avg_a) * avg_a
+    return buts_attendus_dom, buts_attendus_ext
+
+def scores(probabilites, buts_dom, buts_ext):
+    """
+    Log-loss, Brier et RPS moyens de probabilités (n, 3) en fractions, ordre 1/N/2.
+    Les matchs sans score ou sans prédiction sont ignorés.
+    """
+    valide = ~(np.isnan(buts_dom) | np.isnan(buts_ext) | np.isnan(probabilites).any(axis=1))
+    p = probabilites[valide]
+    issue = np.where(buts_dom[valide] > buts_ext[valide], 0, np.where(buts_dom[valide] == buts_ext[valide], 1, 2))
+    observe = np.eye(3)[issue]
+
+    # RPS : écart des probabilités cumulées, les issues 1 < N < 2 étant ordonnées
+    ecart_cumule = np.cumsum(p, axis=1)[:, :2] - np.cumsum(observe, axis=1)[:, :2]
+    return {
+        'n_matchs': int(valide.sum()),
+        'log_loss': float(-np.mean(np.log(np.clip(p[np.arange(len(p)), issue], 1e-15, 1)))) if len(p) else float('nan'),
+        'brier': float(np.mean(np.sum((p - observe) ** 2, axis=1))) if len(p) else float('nan'),
+        'rps': float(np.mean(np.sum(ecart_cumule ** 2, axis=1) / 2)) if len(p) else float('nan')
+    }
+
+def backtester(df, span=10, plafond=3.5, avantage_domicile=1.0, echauffement=ECHAUFFEMENT_DEFAUT):
+    """
+    Rejoue une saison (DataFrame de charger_donnees) et renvoie (details, scores) : une ligne
+    par match avec buts attendus et probabilités (%) avant le match, et les scores globaux des
+    matchs dont les deux équipes ont `echauffement` matchs d'historique (matchs_notes).
+    """
+    t = tableaux_matchs(df)
+    buts_dom, buts_ext = rejouer(
+        t['dom'], t['ext'], t['buts_dom'], t['buts_ext'], len(t['equipes']), span, plafond, avantage_domicile
+    )
+
+    probabilites = np.full((len(buts_dom), 3), np.nan)
+    predit = np.isfinite(buts_dom) & np.isfinite(buts_ext)
+    if predit.any():
+        prob_1, prob_N, prob_2, _ = simuler_1n2(buts_dom[predit], buts_ext[predit], engine='exact')
+        probabilites[predit] = np.column_stack([prob_1, prob_N, prob_2]) / 100
+
+    details = pd.DataFrame({
+        'match_order': t['match_order'],
+        'home_team': t['equipes'][t['dom']],
+        'away_team': t['equipes'][t['ext']],
+        'home_goals': t['buts_dom'],
+        'away_goals': t['buts_ext'],
+        'buts_dom': buts_dom,
+        'buts_ext': buts_ext,
+        'prob_1': probabilites[:, 0] * 100,
+        'prob_N': probabilites[:, 1] * 100,
+        'prob_2': probabilites[:, 2] * 100
+    })
+    notes = matchs_notes(t['dom'], t['ext'], echauffement)
+    return details, scores(probabilites[notes], t['buts_dom'][notes], t['buts_ext'][notes])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest walk-forward du modèle EWMA")
+    parser.add_argument('--leagues', nargs='+', choices=list(CHAMPIONNATS), help="Championnats (défaut : tous)")
+    parser.add_argument('--span', type=int, default=10)
+    parser.add_argument('--cap', type=float, default=3.5, help="Plafond de buts")
+    parser.add_argument('--home-advantage', type=float, default=1.0)
+    parser.add_argument('--warmup', type=int, default=ECHAUFFEMENT_DEFAUT,
+                        help="Matchs déjà joués par chaque équipe dans son rôle avant qu'un match soit noté")
+    parser.add_argument('--details', help="Écrit les prédictions match par match dans ce CSV")
+    parser.add_argument('--seasons', type=plage_saisons, help="Saisons rejouées (années de début : 2005-2025)")
+    parser.add_argument('--store', default=DOSSIER_MAGASIN, help="Magasin de l'historique, lu s'il contient ces saisons")
+    args = parser.parse_args(argv)
+
+    tous_details = []
+    for championnat in args.leagues or CHAMPIONNATS:
+        if args.seasons:
+            df = charger_historique(championnat, args.seasons, args.store)
+        else:
+            df = charger_donnees(championnat)
+        debut = time.perf_counter()
+        details, resultat = backtester(df, args.span, args.cap, args.home_advantage, args.warmup)
+        duree = time.perf_counter() - debut
+        print(f"{CHAMPIONNATS[championnat]:<30} {resultat['n_matchs']:>5} matchs  "
+              f"log-loss {resultat['log_loss']:.4f}  Brier {resultat['brier']:.4f}  "
+              f"RPS {resultat['rps']:.4f}  ({duree * 1000:.1f} ms)")
+        tous_details.append(details.assign(league=championnat))
+
+    if args.details:
+        pd.concat(tous_details, ignore_index=True).to_csv(args.details, index=False)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+Banc d'essai hors ligne : entraînement, simulation et endpoints HTTP.
+
+Les championnats sont synthétiques (calendrier aller-retour par la méthode du cercle, buts de
+Poisson) et écrits au format football-data dans un dossier temporaire lu via FOOT_DOSSIER_DONNEES :
+aucun accès réseau. Les modules du projet sont importés après cette configuration.
+
+- entrainement : lecture du CSV (preparer_donnees) et entrainer_modele, selon le nombre d'équipes
+  et de journées ;
+- simulation : predire_et_simuler selon n_simulations (et le moteur exact) ;
+- http : /predict et /predict_batch par le client de test Flask, cache des réponses désactivé.
+
+Chaque mesure donne la médiane et le minimum en millisecondes. Les résultats sont écrits en JSON ;
+avec --baseline, les médianes sont comparées à un fichier de référence et le code de sortie vaut 1
+si l'une d'elles dépasse la référence de plus du seuil.
+
+La référence versionnée (benchmark_reference.json) est une exécution complète sur la machine décrite
+dans son bloc environnement ; --baseline sans valeur la lit. Les durées absolues dépendent de la
+machine : si l'environnement diffère, un avertissement est affiché, et mieux vaut produire sa propre
+référence sur la même machine avant la modification à mesurer (--output reference.json).
+
+Usage :
+    python benchmark.py [--quick] [--only entrainement simulation http] [--output benchmark.json]
+                        [--baseline [reference.json]] [--threshold 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+SECTIONS = ('entrainement', 'simulation', 'http')
+EQUIPES_DEFAUT = (20, 100, 1000)
+JOURNEES_DEFAUT = (10, 38)
+SIMULATIONS_DEFAUT = (1000, 10000, 100000, 1000000)
+TAILLE_LOT = 50
+# Référence versionnée, produite par : python benchmark.py --output benchmark_reference.json
+REFERENCE_DEFAUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_reference.json')
+# Champs de l'environnement qui rendent deux mesures comparables
+CHAMPS_ENVIRONNEMENT = ('python', 'numpy', 'pandas', 'plateforme', 'processeurs')
+
+def ligue_synthetique(n_equipes, journees=38, graine=0, code='SYN'):
+    """
+    CSV (octets, format football-data) d'un championnat synthétique : journées aller-retour par la
+    méthode du cercle, buts tirés selon des forces d'équipes aléatoires. n_equipes est arrondi au pair.
+    """
+    generateur = np.random.default_rng(graine)
+    n_equipes += n_equipes % 2
+    force = generateur.normal(0, 0.3, n_equipes)
+    tour = n_equipes - 1
+
+    dom, ext, dates = [], [], []
+    for journee in range(journees):
+        ordre = np.concatenate(([0], np.roll(np.arange(1, n_equipes), journee % tour)))
+        h, a = ordre[:n_equipes // 2], ordre[::-1][:n_equipes // 2]
+        # Matchs retour inversés, et alternance domicile / extérieur d'une journée à l'autre
+        if (journee // tour + journee) % 2:
+            h, a = a, h
+        dom.append(h)
+        ext.append(a)
+        dates.append(np.full(len(h), np.datetime64('2025-08-15') + np.timedelta64(7 * journee, 'D')))
+    dom, ext, dates = np.concatenate(dom), np.concatenate(ext), np.concatenate(dates)
+
+    buts_dom = generateur.poisson(np.exp(0.35 + force[dom] - 0.8 * force[ext]))
+    buts_ext = generateur.poisson(np.exp(0.1 + force[ext] - 0.8 * force[dom]))
+    noms = np.array([f'{code}_{i:04d}' for i in range(n_equipes)])
+    df = pd.DataFrame({
+        'Div': code,
+        'Date': pd.to_datetime(dates).strftime('%d/%m/%Y'),
+        'HomeTeam': noms[dom],
+        'AwayTeam': noms[ext],
+        'FTHG': buts_dom,
+        'FTAG': buts_ext,
+        'FTR': np.where(buts_dom > buts_ext, 'H', np.where(buts_dom == buts_ext, 'D', 'A'))
+    })
+    return df.to_csv(index=False).encode('utf-8')
+
+def chronometrer(fonction, repetitions=5, duree_min=0.2, repetitions_max=1000):
+    """Médiane et minimum (ms) de fonction() après un appel d'échauffement, sur au moins duree_min secondes"""
+    fonction()
+    durees = []
+    while len(durees) < repetitions or (sum(durees) < duree_min and len(durees) < repetitions_max):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return {
+        'median_ms': round(statistics.median(durees) * 1000, 4),
+        'min_ms': round(min(durees) * 1000, 4),
+        'repetitions': len(durees)
+    }
+
+def preparer_environnement(dossier):
+    """Données synthétiques locales, cache et configuration isolés : à appeler avant d'importer le projet"""
+    os.environ.update({
+        'FOOT_DOSSIER_DONNEES': os.path.join(dossier, 'csv'),
+        'FOOT_CACHE_DIR': os.path.join(dossier, 'cache'),
+        'FOOT_CONFIG_MODELES': os.path.join(dossier, 'config_modeles.json'),
+        'FOOT_PRECHAUFFAGE': '0',
+        'FOOT_CACHE_REPONSES_TAILLE': '0',
+        'FOOT_HORS_LIGNE': '0'
+    })
+    for variable in ('FOOT_SNAPSHOT', 'FOOT_CACHE_PARTAGE'):
+        os.environ.pop(variable, None)
+    os.makedirs(os.environ['FOOT_DOSSIER_DONNEES'], exist_ok=True)
+
+    from modele import CHAMPIONNATS
+    for graine, championnat in enumerate(CHAMPIONNATS):
+        chemin = os.path.join(os.environ['FOOT_DOSSIER_DONNEES'], f'{championnat}.csv')
+        with open(chemin, 'wb') as f:
+            f.write(ligue_synthetique(20, 38, graine, championnat))
+
+def bench_entrainement(tailles, journees, repetitions):
+    from modele import preparer_donnees, entrainer_modele
+
+    resultats = {}
+    for n_equipes in tailles:
+        for n_journees in journees:
+            contenu = ligue_synthetique(n_equipes, n_journees)
+            df = preparer_donnees(contenu)
+            nom = f'equipes={n_equipes},journees={n_journees}'
+            resultats[f'entrainement/lecture/{nom}'] = {
+                'matchs': len(df), **chronometrer(lambda: preparer_donnees(contenu), repetitions)
+            }
+            resultats[f'entrainement/ewma/{nom}'] = {
+                'matchs': len(df), **chronometrer(lambda: entrainer_modele(df), repetitions)
+            }
+            print(f"🏋️ {nom} ({len(df)} matchs) : entraînement "
+                  f"{resultats[f'entrainement/ewma/{nom}']['median_ms']:.1f} ms")
+    return resultats
+
+def bench_simulation(simulations, repetitions):
+    from modele import preparer_donnees, entrainer_modele, forces_equipes, predire_et_simuler, generateur_aleatoire
+
+    df = preparer_donnees(ligue_synthetique(20, 38))
+    stats, avg_h, avg_a = entrainer_modele(df)
+    # Forces compactes, comme dans les modèles servis par l'application
+    stats = forces_equipes(stats)
+    dom, ext = stats.equipes[0], stats.equipes[1]
+    generateur = generateur_aleatoire(0)
+
+    resultats = {}
+    for n in simulations:
+        resultats[f'simulation/montecarlo/n={n}'] = chronometrer(
+            lambda: predire_et_simuler(dom, ext, stats, avg_h, avg_a, n, 'montecarlo', generateur=generateur),
+            repetitions
+        )
+        print(f"🎲 Monte Carlo n={n} : {resultats[f'simulation/montecarlo/n={n}']['median_ms']:.2f} ms")
+    resultats['simulation/exact'] = chronometrer(
+        lambda: predire_et_simuler(dom, ext, stats, avg_h, avg_a, engine='exact'), repetitions
+    )
+    resultats['simulation/adaptatif/tolerance=0.5'] = chronometrer(
+        lambda: predire_et_simuler(dom, ext, stats, avg_h, avg_a, tolerance=0.5, generateur=generateur),
+        repetitions
+    )
+    return resultats
+
+def bench_http(repetitions):
+    from app import app, charger_modele_championnat
+    from modele import CHAMPIONNAT_DEFAUT
+
+    client = app.test_client()
+    equipes = charger_modele_championnat(CHAMPIONNAT_DEFAUT)['equipes']
+    affiches = [
+        {'home_team': equipes[i % len(equipes)], 'away_team': equipes[(i + 1) % len(equipes)]}
+        for i in range(TAILLE_LOT)
+    ]
+
+    def requete(chemin, corps):
+        def envoyer():
+            reponse = client.post(chemin, json=corps)
+            if reponse.status_code != 200:
+                raise RuntimeError(f"{chemin} : HTTP {reponse.status_code} {reponse.get_data(as_text=True)}")
+        return envoyer
+
+    scenarios = {
+        'http/predict/montecarlo': requete('/predict', {**affiches[0], 'seed': 1}),
+        'http/predict/exact': requete('/predict', {**affiches[0], 'engine': 'exact'}),
+        'http/predict/marches': requete('/predict', {**affiches[0], 'seed': 1, 'markets': ['over_under', 'btts']}),
+        f'http/predict_batch/montecarlo/{TAILLE_LOT}': requete('/predict_batch', {'matches': affiches, 'seed': 1}),
+        f'http/predict_batch/exact/{TAILLE_LOT}': requete('/predict_batch', {'matches': affiches, 'engine': 'exact'})
+    }
+    resultats = {}
+    for nom, envoyer in scenarios.items():
+        mesure = chronometrer(envoyer, repetitions, duree_min=1.0)
+        mesure['requetes_s'] = round(1000 / mesure['median_ms'], 1)
+        resultats[nom] = mesure
+        print(f"🌐 {nom} : {mesure['median_ms']:.2f} ms ({mesure['requetes_s']:.0f} req/s)")
+    return resultats
+
+def comparer(resultats, reference, seuil=0.25):
+    """
+    Rapport des médianes par rapport à la référence : [(nom, référence ms, actuel ms, ratio)] pour les
+    mesures communes, et la liste des régressions (ratio > 1 + seuil).
+    """
+    lignes = []
+    for nom, mesure in resultats.items():
+        if nom in reference and reference[nom]['median_ms'] > 0:
+            ratio = mesure['median_ms'] / reference[nom]['median_ms']
+            lignes.append((nom, reference[nom]['median_ms'], mesure['median_ms'], ratio))
+    regressions = [ligne for ligne in lignes if ligne[3] > 1 + seuil]
+    return lignes, regressions
+
+def ecarts_environnement(environnement, reference):
+    """Champs de l'environnement de mesure qui diffèrent de ceux de la référence"""
+    return [champ for champ in CHAMPS_ENVIRONNEMENT if environnement.get(champ) != reference.get(champ)]
+
+def environnement_mesure():
+    return {
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'plateforme': platform.platform(),
+        'processeurs': os.cpu_count()
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai hors ligne (entraînement, simulation, HTTP)")
+    parser.add_argument('--only', nargs='+', choices=SECTIONS, help="Sections mesurées (défaut : toutes)")
+    parser.add_argument('--teams', nargs='+', type=int, default=list(EQUIPES_DEFAUT), help="Tailles de championnat")
+    parser.add_argument('--rounds', nargs='+', type=int, default=list(JOURNEES_DEFAUT), help="Journées jouées")
+    parser.add_argument('--simulations', nargs='+', type=int, default=list(SIMULATIONS_DEFAUT))
+    parser.add_argument('--repeat', type=int, default=5, help="Répétitions minimales par mesure")
+    parser.add_argument('--quick', action='store_true', help="Tailles réduites (20 et 100 équipes, n <= 100000)")
+    parser.add_argument('--output', default='benchmark.json', help="Fichier JSON des résultats")
+    parser.add_argument('--baseline', nargs='?', const=REFERENCE_DEFAUT,
+                        help="Résultats de référence à comparer (sans valeur : benchmark_reference.json)")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Régression tolérée (0.25 = +25 %%)")
+    args = parser.parse_args(argv)
+
+    sections = args.only or SECTIONS
+    if args.quick:
+        args.teams = [n for n in args.teams if n <= 100]
+        args.simulations = [n for n in args.simulations if n <= 100000]
+
+    with tempfile.TemporaryDirectory(prefix='foot-benchmark-') as dossier:
+        preparer_environnement(dossier)
+        resultats = {}
+        debut = time.perf_counter()
+        if 'entrainement' in sections:
+            resultats.update(bench_entrainement(args.teams, args.rounds, args.repeat))
+        if 'simulation' in sections:
+            resultats.update(bench_simulation(args.simulations, args.repeat))
+        if 'http' in sections:
+            resultats.update(bench_http(args.repeat))
+        print(f"⏱️ {len(resultats)} mesures en {time.perf_counter() - debut:.1f}s")
+
+    environnement = environnement_mesure()
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'environnement': environnement, 'resultats': resultats}, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    print(f"💾 Résultats écrits : {args.output}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        reference = json.load(f)
+    ecarts = ecarts_environnement(environnement, reference.get('environnement', {}))
+    if ecarts:
+        print(f"⚠️ Référence mesurée dans un autre environnement ({', '.join(ecarts)}) : ratios indicatifs, "
+              f"produire une référence sur cette machine pour un verdict fiable")
+    lignes, regressions = comparer(resultats, reference['resultats'], args.threshold)
+    print(f"{'Mesure':<48} {'Réf. ms':>10} {'Actuel ms':>10} {'Ratio':>7}")
+    for nom, ms_reference, ms_actuel, ratio in lignes:
+        alerte = ' ⚠️' if ratio > 1 + args.threshold else ''
+        print(f"{nom:<48} {ms_reference:>10.3f} {ms_actuel:>10.3f} {ratio:>6.2f}x{alerte}")
+    if regressions:
+        print(f"❌ {len(regressions)} régression(s) au-delà de +{args.threshold:.0%}")
+        return 1
+    print(f"✅ Aucune régression au-delà de +{args.threshold:.0%}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
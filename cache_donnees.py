@@ -0,0 +1,202 @@
+"""
+Cache disque des CSV football-data.co.uk.
+
+Chaque fichier est stocké brut avec ses métadonnées (ETag, Last-Modified, empreinte).
+Une requête conditionnelle revalide la copie locale : un fichier inchangé ne coûte qu'un 304.
+En mode hors ligne, seules les copies en cache sont servies.
+
+Configuration par variables d'environnement :
+- FOOT_CACHE_DIR        : dossier du cache (défaut ~/.cache/foot-predictor)
+- FOOT_HORS_LIGNE=1     : ne jamais contacter la source
+- FOOT_DOSSIER_DONNEES  : lire les CSV dans un dossier local au lieu du HTTP
+                          (dossier/<saison>/<championnat>.csv, ou dossier/<championnat>.csv)
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+from metriques import METRIQUES
+
+Reponse = namedtuple('Reponse', ['statut', 'contenu', 'etag', 'last_modified'])
+
+def ecrire_atomique(chemin, contenu):
+    """
+    Écrit chemin d'un seul coup : un lecteur concurrent voit l'ancien ou le nouveau fichier, jamais un mélange.
+    contenu : octets, ou fonction ecrire(temporaire) qui produit le fichier au chemin temporaire reçu.
+    """
+    dossier = os.path.dirname(chemin)
+    if dossier:
+        os.makedirs(dossier, exist_ok=True)
+    # Un fichier temporaire par processus et par thread : deux écritures simultanées ne se mélangent pas
+    temporaire = f'{chemin}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        if callable(contenu):
+            contenu(temporaire)
+        else:
+            with open(temporaire, 'wb') as f:
+                f.write(contenu)
+        os.replace(temporaire, chemin)
+    except BaseException:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        raise
+
+class RecuperateurHTTP:
+    """Téléchargement HTTP(S) avec en-têtes conditionnels If-None-Match / If-Modified-Since"""
+
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+
+    def recuperer(self, url, etag=None, last_modified=None):
+        # Import à la demande : urllib.request charge ssl et http.client (~50 ms), inutiles hors ligne
+        import urllib.error
+        import urllib.request
+
+        requete = urllib.request.Request(url, headers={'User-Agent': 'foot-predictor'})
+        if etag:
+            requete.add_header('If-None-Match', etag)
+        if last_modified:
+            requete.add_header('If-Modified-Since', last_modified)
+        try:
+            with urllib.request.urlopen(requete, timeout=self.timeout) as reponse:
+                return Reponse(
+                    reponse.status,
+                    reponse.read(),
+                    reponse.headers.get('ETag'),
+                    reponse.headers.get('Last-Modified')
+                )
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return Reponse(304, None, etag, last_modified)
+            raise
+
+class RecuperateurDossier:
+    """
+    Sert les CSV d'un dossier local (fichiers de test, miroir) à la place de la source HTTP :
+    dossier/<saison>/<fichier> s'il existe (historique multi-saisons), sinon dossier/<fichier>.
+    """
+
+    def __init__(self, dossier):
+        self.dossier = dossier
+
+    def recuperer(self, url, etag=None, last_modified=None):
+        *_, saison, fichier = url.rsplit('/', 2)
+        chemin = os.path.join(self.dossier, saison, fichier)
+        if not os.path.exists(chemin):
+            chemin = os.path.join(self.dossier, fichier)
+        infos = os.stat(chemin)
+        etag_local = f'"{infos.st_mtime_ns:x}-{infos.st_size:x}"'
+        if etag == etag_local:
+            return Reponse(304, None, etag, last_modified)
+        with open(chemin, 'rb') as f:
+            return Reponse(200, f.read(), etag_local, None)
+
+class CacheCSV:
+    """Cache disque revalidé par requête conditionnelle, avec repli sur la copie locale si la source est indisponible"""
+
+    def __init__(self, dossier, recuperateur=None, hors_ligne=False):
+        self.dossier = dossier
+        self.recuperateur = recuperateur or RecuperateurHTTP()
+        self.hors_ligne = hors_ligne
+
+    def _chemins(self, url):
+        nom = re.sub(r'[^A-Za-z0-9.]+', '_', url.split('://', 1)[-1]).strip('_')
+        base = os.path.join(self.dossier, nom)
+        return base, base + '.json'
+
+    def metadonnees(self, url):
+        """Métadonnées de la copie en cache (None si l'URL n'a jamais été téléchargée)"""
+        chemin, chemin_meta = self._chemins(url)
+        if not (os.path.exists(chemin) and os.path.exists(chemin_meta)):
+            return None
+        with open(chemin_meta, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _lire_local(self, url):
+        chemin, _ = self._chemins(url)
+        with open(chemin, 'rb') as f:
+            return f.read()
+
+    def _ecrire(self, url, reponse):
+        chemin, chemin_meta = self._chemins(url)
+        meta = {
+            'url': url,
+            'etag': reponse.etag,
+            'last_modified': reponse.last_modified,
+            'sha256': hashlib.sha256(reponse.contenu).hexdigest(),
+            'telecharge_le': time.time()
+        }
+        ecrire_atomique(chemin, reponse.contenu)
+        ecrire_atomique(chemin_meta, json.dumps(meta).encode('utf-8'))
+
+    def _conclure(self, url, meta, reponse):
+        if reponse.statut == 304 and meta is not None:
+            METRIQUES.incrementer('foot_csv_total', resultat='inchange')
+            return self._lire_local(url)
+        METRIQUES.incrementer('foot_csv_total', resultat='telecharge')
+        self._ecrire(url, reponse)
+        return reponse.contenu
+
+    def lire(self, url):
+        """Contenu brut du CSV, revalidé auprès de la source sauf en mode hors ligne"""
+        meta = self.metadonnees(url)
+
+        if self.hors_ligne:
+            if meta is None:
+                raise FileNotFoundError(f"Mode hors ligne : {url} absent du cache")
+            METRIQUES.incrementer('foot_csv_total', resultat='hors_ligne')
+            return self._lire_local(url)
+
+        try:
+            reponse = self.recuperateur.recuperer(
+                url,
+                etag=meta['etag'] if meta else None,
+                last_modified=meta['last_modified'] if meta else None
+            )
+        except OSError as e:
+            if meta is None:
+                raise
+            print(f"⚠️ Source indisponible ({e}), copie en cache utilisée pour {url}")
+            METRIQUES.incrementer('foot_csv_total', resultat='repli')
+            return self._lire_local(url)
+
+        return self._conclure(url, meta, reponse)
+
+    async def lire_async(self, url, recuperateur):
+        """Comme lire, avec un récupérateur asynchrone (donnees_async.RecuperateurAsync) ; les accès disque restent courts"""
+        meta = self.metadonnees(url)
+
+        if self.hors_ligne:
+            if meta is None:
+                raise FileNotFoundError(f"Mode hors ligne : {url} absent du cache")
+            METRIQUES.incrementer('foot_csv_total', resultat='hors_ligne')
+            return self._lire_local(url)
+
+        try:
+            reponse = await recuperateur.recuperer(
+                url,
+                etag=meta['etag'] if meta else None,
+                last_modified=meta['last_modified'] if meta else None
+            )
+        except OSError as e:
+            if meta is None:
+                raise
+            print(f"⚠️ Source indisponible ({e}), copie en cache utilisée pour {url}")
+            METRIQUES.incrementer('foot_csv_total', resultat='repli')
+            return self._lire_local(url)
+
+        return self._conclure(url, meta, reponse)
+
+def cache_depuis_env():
+    """Cache configuré par FOOT_CACHE_DIR, FOOT_HORS_LIGNE et FOOT_DOSSIER_DONNEES"""
+    dossier_defaut = os.path.join(os.getenv('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'foot-predictor')
+    dossier_donnees = os.getenv('FOOT_DOSSIER_DONNEES')
+    return CacheCSV(
+        os.getenv('FOOT_CACHE_DIR', dossier_defaut),
+        recuperateur=RecuperateurDossier(dossier_donnees) if dossier_donnees else None,
+        hors_ligne=os.getenv('FOOT_HORS_LIGNE', '0') == '1'
+    )
@@ -0,0 +1,160 @@
+"""
+Cache des réponses de /predict.
+
+- Cache local LRU borné avec durée de vie, protégé par un verrou (threads Flask).
+- Stockage partagé optionnel (Redis) pour que plusieurs workers gunicorn profitent des mêmes
+  calculs ; StockageMemoire le remplace dans les tests.
+- La clé contient l'empreinte du modèle (CSV source + paramètres) : une nouvelle version publiée
+  ne relit jamais une ancienne réponse, et ses entrées locales sont purgées à la publication.
+
+Configuration par variables d'environnement :
+- FOOT_CACHE_REPONSES_TAILLE : nombre d'entrées locales (défaut 4096, 0 pour désactiver)
+- FOOT_CACHE_REPONSES_TTL    : durée de vie en secondes (défaut 300)
+- FOOT_CACHE_PARTAGE         : redis://hôte:port/0, ou "memoire" pour le stockage de test
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+class StockageMemoire:
+    """Stockage partagé en mémoire du processus, même interface que StockageRedis (tests, développement)"""
+
+    def __init__(self):
+        self._donnees = {}
+        self._verrou = threading.Lock()
+
+    def lire(self, cle):
+        with self._verrou:
+            entree = self._donnees.get(cle)
+            if entree is None:
+                return None
+            valeur, expiration = entree
+            if expiration <= time.monotonic():
+                del self._donnees[cle]
+                return None
+            return valeur
+
+    def ecrire(self, cle, valeur, duree_vie):
+        with self._verrou:
+            self._donnees[cle] = (valeur, time.monotonic() + duree_vie)
+
+class StockageRedis:
+    """Stockage partagé entre workers dans Redis (paquet redis requis)"""
+
+    def __init__(self, url, prefixe='foot:predict:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("FOOT_CACHE_PARTAGE=redis://... nécessite le paquet redis (pip install redis)") from e
+        self.client = redis.Redis.from_url(url)
+        self.prefixe = prefixe
+
+    def lire(self, cle):
+        valeur = self.client.get(self.prefixe + cle)
+        return None if valeur is None else valeur.decode('utf-8')
+
+    def ecrire(self, cle, valeur, duree_vie):
+        self.client.set(self.prefixe + cle, valeur, ex=max(1, int(duree_vie)))
+
+class CacheReponses:
+    """Cache LRU + TTL de réponses JSON, avec compteurs et stockage partagé optionnel"""
+
+    def __init__(self, taille_max=4096, duree_vie=300, stockage=None):
+        self.taille_max = taille_max
+        self.duree_vie = duree_vie
+        self.stockage = stockage
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+        self._compteurs = dict.fromkeys(
+            ('hits', 'hits_partages', 'misses', 'evictions', 'expirations', 'invalidations', 'erreurs_partage'), 0
+        )
+
+    @staticmethod
+    def cle(championnat, *elements):
+        """Clé texte stable : le championnat en tête pour pouvoir purger ses entrées"""
+        return json.dumps([championnat, *elements], separators=(',', ':'), ensure_ascii=False)
+
+    def _compter(self, nom):
+        with self._verrou:
+            self._compteurs[nom] += 1
+
+    def obtenir(self, cle):
+        """Réponse en cache (copie) ou None ; le local d'abord, puis le stockage partagé"""
+        if self.taille_max <= 0:
+            return None
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None:
+                valeur, expiration = entree
+                if expiration > time.monotonic():
+                    self._entrees.move_to_end(cle)
+                    self._compteurs['hits'] += 1
+                    return json.loads(valeur)
+                del self._entrees[cle]
+                self._compteurs['expirations'] += 1
+
+        if self.stockage is not None:
+            try:
+                valeur = self.stockage.lire(cle)
+            except Exception as e:
+                # Un stockage partagé indisponible ne doit pas faire échouer la prédiction
+                self._compter('erreurs_partage')
+                print(f"⚠️ Cache partagé indisponible : {e}")
+                valeur = None
+            if valeur is not None:
+                self._stocker_local(cle, valeur)
+                self._compter('hits_partages')
+                return json.loads(valeur)
+
+        self._compter('misses')
+        return None
+
+    def _stocker_local(self, cle, valeur):
+        with self._verrou:
+            self._entrees[cle] = (valeur, time.monotonic() + self.duree_vie)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+                self._compteurs['evictions'] += 1
+
+    def stocker(self, cle, reponse):
+        if self.taille_max <= 0:
+            return
+        valeur = json.dumps(reponse)
+        self._stocker_local(cle, valeur)
+        if self.stockage is not None:
+            try:
+                self.stockage.ecrire(cle, valeur, self.duree_vie)
+            except Exception as e:
+                self._compter('erreurs_partage')
+                print(f"⚠️ Cache partagé indisponible : {e}")
+
+    def invalider(self, championnat):
+        """Purge les entrées locales d'un championnat (nouvelle version publiée)"""
+        prefixe = self.cle(championnat)[:-1] + ','
+        with self._verrou:
+            perimees = [cle for cle in self._entrees if cle.startswith(prefixe)]
+            for cle in perimees:
+                del self._entrees[cle]
+            self._compteurs['invalidations'] += len(perimees)
+
+    def statistiques(self):
+        with self._verrou:
+            return {**self._compteurs, 'entrees': len(self._entrees), 'taille_max': self.taille_max}
+
+def cache_reponses_depuis_env():
+    """Cache configuré par FOOT_CACHE_REPONSES_TAILLE, FOOT_CACHE_REPONSES_TTL et FOOT_CACHE_PARTAGE"""
+    partage = os.getenv('FOOT_CACHE_PARTAGE')
+    if not partage:
+        stockage = None
+    elif partage == 'memoire':
+        stockage = StockageMemoire()
+    else:
+        stockage = StockageRedis(partage)
+    return CacheReponses(
+        int(os.getenv('FOOT_CACHE_REPONSES_TAILLE', '4096')),
+        float(os.getenv('FOOT_CACHE_REPONSES_TTL', '300')),
+        stockage
+    )
@@ -0,0 +1,189 @@
+"""
+Modèle de Dixon-Coles : buts de Poisson corrigés sur les petits scores, ajusté par maximum de vraisemblance.
+
+    log λ = c + h + attaque[dom] + defense[ext]      (buts attendus de l'équipe à domicile)
+    log μ = c + attaque[ext] + defense[dom]          (de l'équipe à l'extérieur)
+    P(x, y) = τ(x, y) · Poisson(x; λ) · Poisson(y; μ)
+
+τ ne modifie que les scores 0-0, 0-1, 1-0 et 1-1 (ρ < 0 : plus de nuls 0-0 et 1-1), sans changer
+la masse totale. Les matchs sont pondérés par une décroissance qui reprend le span de l'EWMA :
+un match joué il y a k journées pèse (1 - 2 / (span + 1))^k.
+
+La log-vraisemblance pondérée et son gradient analytique sont vectorisés sur les matchs
+(np.bincount par équipe) ; l'optimisation est un L-BFGS en NumPy. Une pénalité ridge légère sur
+les attaques et défenses lève l'invariance (attaque + s, défense - s) et retient les équipes qui
+ont peu joué. Une saison s'ajuste en quelques millisecondes.
+
+Le modèle ajusté s'exprime avec les forces du modèle EWMA (force_att = exp(attaque),
+faibl_def = exp(defense), moyennes exp(c + h) et exp(c)) : prédiction, matrice des affiches et
+snapshot sont partagés, seul ρ s'ajoute à la distribution des scores (modele.matrice_scores).
+"""
+import numpy as np
+import pandas as pd
+
+from modele import COLONNES_STATS
+
+REGULARISATION = 1e-3
+# ρ = RHO_MAX * tanh(r) : paramètre libre pour l'optimiseur, τ reste positif pour des buts attendus usuels
+RHO_MAX = 0.3
+ITERATIONS_MAX = 500
+TOLERANCE = 1e-7
+
+def poids_temporels(ordre, n_equipes, span=10):
+    """Poids (1 - alpha)^journées écoulées depuis chaque match, le plus récent pesant 1"""
+    rang = np.argsort(np.argsort(np.asarray(ordre), kind='stable'), kind='stable')
+    journees = (rang.max(initial=0) - rang) / max(n_equipes / 2, 1)
+    return (1 - 2 / (span + 1)) ** journees
+
+def tableaux_dixon_coles(df, span=10):
+    """
+    Matchs joués (codes d'équipes, buts, poids, masques des petits scores) d'un DataFrame de preparer_donnees.
+    Buts bruts, entiers : le plafond de l'EWMA n'a pas de sens dans une vraisemblance de Poisson.
+    """
+    df = df.dropna(subset=['home_team', 'away_team', 'home_goals', 'away_goals'])
+    codes, equipes = pd.factorize(pd.concat([df['home_team'], df['away_team']], ignore_index=True))
+    n = len(df)
+    x = df['home_goals'].to_numpy(dtype=float)
+    y = df['away_goals'].to_numpy(dtype=float)
+    return {
+        'equipes': list(equipes),
+        'dom': codes[:n],
+        'ext': codes[n:],
+        'x': x,
+        'y': y,
+        'poids': poids_temporels(df['match_order'].to_numpy(), len(equipes), span),
+        # Scores touchés par τ : 0-0, 0-1, 1-0, 1-1
+        'petits': [(x == i) & (y == j) for i, j in ((0, 0), (0, 1), (1, 0), (1, 1))]
+    }
+
+def objectif(theta, t, regularisation=REGULARISATION):
+    """
+    Opposé de la log-vraisemblance pondérée moyenne (plus la pénalité ridge) et son gradient.
+    theta = [attaque (n), defense (n), c, h, r] avec ρ = RHO_MAX * tanh(r).
+    """
+    n = len(t['equipes'])
+    attaque, defense = theta[:n], theta[n:2 * n]
+    c, h, r = theta[2 * n:]
+    rho = RHO_MAX * np.tanh(r)
+    dom, ext, x, y, w = t['dom'], t['ext'], t['x'], t['y'], t['poids']
+
+    log_lam = c + h + attaque[dom] + defense[ext]
+    log_mu = c + attaque[ext] + defense[dom]
+    lam, mu = np.exp(log_lam), np.exp(log_mu)
+
+    # τ et ses dérivées par rapport à log λ, log μ et ρ, nulles hors des petits scores
+    lm = lam * mu
+    p00, p01, p10, p11 = t['petits']
+    tau = np.select(t['petits'], [1 - lm * rho, 1 + lam * rho, 1 + mu * rho, np.full_like(lam, 1 - rho)], 1.0)
+    tau = np.maximum(tau, 1e-10)
+    d_lam = np.select([p00, p01], [-lm * rho, lam * rho], 0.0) / tau
+    d_mu = np.select([p00, p10], [-lm * rho, mu * rho], 0.0) / tau
+    d_rho = np.select(t['petits'], [-lm, lam, mu, -np.ones_like(lam)], 0.0) / tau
+
+    total = w.sum()
+    vraisemblance = x * log_lam - lam + y * log_mu - mu + np.log(tau)
+    valeur = -(w @ vraisemblance) / total + regularisation / 2 * (attaque @ attaque + defense @ defense)
+
+    g_lam = w * (x - lam + d_lam) / total
+    g_mu = w * (y - mu + d_mu) / total
+    gradient = np.empty_like(theta)
+    gradient[:n] = -(np.bincount(dom, g_lam, n) + np.bincount(ext, g_mu, n)) + regularisation * attaque
+    gradient[n:2 * n] = -(np.bincount(ext, g_lam, n) + np.bincount(dom, g_mu, n)) + regularisation * defense
+    gradient[2 * n] = -(g_lam.sum() + g_mu.sum())
+    gradient[2 * n + 1] = -g_lam.sum()
+    gradient[2 * n + 2] = -(w @ d_rho) / total * RHO_MAX * (1 - np.tanh(r) ** 2)
+    return valeur, gradient
+
+def lbfgs(fonction, x, iterations_max=ITERATIONS_MAX, tolerance=TOLERANCE, memoire=10):
+    """
+    Minimise fonction(x) -> (valeur, gradient) : L-BFGS (récursion à deux boucles) avec recherche
+    linéaire d'Armijo par rebroussement. Renvoie (x, valeur, itérations).
+    """
+    valeur, gradient = fonction(x)
+    historique = []
+    iteration = 0
+    while iteration < iterations_max and np.max(np.abs(gradient)) > tolerance:
+        iteration += 1
+        direction = -gradient
+        coefficients = []
+        for s, y, inverse in reversed(historique):
+            a = inverse * (s @ direction)
+            coefficients.append(a)
+            direction = direction - a * y
+        if historique:
+            s, y, inverse = historique[-1]
+            direction = direction * (s @ y) / (y @ y)
+        for (s, y, inverse), a in zip(historique, reversed(coefficients)):
+            direction = direction + (a - inverse * (y @ direction)) * s
+
+        pente = gradient @ direction
+        if pente >= 0:
+            # Courbure mal estimée : repartir de la plus forte pente
+            historique.clear()
+            direction, pente = -gradient, -(gradient @ gradient)
+
+        pas = 1.0
+        while True:
+            essai = x + pas * direction
+            valeur_essai, gradient_essai = fonction(essai)
+            if valeur_essai <= valeur + 1e-4 * pas * pente or pas < 1e-12:
+                break
+            pas /= 2
+        s, y = essai - x, gradient_essai - gradient
+        if s @ y > 1e-12:
+            historique.append((s, y, 1 / (y @ s)))
+            del historique[:-memoire]
+        if valeur_essai > valeur:
+            break
+        x, valeur, gradient = essai, valeur_essai, gradient_essai
+    return x, valeur, iteration
+
+def ajuster_dixon_coles(df, span=10, regularisation=REGULARISATION):
+    """
+    Ajustement par maximum de vraisemblance sur les matchs joués (DataFrame de preparer_donnees) :
+    {'equipes', 'attaque', 'defense', 'intercept', 'avantage', 'rho', 'iterations', 'log_vraisemblance'}.
+    """
+    t = tableaux_dixon_coles(df, span)
+    if not len(t['x']):
+        raise ValueError("Aucun match joué pour ajuster le modèle")
+    n = len(t['equipes'])
+    moyenne_dom = np.average(t['x'], weights=t['poids'])
+    moyenne_ext = np.average(t['y'], weights=t['poids'])
+    depart = np.zeros(2 * n + 3)
+    depart[2 * n] = np.log(max(moyenne_ext, 1e-3))
+    depart[2 * n + 1] = np.log(max(moyenne_dom, 1e-3) / max(moyenne_ext, 1e-3))
+
+    theta, valeur, iterations = lbfgs(lambda theta: objectif(theta, t, regularisation), depart)
+    return {
+        'equipes': t['equipes'],
+        'attaque': theta[:n],
+        'defense': theta[n:2 * n],
+        'intercept': float(theta[2 * n]),
+        'avantage': float(theta[2 * n + 1]),
+        'rho': float(RHO_MAX * np.tanh(theta[2 * n + 2])),
+        'iterations': iterations,
+        'log_vraisemblance': -float(valeur)
+    }
+
+def entrainer_dixon_coles(df, span=10, regularisation=REGULARISATION):
+    """
+    Comme entrainer_modele : (stats, avg_h, avg_a) aux colonnes COLONNES_STATS, plus rho.
+    Une seule attaque et une seule défense par équipe, utilisées à domicile comme à l'extérieur.
+    L'avantage domicile ajusté est inclus dans avg_h : le paramètre avantage_domicile ne s'applique pas.
+    """
+    ajustement = ajuster_dixon_coles(df, span, regularisation)
+    avg_h = float(np.exp(ajustement['intercept'] + ajustement['avantage']))
+    avg_a = float(np.exp(ajustement['intercept']))
+    attaque = np.exp(ajustement['attaque'])
+    defense = np.exp(ajustement['defense'])
+    stats = pd.DataFrame({
+        'attaque_domicile': attaque * avg_h,
+        'defense_domicile': defense * avg_a,
+        'attaque_exterieur': attaque * avg_a,
+        'defense_exterieur': defense * avg_h,
+        'force_att_domicile': attaque,
+        'force_att_exterieur': attaque,
+        'faibl_def_domicile': defense,
+        'faibl_def_exterieur': defense
+    }, index=pd.Index(ajustement['equipes']))[COLONNES_STATS]
+    return stats, avg_h, avg_a, ajustement['rho']
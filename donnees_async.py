@@ -0,0 +1,208 @@
+"""
+Chargement asynchrone des données : téléchargement concurrent des CSV et publication des modèles.
+
+- RecuperateurAsync : client httpx partagé (pool de connexions keep-alive), délai d'attente et
+  nouvelles tentatives avec attente exponentielle sur les erreurs réseau et les réponses 5xx.
+  Même interface que RecuperateurHTTP, en coroutine ; les échecs lèvent ConnectionError (OSError)
+  pour que CacheCSV.lire_async se replie sur la copie en cache comme en synchrone.
+- ChargeurAsync : boucle asyncio dans un thread dédié. Les CSV de tous les championnats sont
+  récupérés en même temps ; l'entraînement (CPU) passe par un pool de threads ou de processus,
+  puis la version est publiée dans le registre par échange atomique. Une prédiction lit donc
+  toujours la version publiée et n'attend jamais un rafraîchissement en cours.
+
+Configuration par variables d'environnement :
+- FOOT_HTTP_TIMEOUT     : délai d'attente en secondes (défaut 30)
+- FOOT_HTTP_TENTATIVES  : nombre de tentatives par téléchargement (défaut 3)
+- FOOT_HTTP_CONNEXIONS  : connexions simultanées du pool (défaut 10)
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+
+from cache_donnees import Reponse, RecuperateurDossier
+from metriques import METRIQUES
+from modele import (
+    CHAMPIONNATS, CACHE_DONNEES, url_donnees, entrainer_depuis_csv, actualiser_depuis_csv, parametres_championnat
+)
+
+class RecuperateurAsync:
+    """Requêtes conditionnelles asynchrones (httpx), avec pool de connexions et nouvelles tentatives"""
+
+    def __init__(self, timeout=None, tentatives=None, connexions=None, delai=0.5):
+        self.timeout = float(timeout or os.getenv('FOOT_HTTP_TIMEOUT', '30'))
+        self.tentatives = max(1, int(tentatives or os.getenv('FOOT_HTTP_TENTATIVES', '3')))
+        self.connexions = int(connexions or os.getenv('FOOT_HTTP_CONNEXIONS', '10'))
+        self.delai = delai
+        self._client = None
+
+    def _obtenir_client(self):
+        # Créé dans la boucle qui l'utilise : un client httpx est lié à sa boucle
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.connexions, max_keepalive_connections=self.connexions),
+                headers={'User-Agent': 'foot-predictor'},
+                follow_redirects=True
+            )
+        return self._client
+
+    async def recuperer(self, url, etag=None, last_modified=None):
+        import httpx
+        client = self._obtenir_client()
+        entetes = {}
+        if etag:
+            entetes['If-None-Match'] = etag
+        if last_modified:
+            entetes['If-Modified-Since'] = last_modified
+
+        erreur = None
+        for tentative in range(self.tentatives):
+            if tentative:
+                await asyncio.sleep(self.delai * 2 ** (tentative - 1))
+            try:
+                reponse = await client.get(url, headers=entetes)
+            except httpx.TransportError as e:
+                erreur = e
+                continue
+            if reponse.status_code == 304:
+                return Reponse(304, None, etag, last_modified)
+            if reponse.status_code < 400:
+                return Reponse(
+                    reponse.status_code, reponse.content,
+                    reponse.headers.get('ETag'), reponse.headers.get('Last-Modified')
+                )
+            if reponse.status_code < 500:
+                # Erreur du client (404...) : inutile de réessayer
+                raise ConnectionError(f"HTTP {reponse.status_code} pour {url}")
+            erreur = f"HTTP {reponse.status_code}"
+        raise ConnectionError(f"Échec après {self.tentatives} tentatives pour {url} : {erreur}")
+
+    async def fermer(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def oublier_client(self):
+        """Abandonne le client sans le fermer (processus enfant après fork : sa boucle n'existe plus)"""
+        self._client = None
+
+class ChargeurAsync:
+    """Boucle asyncio d'arrière-plan qui télécharge, entraîne et publie les modèles d'un registre"""
+
+    def __init__(self, registre, cache=None, recuperateur=None, processus=0):
+        self.registre = registre
+        self.cache = cache or CACHE_DONNEES
+        self.recuperateur = recuperateur or RecuperateurAsync()
+        self.processus = processus
+        self._reinitialiser()
+        # Après un fork (workers gunicorn), le thread de la boucle et ceux des pools n'existent plus
+        os.register_at_fork(after_in_child=self._reinitialiser)
+
+    def _reinitialiser(self):
+        self._verrou = threading.Lock()
+        self._boucle = None
+        self._executeur = None
+        self._pool_processus = None
+        self._en_cours = {}
+        self.recuperateur.oublier_client()
+
+    def _boucle_active(self):
+        with self._verrou:
+            if self._boucle is None:
+                boucle = asyncio.new_event_loop()
+                threading.Thread(target=boucle.run_forever, name='chargeur-async', daemon=True).start()
+                self._executeur = ThreadPoolExecutor(max_workers=len(CHAMPIONNATS), thread_name_prefix='entrainement')
+                if self.processus > 0:
+                    self._pool_processus = ProcessPoolExecutor(max_workers=self.processus)
+                self._boucle = boucle
+            return self._boucle
+
+    async def _lire(self, championnat):
+        url = url_donnees(championnat)
+        if isinstance(self.cache.recuperateur, RecuperateurDossier):
+            # Source locale (tests, miroir) : lecture disque, sans client HTTP
+            return await asyncio.to_thread(self.cache.lire, url)
+        return await self.cache.lire_async(url, self.recuperateur)
+
+    async def _charger(self, championnat, force_reload):
+        debut = time.perf_counter()
+        with METRIQUES.chrono('foot_etape_duree_secondes', etape='fetch'):
+            contenu = await self._lire(championnat)
+        boucle = asyncio.get_running_loop()
+        parametres = parametres_championnat(championnat)
+
+        modele = None
+        precedent = self.registre.get(championnat)
+        if self._pool_processus is not None and precedent is None:
+            modele = await boucle.run_in_executor(
+                self._pool_processus, partial(entrainer_depuis_csv, contenu, **parametres)
+            )
+
+        def construire():
+            if modele is not None:
+                return modele
+            # Un rafraîchissement n'intègre que les matchs ajoutés depuis la version publiée
+            return actualiser_depuis_csv(self.registre.get(championnat), contenu, **parametres)
+
+        await boucle.run_in_executor(
+            self._executeur, lambda: self.registre.obtenir(championnat, construire, force_reload=force_reload)
+        )
+        duree = time.perf_counter() - debut
+        METRIQUES.observer('foot_chargement_duree_secondes', duree, league=championnat)
+        METRIQUES.incrementer(
+            'foot_chargements_total', league=championnat, mode='rafraichissement' if force_reload else 'chargement'
+        )
+        return duree
+
+    async def _charger_unique(self, championnat, force_reload):
+        # Single-flight : les demandes simultanées d'un même chargement partagent la même tâche
+        cle = (championnat, force_reload)
+        tache = self._en_cours.get(cle)
+        if tache is None:
+            tache = asyncio.ensure_future(self._charger(championnat, force_reload))
+            self._en_cours[cle] = tache
+            tache.add_done_callback(lambda _: self._en_cours.pop(cle, None))
+        return await asyncio.shield(tache)
+
+    async def _charger_tous(self, championnats, force_reload):
+        taches = [self._charger_unique(championnat, force_reload) for championnat in championnats]
+        bilan = {}
+        for championnat, resultat in zip(championnats, await asyncio.gather(*taches, return_exceptions=True)):
+            if isinstance(resultat, Exception):
+                bilan[championnat] = {'error': str(resultat)}
+                METRIQUES.incrementer('foot_chargements_total', league=championnat, mode='erreur')
+                print(f"❌ {CHAMPIONNATS[championnat]} : {resultat}")
+            else:
+                bilan[championnat] = {'duree': round(resultat, 3)}
+                print(f"✅ {CHAMPIONNATS[championnat]} prêt en {resultat:.2f}s")
+        return bilan
+
+    def soumettre(self, championnats=None, force_reload=False):
+        """
+        Lance le chargement des championnats (défaut : tous) sans attendre ; renvoie un
+        concurrent.futures.Future du bilan {championnat: {'duree': secondes} ou {'error': message}}.
+        Sans force_reload, les championnats déjà publiés sont ignorés.
+        """
+        championnats = [c for c in (championnats or CHAMPIONNATS) if force_reload or c not in self.registre]
+        for championnat in championnats:
+            if championnat not in CHAMPIONNATS:
+                raise ValueError("Championnat invalide")
+        return asyncio.run_coroutine_threadsafe(self._charger_tous(championnats, force_reload), self._boucle_active())
+
+    async def charger(self, championnats=None, force_reload=False):
+        """Comme soumettre, à attendre depuis n'importe quelle boucle (vues async de Flask)"""
+        return await asyncio.wrap_future(self.soumettre(championnats, force_reload))
+
+    def fermer(self):
+        if self._boucle is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.recuperateur.fermer(), self._boucle).result()
+        self._boucle.call_soon_threadsafe(self._boucle.stop)
+        self._executeur.shutdown()
+        if self._pool_processus is not None:
+            self._pool_processus.shutdown()
+        self._boucle = None
@@ -0,0 +1,20 @@
+"""
+Configuration gunicorn : gunicorn -c gunicorn.conf.py
+
+Variables d'environnement :
+- PORT             : port d'écoute (défaut 7860)
+- WEB_CONCURRENCY  : nombre de workers (défaut : nombre de CPU)
+- FOOT_THREADS     : threads par worker (défaut 4)
+- FOOT_TIMEOUT     : délai maximal d'une requête en secondes (défaut 120)
+- FOOT_PRELOAD=0   : chaque worker charge ses modèles au lieu de les hériter du maître
+"""
+import multiprocessing
+import os
+
+wsgi_app = 'wsgi:app'
+bind = f"0.0.0.0:{os.getenv('PORT', '7860')}"
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.getenv('FOOT_THREADS', '4'))
+timeout = int(os.getenv('FOOT_TIMEOUT', '120'))
+preload_app = os.getenv('FOOT_PRELOAD', '1') == '1'
+accesslog = '-'
@@ -0,0 +1,284 @@
+"""
+Historique multi-saisons : ingestion des CSV football-data et magasin en colonnes (Parquet).
+
+- Lecture en flux : seules les colonnes utiles sont parsées (usecols), par morceaux de
+  TAILLE_MORCEAU lignes, puis converties en types compacts : équipes en catégories, buts en int8,
+  dates en datetime64. Une saison de 380 matchs tient en quelques kilo-octets.
+- Les dates (jj/mm/aa ou jj/mm/aaaa selon les saisons) donnent un match_order chronologique sur
+  toute la plage de saisons, au lieu de l'ordre des lignes des fichiers.
+- Le magasin est partitionné par championnat et par saison (dossier/league=F1/season=2425.parquet).
+  Un manifeste garde l'empreinte de chaque CSV source : une reconstruction ne réécrit que les
+  saisons modifiées, et un chargement ne lit que les partitions demandées. pyarrow est requis.
+
+Toute division football-data (E1, F2, SP2...) peut être ingérée, pas seulement les championnats
+servis par l'application. Les saisons absentes de la source sont signalées et ignorées.
+
+Usage :
+    python historique.py build --seasons 2005-2025 [--leagues F1 E0 E1] [--store historique] [--workers 8]
+    python historique.py info [--store historique] [--leagues F1] [--seasons 2015-2025]
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from cache_donnees import ecrire_atomique
+from modele import CHAMPIONNATS, CACHE_DONNEES, url_donnees, lire_dates
+
+COLONNES_HISTORIQUE = ('date', 'home_team', 'away_team', 'home_goals', 'away_goals')
+# En-têtes football-data -> colonnes de l'historique (HT / AT dans certaines anciennes saisons)
+NOMS_COLONNES = {
+    'Date': 'date', 'HomeTeam': 'home_team', 'HT': 'home_team', 'AwayTeam': 'away_team', 'AT': 'away_team',
+    'FTHG': 'home_goals', 'FTAG': 'away_goals'
+}
+TAILLE_MORCEAU = 50000
+DOSSIER_MAGASIN = os.getenv('FOOT_HISTORIQUE', 'historique')
+MANIFESTE = 'manifeste.json'
+
+# --- SAISONS ---
+def code_saison(annee):
+    """Code football-data de la saison commençant en annee : 2025 -> '2526'"""
+    return f'{annee % 100:02d}{(annee + 1) % 100:02d}'
+
+def annee_saison(code):
+    """Année de début d'un code de saison : '9900' -> 1999, '2526' -> 2025"""
+    debut = int(code[:2])
+    return debut + (1900 if debut >= 90 else 2000)
+
+def plage_saisons(texte):
+    """'2005-2025' ou '2025' (années de début, bornes incluses) -> codes de saisons chronologiques"""
+    correspondance = re.fullmatch(r'(\d{4})(?:-(\d{4}))?', texte.strip())
+    if not correspondance:
+        raise ValueError(f"Plage de saisons invalide : {texte} (attendu AAAA ou AAAA-AAAA)")
+    debut = int(correspondance.group(1))
+    fin = int(correspondance.group(2) or debut)
+    if not 1990 <= debut <= fin <= 2089:
+        raise ValueError(f"Plage de saisons invalide : {texte}")
+    return [code_saison(annee) for annee in range(debut, fin + 1)]
+
+# --- LECTURE ---
+def _compacter(morceau):
+    """Matchs joués d'un morceau de CSV, en types compacts (équipes encore en chaînes)"""
+    manquantes = [colonne for colonne in COLONNES_HISTORIQUE if colonne not in morceau]
+    if manquantes:
+        raise ValueError(f"Colonnes absentes du CSV : {', '.join(manquantes)}")
+    buts = morceau[['home_goals', 'away_goals']].apply(pd.to_numeric, errors='coerce')
+    joue = buts.notna().all(axis=1) & morceau['home_team'].notna() & morceau['away_team'].notna()
+    return pd.DataFrame({
+        'date': lire_dates(morceau['date'][joue]).astype('datetime64[s]'),
+        'home_team': morceau['home_team'][joue].str.strip(),
+        'away_team': morceau['away_team'][joue].str.strip(),
+        'home_goals': buts['home_goals'][joue].astype(np.int8),
+        'away_goals': buts['away_goals'][joue].astype(np.int8)
+    })
+
+def _categories_communes(frames):
+    """Mêmes catégories d'équipes (triées) pour toutes les tables : la concaténation reste catégorielle"""
+    equipes = set()
+    for df in frames:
+        for colonne in ('home_team', 'away_team'):
+            serie = df[colonne]
+            equipes.update(serie.cat.categories if isinstance(serie.dtype, pd.CategoricalDtype) else serie.unique())
+    categories = pd.CategoricalDtype(sorted(equipes))
+    return [df.astype({'home_team': categories, 'away_team': categories}) for df in frames]
+
+def lire_saison(contenu, taille_morceau=TAILLE_MORCEAU):
+    """
+    CSV brut d'une saison -> DataFrame compact (COLONNES_HISTORIQUE) de ses matchs joués, dans l'ordre
+    du fichier. Le CSV est parsé par morceaux, limité aux colonnes utiles.
+    """
+    try:
+        contenu.decode('utf-8')
+        encodage = 'utf-8-sig'
+    except UnicodeDecodeError:
+        # Anciennes saisons
+        encodage = 'latin-1'
+    lecteur = pd.read_csv(
+        io.BytesIO(contenu), usecols=lambda colonne: colonne in NOMS_COLONNES, dtype=str, encoding=encodage,
+        chunksize=taille_morceau, on_bad_lines='skip'
+    )
+    with lecteur:
+        morceaux = [_compacter(morceau.rename(columns=NOMS_COLONNES)) for morceau in lecteur]
+    if not morceaux:
+        raise ValueError("CSV vide")
+    return _categories_communes([pd.concat(morceaux, ignore_index=True)])[0]
+
+def lire_csv_saison(championnat, saison, cache=None):
+    """CSV brut d'une saison quelconque, servi par le cache disque comme la saison courante"""
+    return (cache or CACHE_DONNEES).lire(url_donnees(championnat, saison))
+
+def ordonner(saisons):
+    """
+    Concatène les saisons {code: DataFrame} d'un championnat dans l'ordre chronologique et numérote
+    match_order : tri stable par saison puis par date, l'ordre du fichier départageant les matchs
+    du même jour. Les matchs sans date restent en fin de leur saison.
+    """
+    codes = sorted(saisons, key=annee_saison)
+    frames = _categories_communes([saisons[code] for code in codes])
+    return _numeroter(pd.concat(frames, ignore_index=True), codes, [len(frame) for frame in frames])
+
+def _numeroter(df, codes, tailles):
+    """Saisons concaténées dans l'ordre de codes (tailles : matchs de chacune) -> tri et match_order"""
+    rang_saison = np.repeat(np.arange(len(codes)), tailles)
+    dates = df['date'].to_numpy(dtype='datetime64[ns]')
+    cle_date = np.where(np.isnat(dates), np.iinfo(np.int64).max, dates.view(np.int64))
+    tri = np.lexsort((cle_date, rang_saison))
+    df = df.iloc[tri].reset_index(drop=True)
+    df['season'] = pd.Categorical.from_codes(rang_saison[tri], categories=codes, ordered=True)
+    df['match_order'] = np.arange(len(df), dtype=np.int32)
+    return df
+
+def charger_saisons(championnat, saisons, cache=None):
+    """Historique compact d'un championnat sur plusieurs saisons, lu depuis la source (sans magasin)"""
+    return ordonner({saison: lire_saison(lire_csv_saison(championnat, saison, cache)) for saison in saisons})
+
+def donnees_entrainement(df, plafond=3.5):
+    """Historique -> table attendue par entrainer_modele (buts plafonnés en float)"""
+    return df.assign(
+        home_goals_adj=df['home_goals'].astype(float).clip(upper=plafond),
+        away_goals_adj=df['away_goals'].astype(float).clip(upper=plafond)
+    )
+
+# --- MAGASIN PARQUET ---
+def _verifier_parquet():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("Le magasin Parquet nécessite le paquet pyarrow (pip install pyarrow)") from e
+
+def _chemin_partition(dossier, championnat, saison):
+    return os.path.join(dossier, f'league={championnat}', f'season={saison}.parquet')
+
+def lire_manifeste(dossier=DOSSIER_MAGASIN):
+    """{championnat: {saison: {'sha256', 'matchs'}}} des partitions écrites (vide si le magasin n'existe pas)"""
+    chemin = os.path.join(dossier, MANIFESTE)
+    if not os.path.exists(chemin):
+        return {}
+    with open(chemin, encoding='utf-8') as f:
+        return json.load(f)
+
+def _ingerer(dossier, championnat, saison, deja, cache):
+    """Télécharge (ou revalide) une saison et réécrit sa partition si le CSV a changé"""
+    contenu = lire_csv_saison(championnat, saison, cache)
+    empreinte = hashlib.sha256(contenu).hexdigest()
+    chemin = _chemin_partition(dossier, championnat, saison)
+    if deja and deja['sha256'] == empreinte and os.path.exists(chemin):
+        return {**deja, 'ecrit': False}
+    df = lire_saison(contenu)
+    # Équipes écrites en dictionnaire Parquet : relues en catégories
+    ecrire_atomique(chemin, lambda temporaire: df.to_parquet(temporaire, index=False))
+    return {'sha256': empreinte, 'matchs': len(df), 'ecrit': True}
+
+def construire_magasin(dossier, championnats, saisons, cache=None, workers=8):
+    """
+    Ingère les saisons des championnats dans le magasin ; les téléchargements et parsings tournent
+    dans un pool de threads. Renvoie le manifeste mis à jour.
+    """
+    _verifier_parquet()
+    manifeste = lire_manifeste(dossier)
+    taches = [(championnat, saison) for championnat in championnats for saison in saisons]
+
+    def ingerer(tache):
+        championnat, saison = tache
+        try:
+            return _ingerer(dossier, championnat, saison, manifeste.get(championnat, {}).get(saison), cache)
+        except (OSError, ValueError) as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        resultats = list(pool.map(ingerer, taches))
+
+    ecrites = 0
+    for (championnat, saison), resultat in zip(taches, resultats):
+        if isinstance(resultat, Exception):
+            print(f"⚠️ {championnat} {saison} ignorée : {resultat}")
+            continue
+        ecrites += resultat.pop('ecrit')
+        manifeste.setdefault(championnat, {})[saison] = resultat
+
+    ecrire_atomique(os.path.join(dossier, MANIFESTE), json.dumps(manifeste, indent=2, sort_keys=True).encode('utf-8'))
+    print(f"💾 Magasin {dossier} : {ecrites} partition(s) écrite(s), "
+          f"{len(taches) - ecrites} inchangée(s) ou indisponible(s)")
+    return manifeste
+
+def lire_magasin(dossier=DOSSIER_MAGASIN, championnats=None, saisons=None):
+    """
+    Historique compact lu dans le magasin : une ligne par match avec league et season (catégories),
+    match_order chronologique propre à chaque championnat. Seules les partitions demandées sont lues.
+    """
+    _verifier_parquet()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    manifeste = lire_manifeste(dossier)
+    frames = []
+    for championnat in championnats or sorted(manifeste):
+        disponibles = manifeste.get(championnat, {})
+        codes = sorted((saison for saison in (saisons or disponibles) if saison in disponibles), key=annee_saison)
+        if not codes:
+            continue
+        # Une table Arrow par championnat (dictionnaires d'équipes unifiés), convertie une seule fois
+        tables = [pq.read_table(_chemin_partition(dossier, championnat, saison)) for saison in codes]
+        df = pa.concat_tables(tables, promote_options='permissive').unify_dictionaries().to_pandas()
+        df = _numeroter(_categories_communes([df])[0], codes, [len(table) for table in tables])
+        frames.append(df.assign(league=championnat))
+    if not frames:
+        raise FileNotFoundError(f"Aucune partition correspondante dans {dossier}")
+    df = pd.concat(_categories_communes(frames), ignore_index=True)
+    # Catégories de saisons communes à tous les championnats, dans l'ordre chronologique
+    codes = sorted({saison for frame in frames for saison in frame['season'].cat.categories}, key=annee_saison)
+    return df.astype({
+        'league': 'category', 'season': pd.CategoricalDtype(codes, ordered=True)
+    })
+
+def charger_historique(championnat, saisons, dossier=DOSSIER_MAGASIN, cache=None):
+    """
+    Historique d'un championnat : lu dans le magasin s'il contient toutes les saisons demandées,
+    sinon ingéré depuis la source (cache disque des CSV).
+    """
+    disponibles = lire_manifeste(dossier).get(championnat, {})
+    if all(saison in disponibles for saison in saisons):
+        return lire_magasin(dossier, [championnat], saisons).drop(columns='league')
+    return charger_saisons(championnat, saisons, cache)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Historique multi-saisons : magasin Parquet par championnat et saison")
+    sous_commandes = parser.add_subparsers(dest='commande', required=True)
+    build = sous_commandes.add_parser('build', help="Télécharge les saisons et écrit les partitions modifiées")
+    build.add_argument('--seasons', type=plage_saisons, required=True, help="Années de début : 2005-2025")
+    build.add_argument('--leagues', nargs='+', default=list(CHAMPIONNATS), help="Divisions football-data (défaut : les 5 championnats)")
+    build.add_argument('--workers', type=int, default=8, help="Téléchargements simultanés")
+    info = sous_commandes.add_parser('info', help="Charge le magasin et affiche son contenu")
+    info.add_argument('--seasons', type=plage_saisons, help="Années de début : 2005-2025 (défaut : toutes)")
+    info.add_argument('--leagues', nargs='+', help="Divisions (défaut : toutes)")
+    for sous_parser in (build, info):
+        sous_parser.add_argument('--store', default=DOSSIER_MAGASIN, help="Dossier du magasin (défaut : FOOT_HISTORIQUE ou historique)")
+    args = parser.parse_args(argv)
+
+    if args.commande == 'build':
+        debut = time.perf_counter()
+        construire_magasin(args.store, args.leagues, args.seasons, workers=args.workers)
+        print(f"⏱️ Construction en {time.perf_counter() - debut:.1f}s")
+        return 0
+
+    debut = time.perf_counter()
+    df = lire_magasin(args.store, args.leagues, args.seasons)
+    duree = time.perf_counter() - debut
+    memoire = df.memory_usage(deep=True).sum()
+    print(f"📚 {len(df)} matchs chargés en {duree * 1000:.0f} ms ({memoire / 1e6:.1f} Mo en mémoire)")
+    resume = df.groupby('league', observed=True).agg(
+        saisons=('season', 'nunique'), premiere=('season', 'min'), derniere=('season', 'max'),
+        matchs=('match_order', 'size'), equipes=('home_team', 'nunique')
+    )
+    print(resume.to_string())
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
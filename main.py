@@ -1,139 +1,252 @@
-import pandas as pd
-import numpy as np
+"""
+Ligne de commande : prédiction d'un match, lots d'affiches, entraînement et snapshot.
 
+Les dépendances lourdes sont importées à la demande. Avec un snapshot (python main.py snapshot build),
+predict et batch n'importent ni pandas ni Flask : seul NumPy est chargé. Sans snapshot, le modèle est
+entraîné depuis un CSV local (--csv, pour le championnat --league seulement) ou depuis le cache des
+données (import de pandas).
 
-df = pd.read_csv('https://www.football-data.co.uk/mmz4281/2526/SP1.csv')
-df = df[['HomeTeam', 'AwayTeam', 'FTHG', 'FTAG']]
-df.columns = ['home_team', 'away_team', 'home_goals', 'away_goals']
+Usage :
+    python main.py predict "Real Madrid" Barcelona --league SP1 [--engine exact] [-n 10000] [--seed 1] [--json]
+    python main.py batch affiches.jsonl [--league F1] [--engine exact] > predictions.jsonl
+    python main.py train --league SP1 [--csv SP1.csv] [--span 10] [--cap 3.5] [--model dixon_coles]
+    python main.py snapshot build [--output modeles.npy]
 
-# --- ASTUCE PRO : On "cap" les scores pour réduire l'impact des cartons ---
-# Un 4-0 ou un 5-0 ne veut pas dire que l'équipe est 5x plus forte, 
-# souvent l'adversaire a juste lâché l'affaire à 2-0.
-df['home_goals_adj'] = df['home_goals'].clip(upper=3.5) 
-df['away_goals_adj'] = df['away_goals'].clip(upper=3.5)
+Le fichier d'affiches de batch (ou - pour l'entrée standard) contient une affiche par ligne, en
+JSON ({"home_team": ..., "away_team": ..., "league": ...}) ou en CSV avec en-tête
+(home_team,away_team[,league]). Une ligne JSON par prédiction est écrite sur la sortie standard.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
 
-# Ajouter un index pour garder l'ordre chronologique
-df['match_order'] = range(len(df))
+# Affiches prédites par passe vectorisée en mode batch
+TAILLE_BLOC = 1000
 
-def entrainer_modele_buts(df, span=10):
+def charger_modele(championnat, snapshot=None, csv_local=None):
     """
-    Entraîne le modèle avec EWMA (Exponentially Weighted Moving Average)
-    span=10 : donne un poids plus important aux matchs récents
+    {'forces', 'avg_home', 'avg_away', 'parametres', 'rho'} du championnat : lu dans le snapshot s'il le contient,
+    sinon entraîné depuis le CSV local ou le cache des données.
     """
-    # Moyennes globales (toutes les données)
-    avg_h = df['home_goals_adj'].mean()
-    avg_a = df['away_goals_adj'].mean()
-    
-    stats_globales = pd.DataFrame()
-    
-    # Traiter DOMICILE : En groupant par home_team
-    for team in df['home_team'].unique():
-        mask = df['home_team'] == team
-        home_data = df[mask].copy().sort_values('match_order')
-        
-        if len(home_data) > 0:
-            # EWMA pour l'attaque et la défense à domicile
-            att_ewma = home_data['home_goals_adj'].ewm(span=span).mean().iloc[-1]
-            def_ewma = home_data['away_goals_adj'].ewm(span=span).mean().iloc[-1]
-            
-            stats_globales.loc[team, 'attaque_domicile'] = att_ewma
-            stats_globales.loc[team, 'defense_domicile'] = def_ewma
-    
-    # Traiter EXTÉRIEUR : En groupant par away_team
-    for team in df['away_team'].unique():
-        mask = df['away_team'] == team
-        away_data = df[mask].copy().sort_values('match_order')
-        
-        if len(away_data) > 0:
-            # EWMA pour l'attaque et la défense à l'extérieur
-            att_ewma = away_data['away_goals_adj'].ewm(span=span).mean().iloc[-1]
-            def_ewma = away_data['home_goals_adj'].ewm(span=span).mean().iloc[-1]
-            
-            stats_globales.loc[team, 'attaque_exterieur'] = att_ewma
-            stats_globales.loc[team, 'defense_exterieur'] = def_ewma
-    
-    # Remplir les valeurs manquantes avec les moyennes globales (si équipe sans match)
-    stats_globales = stats_globales.fillna(avg_h)
-    
-    # Calcul des Forces (séparation domicile/extérieur)
-    stats_globales['force_att_domicile'] = stats_globales['attaque_domicile'] / avg_h
-    stats_globales['force_att_exterieur'] = stats_globales['attaque_exterieur'] / avg_a
-    stats_globales['faibl_def_domicile'] = stats_globales['defense_domicile'] / avg_a
-    stats_globales['faibl_def_exterieur'] = stats_globales['defense_exterieur'] / avg_h
-    
-    return stats_globales, avg_h, avg_a
-
-# Le reste (Simulation) est IDENTIQUE au code précédent...
-# La fonction de simulation attend juste des chiffres, elle se fiche de savoir si c'est des buts ou des xG.
-
-# On lance l'entraînement avec EWMA (span=10)
-stats_equipes, avg_home, avg_away = entrainer_modele_buts(df, span=10)
-
-# Avantage domicile (coefficient empirique ~15% d'augmentation des buts)
-home_advantage = 1.15
-
-# ---------------------------------------------------------
-# 3. LA PRÉDICTION ET LA SIMULATION
-# ---------------------------------------------------------
-
-def predire_et_simuler(equipe_dom, equipe_ext, stats, avg_h, avg_a, n_simulations=10000):
-    
-    # --- ÉTAPE A : Calcul des Buts Projetés (Attendus) ---
-    # Utilise les forces séparées domicile/extérieur basées sur l'EWMA
-    
-    # Formule : (Force Attaque Domicile * Faiblesse Défense Extérieur) * Moyenne Domicile * Avantage Domicile
-    force_att_dom = stats.loc[equipe_dom, 'force_att_domicile']
-    faibl_def_ext = stats.loc[equipe_ext, 'faibl_def_exterieur']
-    buts_projetes_dom = force_att_dom * faibl_def_ext * avg_h
-    
-    # Formule : (Force Attaque Extérieur * Faiblesse Défense Domicile) * Moyenne Extérieur
-    force_att_ext = stats.loc[equipe_ext, 'force_att_exterieur']
-    faibl_def_dom = stats.loc[equipe_dom, 'faibl_def_domicile']
-    buts_projetes_ext = force_att_ext * faibl_def_dom * avg_a
-    
-    print(f"--- PRÉDICTION BUTS ATTENDUS ---")
-    print(f"{equipe_dom} (buts attendus): {buts_projetes_dom:.2f}")
-    print(f"{equipe_ext} (buts attendus): {buts_projetes_ext:.2f}")
-    
-    # --- ÉTAPE B : La Simulation Monte Carlo (Loi de Poisson) ---
-    
-    # On simule 10 000 matchs virtuels avec ces moyennes
-    buts_simules_dom = np.random.poisson(buts_projetes_dom, n_simulations)
-    buts_simules_ext = np.random.poisson(buts_projetes_ext, n_simulations)
-    
-    # On compte les résultats
-    victoires_dom = np.sum(buts_simules_dom > buts_simules_ext)
-    nuls = np.sum(buts_simules_dom == buts_simules_ext)
-    victoires_ext = np.sum(buts_simules_dom < buts_simules_ext)
-    
-    # Conversion en pourcentages
-    prob_1 = (victoires_dom / n_simulations) * 100
-    prob_N = (nuls / n_simulations) * 100
-    prob_2 = (victoires_ext / n_simulations) * 100
-    
-    return prob_1, prob_N, prob_2
-
-# ---------------------------------------------------------
-# 4. TEST DU MODÈLE
-# ---------------------------------------------------------
-
-try:
-    # Prédiction : Lille vs Brest
-    p1, pN, p2 = predire_et_simuler('Real Madrid', 'Barcelona', stats_equipes, avg_home, avg_away)
-
-    print(f"\n--- RÉSULTATS SIMULATION (10 000 matchs) ---")
-    print(f"Victoire Real: {p1:.1f}%")
-    print(f"Match Nul :        {pN:.1f}%")
-    print(f"Victoire Barca: {p2:.1f}%")
-    
-    # Calcul des cotes justes (Fair Odds)
-    print(f"\n--- COTES DU MODÈLE ---")
-    print(f"Cote 1 (Lille): {100/p1:.2f}")
-    print(f"Cote N (Nul)     : {100/pN:.2f}")
-    print(f"Cote 2 (Brest): {100/p2:.2f}")
-
-
-except KeyError as e:
-    print(f"Erreur : Une équipe n'est pas dans la base de données ({e})")
-    print("\n--- ÉQUIPES DISPONIBLES ---")
-    print(stats_equipes.index.tolist())
\ No newline at end of file
+    chemin = snapshot or os.getenv('FOOT_SNAPSHOT', 'modeles.npy')
+    if csv_local is None and (snapshot or os.path.exists(chemin)):
+        from snapshot import lire_modele_snapshot
+        modele = lire_modele_snapshot(chemin, championnat)
+        if modele is not None:
+            return modele
+
+    from modele import lire_csv_brut, preparer_donnees, ajuster_modele, forces_equipes, parametres_championnat
+    parametres = parametres_championnat(championnat)
+    if csv_local is None:
+        contenu = lire_csv_brut(championnat)
+    else:
+        with open(csv_local, 'rb') as f:
+            contenu = f.read()
+    stats, avg_h, avg_a, rho = ajuster_modele(
+        preparer_donnees(contenu, parametres['plafond']), parametres['span'], parametres['type_modele']
+    )
+    return {'forces': forces_equipes(stats), 'avg_home': avg_h, 'avg_away': avg_a, 'parametres': parametres, 'rho': rho}
+
+def lire_affiches(flux):
+    """Affiches brutes lues au fil de l'eau (JSON lines ou CSV avec en-tête) ; None pour une ligne JSON illisible"""
+    lignes = (ligne for ligne in flux if ligne.strip())
+    premiere = next(lignes, None)
+    if premiere is None:
+        return
+    if premiere.lstrip().startswith('{'):
+        for ligne in _chainer(premiere, lignes):
+            try:
+                yield json.loads(ligne)
+            except ValueError:
+                yield None
+    else:
+        yield from csv.DictReader(_chainer(premiere, lignes))
+
+def _chainer(premiere, suite):
+    yield premiere
+    yield from suite
+
+def predire_bloc(affiches, modeles, args):
+    """Prédictions d'un bloc d'affiches, dans l'ordre : une passe vectorisée par championnat"""
+    from modele import affiches_connues, buts_attendus, predire_affiches, regrouper_affiches
+
+    affiches, resultats, par_championnat = regrouper_affiches(affiches, args.league)
+    for championnat, indices in par_championnat.items():
+        if championnat not in modeles:
+            # --csv ne concerne que le championnat --league ; les autres viennent du snapshot ou du cache
+            csv_local = args.csv if championnat == args.league else None
+            modeles[championnat] = charger_modele(championnat, args.snapshot, csv_local)
+        modele = modeles[championnat]
+        valides = affiches_connues(affiches, indices, modele['forces'], resultats)
+        if not valides:
+            continue
+
+        buts_dom, buts_ext = buts_attendus(
+            modele['forces'], modele['avg_home'], modele['avg_away'],
+            [affiches[i]['home_team'] for i in valides], [affiches[i]['away_team'] for i in valides],
+            modele['parametres']['avantage_domicile']
+        )
+        predictions = predire_affiches(
+            buts_dom, buts_ext, args.simulations, args.engine, marches=args.markets or (),
+            generateur=args.generateur, tolerance=args.tolerance, rho=modele['rho']
+        )
+        for i, prediction in zip(valides, predictions):
+            resultats[i] = {**affiches[i], **prediction}
+    return resultats
+
+def commande_predict(args):
+    from modele import predire_et_simuler
+
+    modele = charger_modele(args.league, args.snapshot, args.csv)
+    forces = modele['forces']
+    for equipe in (args.home_team, args.away_team):
+        if equipe not in forces:
+            print(f"Erreur : l'équipe '{equipe}' n'existe pas. Équipes disponibles :", file=sys.stderr)
+            print(', '.join(sorted(forces.equipes)), file=sys.stderr)
+            return 1
+
+    resultat = predire_et_simuler(
+        args.home_team, args.away_team, forces, modele['avg_home'], modele['avg_away'], args.simulations,
+        args.engine, avantage_domicile=modele['parametres']['avantage_domicile'], marches=args.markets or (),
+        generateur=args.generateur, tolerance=args.tolerance, rho=modele['rho']
+    )
+    if args.json:
+        print(json.dumps(
+            {'league': args.league, 'home_team': args.home_team, 'away_team': args.away_team, **resultat},
+            ensure_ascii=False
+        ))
+        return 0
+
+    print("--- PRÉDICTION BUTS ATTENDUS ---")
+    print(f"{args.home_team} (buts attendus): {resultat['buts_dom']:.2f}")
+    print(f"{args.away_team} (buts attendus): {resultat['buts_ext']:.2f}")
+    print(f"\n--- PROBABILITÉS ({args.engine}) ---")
+    print(f"Victoire {args.home_team}: {resultat['prob_1']:.1f}%  (cote {resultat['cote_1']})")
+    print(f"Match nul: {resultat['prob_N']:.1f}%  (cote {resultat['cote_N']})")
+    print(f"Victoire {args.away_team}: {resultat['prob_2']:.1f}%  (cote {resultat['cote_2']})")
+    if 'marches' in resultat:
+        print(json.dumps(resultat['marches'], ensure_ascii=False, indent=2))
+    return 0
+
+def commande_batch(args):
+    flux = sys.stdin if args.fixtures == '-' else open(args.fixtures, encoding='utf-8')
+    modeles = {}
+    bloc = []
+    try:
+        for affiche in lire_affiches(flux):
+            bloc.append(affiche)
+            if len(bloc) >= TAILLE_BLOC:
+                ecrire_lignes(predire_bloc(bloc, modeles, args))
+                bloc = []
+        if bloc:
+            ecrire_lignes(predire_bloc(bloc, modeles, args))
+    finally:
+        if flux is not sys.stdin:
+            flux.close()
+    return 0
+
+def ecrire_lignes(resultats):
+    sys.stdout.write(''.join(json.dumps(resultat, ensure_ascii=False) + '\n' for resultat in resultats))
+    sys.stdout.flush()
+
+def commande_train(args):
+    import time
+    from modele import CHAMPIONNATS, lire_csv_brut, preparer_donnees, ajuster_modele, parametres_championnat
+
+    parametres = parametres_championnat(args.league)
+    span = args.span or parametres['span']
+    plafond = args.cap or parametres['plafond']
+    type_modele = args.model or parametres['type_modele']
+    if args.csv is None:
+        contenu = lire_csv_brut(args.league)
+    else:
+        with open(args.csv, 'rb') as f:
+            contenu = f.read()
+
+    debut = time.perf_counter()
+    df = preparer_donnees(contenu, plafond)
+    stats, avg_h, avg_a, rho = ajuster_modele(df, span, type_modele)
+    print(f"✅ {CHAMPIONNATS[args.league]} : {len(df)} matchs, {len(stats)} équipes "
+          f"({type_modele}, span {span}, plafond {plafond:g}) en {time.perf_counter() - debut:.2f}s")
+    print(f"Moyennes : {avg_h:.3f} buts à domicile, {avg_a:.3f} à l'extérieur"
+          + (f", rho {rho:.3f}" if type_modele == 'dixon_coles' else '') + "\n")
+    print(stats.sort_values('force_att_domicile', ascending=False).round(3).to_string())
+    return 0
+
+def entier_positif(valeur):
+    """Type argparse : entier >= 1 (0 simulation donnerait des probabilités NaN)"""
+    try:
+        nombre = int(valeur)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"entier attendu : {valeur}")
+    if nombre < 1:
+        raise argparse.ArgumentTypeError(f"doit être au moins 1 : {valeur}")
+    return nombre
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prédiction de matchs de football (EWMA + Poisson ou Dixon-Coles)")
+    sous_commandes = parser.add_subparsers(dest='commande', required=True)
+
+    def options_modele(sous_parser):
+        sous_parser.add_argument('--league', default=None, help="Championnat (défaut : F1)")
+        sous_parser.add_argument(
+            '--csv', help="CSV football-data local du championnat --league (au lieu du snapshot et du cache)"
+        )
+
+    def options_prediction(sous_parser):
+        options_modele(sous_parser)
+        sous_parser.add_argument('--snapshot', help="Snapshot des modèles (défaut : FOOT_SNAPSHOT ou modeles.npy)")
+        sous_parser.add_argument('--engine', default='montecarlo', help="montecarlo ou exact")
+        sous_parser.add_argument('-n', '--simulations', type=entier_positif, default=10000)
+        sous_parser.add_argument('--seed', type=int, help="Graine des tirages (résultats reproductibles)")
+        sous_parser.add_argument('--tolerance', type=float, help="Monte Carlo adaptatif : erreur standard visée (points de %%)")
+        sous_parser.add_argument('--markets', nargs='+', help="over_under btts correct_score asian_handicap")
+
+    predict = sous_commandes.add_parser('predict', help="Prédit un match")
+    predict.add_argument('home_team')
+    predict.add_argument('away_team')
+    options_prediction(predict)
+    predict.add_argument('--json', action='store_true', help="Résultat en JSON")
+
+    batch = sous_commandes.add_parser('batch', help="Prédit un fichier d'affiches (JSON lines en sortie)")
+    batch.add_argument('fixtures', help="Fichier d'affiches (JSON lines ou CSV), - pour l'entrée standard")
+    options_prediction(batch)
+
+    train = sous_commandes.add_parser('train', help="Entraîne un championnat et affiche les forces des équipes")
+    options_modele(train)
+    train.add_argument('--span', type=int, help="Span EWMA (défaut : configuration du championnat)")
+    train.add_argument('--cap', type=float, help="Plafond de buts (défaut : configuration du championnat)")
+    train.add_argument('--model', help="ewma ou dixon_coles (défaut : configuration du championnat)")
+
+    snapshot = sous_commandes.add_parser('snapshot', help="Snapshot des modèles : build | check (voir snapshot.py)")
+    snapshot.add_argument('arguments', nargs=argparse.REMAINDER)
+
+    args = parser.parse_args(argv)
+    if args.commande == 'snapshot':
+        import snapshot as module_snapshot
+        return module_snapshot.main(args.arguments)
+
+    from modele import CHAMPIONNATS, CHAMPIONNAT_DEFAUT, MOTEURS, MARCHES, TYPES_MODELE, generateur_aleatoire
+    args.league = args.league or CHAMPIONNAT_DEFAUT
+    if args.league not in CHAMPIONNATS:
+        parser.error(f"championnat invalide : {args.league} (choix : {', '.join(CHAMPIONNATS)})")
+    if args.commande == 'train':
+        if args.model is not None and args.model not in TYPES_MODELE:
+            parser.error(f"modèle invalide : {args.model} (choix : {', '.join(TYPES_MODELE)})")
+        return commande_train(args)
+
+    if args.engine not in MOTEURS:
+        parser.error(f"moteur invalide : {args.engine} (choix : {', '.join(MOTEURS)})")
+    if any(marche not in MARCHES for marche in args.markets or ()):
+        parser.error(f"marché invalide (choix : {', '.join(MARCHES)})")
+    if args.tolerance is not None and args.tolerance <= 0:
+        parser.error("la tolérance doit être positive")
+    args.generateur = generateur_aleatoire(args.seed)
+    if args.commande == 'predict':
+        return commande_predict(args)
+    return commande_batch(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Compteurs et histogrammes de latence, exportés au format texte Prometheus (/metrics).
+
+- Mesures en mémoire du processus, protégées par un verrou : chaque worker gunicorn expose les
+  siennes (Prometheus les agrège par instance).
+- Les histogrammes ont des seuils fixes (secondes) ; une observation coûte une recherche
+  dichotomique et une addition.
+- Désactivées (FOOT_METRIQUES=0), incrementer / observer reviennent immédiatement et chrono
+  renvoie un contexte vide partagé : le surcoût sur le chemin critique est négligeable.
+- Les valeurs tenues ailleurs (compteurs du cache de réponses, versions des modèles) sont lues au
+  moment de l'export par des collecteurs.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+SEUILS_DEFAUT = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TYPE_CONTENU = 'text/plain; version=0.0.4; charset=utf-8'
+
+DESCRIPTIONS = {
+    'foot_requete_duree_secondes': "Durée des requêtes HTTP par route et championnat",
+    'foot_requetes_total': "Requêtes HTTP par route et code de statut",
+    'foot_etape_duree_secondes': "Durée des étapes : fetch, parse, train, lookup, simulate, serialize",
+    'foot_chargement_duree_secondes': "Durée d'un chargement de championnat (téléchargement, entraînement, publication)",
+    'foot_chargements_total': "Chargements de championnat par mode (chargement, rafraichissement, erreur)",
+    'foot_publications_total': "Versions de modèle publiées par championnat",
+    'foot_csv_total': "Lectures de CSV par résultat (telecharge, inchange, repli, hors_ligne)"
+}
+
+_INACTIF = nullcontext()
+
+def _echapper(valeur):
+    return str(valeur).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _etiquettes(paires):
+    if not paires:
+        return ''
+    return '{' + ','.join(f'{nom}="{_echapper(valeur)}"' for nom, valeur in paires) + '}'
+
+def _nombre(valeur):
+    if valeur == float('inf'):
+        return '+Inf'
+    return repr(float(valeur)) if isinstance(valeur, float) else str(valeur)
+
+class _Chrono:
+    """Contexte qui observe sa durée dans un histogramme"""
+    __slots__ = ('metriques', 'nom', 'etiquettes', 'debut')
+
+    def __init__(self, metriques, nom, etiquettes):
+        self.metriques = metriques
+        self.nom = nom
+        self.etiquettes = etiquettes
+
+    def __enter__(self):
+        self.debut = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metriques.observer(self.nom, time.perf_counter() - self.debut, **self.etiquettes)
+        return False
+
+class Metriques:
+    """Registre de compteurs et d'histogrammes, exportable au format Prometheus"""
+
+    def __init__(self, actif=True, seuils=SEUILS_DEFAUT):
+        self.actif = actif
+        self.seuils = tuple(seuils)
+        self._compteurs = {}
+        # (nom, étiquettes) -> [comptes par seuil..., compte +Inf, somme]
+        self._histogrammes = {}
+        self._collecteurs = []
+        self._verrou = threading.Lock()
+
+    def incrementer(self, nom, valeur=1, **etiquettes):
+        if not self.actif:
+            return
+        cle = (nom, tuple(sorted(etiquettes.items())))
+        with self._verrou:
+            self._compteurs[cle] = self._compteurs.get(cle, 0) + valeur
+
+    def observer(self, nom, duree, **etiquettes):
+        if not self.actif:
+            return
+        cle = (nom, tuple(sorted(etiquettes.items())))
+        i = bisect_left(self.seuils, duree)
+        with self._verrou:
+            histogramme = self._histogrammes.get(cle)
+            if histogramme is None:
+                histogramme = self._histogrammes[cle] = [0] * (len(self.seuils) + 1) + [0.0]
+            histogramme[i] += 1
+            histogramme[-1] += duree
+
+    def chrono(self, nom, **etiquettes):
+        """with metriques.chrono('foot_etape_duree_secondes', etape='simulate'): ..."""
+        if not self.actif:
+            return _INACTIF
+        return _Chrono(self, nom, etiquettes)
+
+    def collecter(self, fonction):
+        """
+        fonction() -> [(nom, type, description, [(étiquettes dict, valeur)])], appelée à chaque export
+        pour les valeurs tenues ailleurs
+        """
+        self._collecteurs.append(fonction)
+
+    def reinitialiser(self):
+        with self._verrou:
+            self._compteurs.clear()
+            self._histogrammes.clear()
+
+    def exporter(self):
+        """Texte d'exposition Prometheus (format 0.0.4)"""
+        with self._verrou:
+            compteurs = dict(self._compteurs)
+            histogrammes = {cle: list(valeurs) for cle, valeurs in self._histogrammes.items()}
+
+        familles = {}
+        for (nom, paires), valeur in compteurs.items():
+            familles.setdefault(nom, ('counter', DESCRIPTIONS.get(nom, nom), []))[2].append(
+                (nom, paires, valeur)
+            )
+        for (nom, paires), valeurs in histogrammes.items():
+            lignes = familles.setdefault(nom, ('histogram', DESCRIPTIONS.get(nom, nom), []))[2]
+            cumul = 0
+            for seuil, compte in zip(self.seuils + (float('inf'),), valeurs[:-1]):
+                cumul += compte
+                lignes.append((f'{nom}_bucket', paires + (('le', _nombre(float(seuil))),), cumul))
+            lignes.append((f'{nom}_sum', paires, valeurs[-1]))
+            lignes.append((f'{nom}_count', paires, cumul))
+        for fonction in self._collecteurs:
+            for nom, type_, description, echantillons in fonction():
+                familles.setdefault(nom, (type_, description, []))[2].extend(
+                    (nom, tuple(sorted(etiquettes.items())), valeur) for etiquettes, valeur in echantillons
+                )
+
+        sortie = []
+        for nom in sorted(familles):
+            type_, description, lignes = familles[nom]
+            sortie.append(f'# HELP {nom} {description}')
+            sortie.append(f'# TYPE {nom} {type_}')
+            sortie.extend(f'{serie}{_etiquettes(paires)} {_nombre(valeur)}' for serie, paires, valeur in lignes)
+        return '\n'.join(sortie) + '\n'
+
+METRIQUES = Metriques(actif=os.getenv('FOOT_METRIQUES', '1') == '1')
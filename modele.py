@@ -0,0 +1,941 @@
+"""
+Cœur du modèle : chargement des données, entraînement EWMA et prédiction.
+Sans Flask ni effet de bord à l'import, partagé par app.py et les outils en ligne de commande.
+"""
+import hashlib
+import importlib
+import io
+import json
+import os
+import threading
+import numpy as np
+
+from cache_donnees import cache_depuis_env
+from metriques import METRIQUES
+
+class _ModuleDiffere:
+    """Module importé au premier accès : pandas (~0,4 s) ne sert qu'à lire et entraîner, pas à prédire"""
+
+    def __init__(self, nom):
+        self._nom = nom
+
+    def __getattr__(self, attribut):
+        return getattr(importlib.import_module(self._nom), attribut)
+
+pd = _ModuleDiffere('pandas')
+
+CHAMPIONNATS = {
+    'F1': 'Ligue 1 (France)',
+    'E0': 'Premier League (Angleterre)',
+    'SP1': 'LaLiga (Espagne)',
+    'D1': 'Bundesliga (Allemagne)',
+    'I1': 'Serie A (Italie)'
+}
+CHAMPIONNAT_DEFAUT = 'F1'
+MOTEURS = ('montecarlo', 'exact')
+MAX_BUTS = 10
+MARCHES = ('over_under', 'btts', 'correct_score', 'asian_handicap')
+LIGNES_OVER_UNDER = (0.5, 1.5, 2.5, 3.5, 4.5)
+# Handicap appliqué à l'équipe à domicile, de -2.5 à +2.5 par quarts : lignes entières, demies et en quart
+LIGNES_HANDICAP = tuple(quart / 4 for quart in range(-10, 11))
+MAX_BUTS_SCORE_EXACT = 5
+# Monte Carlo adaptatif : tirages par lot et plafond par match
+TAILLE_LOT_ADAPTATIF = 4000
+MAX_SIMULATIONS_ADAPTATIF = 1000000
+COLONNES_STATS = [
+    'attaque_domicile', 'defense_domicile', 'attaque_exterieur', 'defense_exterieur',
+    'force_att_domicile', 'force_att_exterieur', 'faibl_def_domicile', 'faibl_def_exterieur'
+]
+# Colonnes de ForcesEquipes.forces, dans l'ordre des calculs de buts attendus
+COLONNES_FORCES = ('force_att_domicile', 'faibl_def_exterieur', 'force_att_exterieur', 'faibl_def_domicile')
+# Modèle des forces : EWMA + Poisson indépendants, ou Dixon-Coles (dixon_coles.py)
+TYPES_MODELE = ('ewma', 'dixon_coles')
+PARAMETRES_DEFAUT = {'span': 10, 'plafond': 3.5, 'avantage_domicile': 1.0, 'type_modele': 'ewma'}
+CHEMIN_CONFIG = os.getenv('FOOT_CONFIG_MODELES', 'config_modeles.json')
+# Saison au format football-data : '2526' pour 2025-2026
+SAISON_COURANTE = os.getenv('FOOT_SAISON', '2526')
+URL_DONNEES = os.getenv('FOOT_URL_DONNEES', 'https://www.football-data.co.uk/mmz4281/{saison}/{championnat}.csv')
+# Colonnes lues dans les CSV football-data (une centaine de colonnes de cotes sont ignorées au parsing)
+COLONNES_CSV = ('Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG')
+CACHE_DONNEES = cache_depuis_env()
+
+# Flux aléatoires : une racine SeedSequence, un flux PCG64 indépendant par thread (FOOT_GRAINE pour rejouer)
+_RACINE_ALEATOIRE = np.random.SeedSequence(int(os.environ['FOOT_GRAINE']) if os.getenv('FOOT_GRAINE') else None)
+_VERROU_ALEATOIRE = threading.Lock()
+_FLUX_THREAD = threading.local()
+
+def _reinitialiser_flux():
+    """Après un fork (workers gunicorn) : flux propres au processus, jamais ceux hérités du maître"""
+    global _RACINE_ALEATOIRE, _VERROU_ALEATOIRE, _FLUX_THREAD
+    _RACINE_ALEATOIRE = np.random.SeedSequence(
+        _RACINE_ALEATOIRE.entropy, spawn_key=(*_RACINE_ALEATOIRE.spawn_key, os.getpid())
+    )
+    _VERROU_ALEATOIRE = threading.Lock()
+    _FLUX_THREAD = threading.local()
+
+os.register_at_fork(after_in_child=_reinitialiser_flux)
+
+# --- CHARGEMENT DES DONNÉES ---
+def url_donnees(championnat, saison=None):
+    """URL du CSV d'une saison (défaut : la saison courante)"""
+    return URL_DONNEES.format(championnat=championnat, saison=saison or SAISON_COURANTE)
+
+def lire_csv_brut(championnat=CHAMPIONNAT_DEFAUT, cache=None):
+    """CSV brut de la saison, servi par le cache disque (revalidé par requête conditionnelle)"""
+    if championnat not in CHAMPIONNATS:
+        raise ValueError("Championnat invalide")
+    with METRIQUES.chrono('foot_etape_duree_secondes', etape='fetch'):
+        return (cache or CACHE_DONNEES).lire(url_donnees(championnat))
+
+def empreinte_donnees(contenu):
+    """Empreinte SHA-256 d'un CSV brut, pour détecter un modèle périmé"""
+    return hashlib.sha256(contenu).hexdigest()
+
+def ordre_chronologique(dates):
+    """
+    Rang chronologique de chaque ligne : tri stable par date, l'ordre du fichier départageant les
+    matchs du même jour. Les lignes sans date gardent leur place relative, après les autres.
+    """
+    tri = np.argsort(np.asarray(dates, dtype='datetime64[ns]'), kind='stable')
+    ordre = np.empty(len(tri), dtype=np.int64)
+    ordre[tri] = np.arange(len(tri))
+    return ordre
+
+def lire_dates(dates):
+    """Dates football-data (jj/mm/aaaa, ou jj/mm/aa dans les anciennes saisons) ; NaT si illisible"""
+    dates = pd.Series(dates, dtype=object)
+    courtes = dates.str.len() <= 8
+    resultat = pd.to_datetime(dates.where(~courtes), format='%d/%m/%Y', errors='coerce')
+    if courtes.any():
+        resultat = resultat.fillna(pd.to_datetime(dates.where(courtes), format='%d/%m/%y', errors='coerce'))
+    return resultat
+
+def preparer_donnees(contenu, plafond=3.5):
+    df = pd.read_csv(io.BytesIO(contenu), usecols=lambda colonne: colonne in COLONNES_CSV, dtype={'Date': str})
+    df = df.rename(columns={
+        'Date': 'date', 'HomeTeam': 'home_team', 'AwayTeam': 'away_team', 'FTHG': 'home_goals', 'FTAG': 'away_goals'
+    })
+    
+    df['home_goals_adj'] = df['home_goals'].clip(upper=plafond) 
+    df['away_goals_adj'] = df['away_goals'].clip(upper=plafond)
+    # Ordre chronologique plutôt que l'ordre des lignes du fichier (matchs reportés)
+    if 'date' in df:
+        df['date'] = lire_dates(df['date'])
+        df['match_order'] = ordre_chronologique(df['date'])
+    else:
+        df['match_order'] = range(len(df))
+    
+    return df
+
+def charger_donnees(championnat=CHAMPIONNAT_DEFAUT, cache=None, plafond=3.5):
+    return preparer_donnees(lire_csv_brut(championnat, cache), plafond)
+
+def parametres_championnat(championnat, chemin=None):
+    """
+    Paramètres du modèle d'un championnat (span EWMA, plafond de buts, avantage domicile, type de modèle) :
+    valeurs par défaut, surchargées par le fichier de configuration écrit par tuning.py.
+    """
+    chemin = chemin or CHEMIN_CONFIG
+    config = {}
+    if os.path.exists(chemin):
+        with open(chemin, encoding='utf-8') as f:
+            config = json.load(f).get(championnat, {})
+    parametres = completer_parametres({cle: config[cle] for cle in PARAMETRES_DEFAUT if cle in config})
+    if parametres['type_modele'] not in TYPES_MODELE:
+        raise ValueError(f"Type de modèle invalide pour {championnat} : {parametres['type_modele']}")
+    return parametres
+
+def completer_parametres(parametres=None):
+    """
+    Paramètres complétés par PARAMETRES_DEFAUT. Dixon-Coles estime son avantage domicile, déjà inclus
+    dans avg_home : avantage_domicile y vaut toujours 1.0, pour ne pas le compter deux fois.
+    """
+    parametres = {**PARAMETRES_DEFAUT, **(parametres or {})}
+    if parametres['type_modele'] == 'dixon_coles':
+        parametres['avantage_domicile'] = 1.0
+    return parametres
+
+# --- ENTRAÎNEMENT ---
+def _replier_serie(serie, equipes, ordre, valeurs, span):
+    """
+    Replie de nouveaux matchs dans l'état EWMA (adjust=True) d'une série domicile ou extérieur.
+
+    L'état d'une équipe est la somme pondérée S et le poids de normalisation W de ses matchs,
+    la moyenne EWMA valant S / W. Après k nouveaux matchs x_0..x_(k-1) :
+        S' = S * (1 - alpha)^k + somme_r (1 - alpha)^(k-1-r) * x_r    (W' idem avec x_r = 1)
+    Un but manquant vieillit la série sans y contribuer (ignore_na=False de pandas).
+    Partir d'un état vide revient à l'entraînement complet, en une seule passe NumPy.
+    """
+    codes, uniques = pd.factorize(equipes)
+    valide = codes >= 0
+    codes = codes[valide]
+    ordre = np.asarray(ordre)[valide]
+    valeurs = np.asarray(valeurs, dtype=float)[valide]
+
+    # Rang chronologique de chaque nouveau match dans la série de son équipe
+    tri = np.lexsort((ordre, codes))
+    n_matchs = np.bincount(codes, minlength=len(uniques))
+    rang = np.empty(len(codes), dtype=np.int64)
+    rang[tri] = np.arange(len(codes)) - np.repeat(np.cumsum(n_matchs) - n_matchs, n_matchs)
+
+    decroissance = 1 - 2 / (span + 1)
+    poids = decroissance ** (n_matchs[codes] - 1 - rang)
+
+    # Équipes déjà connues d'abord, nouvelles équipes ajoutées dans leur ordre d'apparition
+    anciennes = pd.Index(serie['equipes'] if serie else [])
+    index = anciennes.union(pd.Index(uniques), sort=False)
+    position = index.get_indexer(uniques)
+    somme = np.zeros((len(index), valeurs.shape[1]))
+    norme = np.zeros((len(index), valeurs.shape[1]))
+    if serie:
+        vieillissement = np.ones(len(index))
+        vieillissement[position] = decroissance ** n_matchs
+        somme[:len(anciennes)] = serie['somme']
+        norme[:len(anciennes)] = serie['norme']
+        somme *= vieillissement[:, None]
+        norme *= vieillissement[:, None]
+
+    for j in range(valeurs.shape[1]):
+        x = valeurs[:, j]
+        present = ~np.isnan(x)
+        somme[position, j] += np.bincount(codes, weights=np.where(present, poids * x, 0.0), minlength=len(uniques))
+        norme[position, j] += np.bincount(codes, weights=np.where(present, poids, 0.0), minlength=len(uniques))
+
+    return {'equipes': index.tolist(), 'somme': somme, 'norme': norme}
+
+def _hachages_lignes(df):
+    """Hachage (uint64) des colonnes utiles de chaque match, pour vérifier qu'une saison n'a fait que s'allonger"""
+    return pd.util.hash_pandas_object(
+        df[['home_team', 'away_team', 'home_goals', 'away_goals']], index=False
+    ).to_numpy(dtype=np.uint64)
+
+def replier_matchs(etat, df, span=10):
+    """
+    État EWMA après les matchs de df (état vide si etat est None) : séries domicile et extérieur,
+    sommes et effectifs des buts pour les moyennes globales, nombre de matchs intégrés.
+    """
+    if etat is not None and etat['span'] != span:
+        raise ValueError("span différent de celui de l'état")
+
+    buts = df[['home_goals_adj', 'away_goals_adj']].to_numpy(dtype=float)
+    somme_buts = np.nansum(buts, axis=0)
+    n_buts = np.sum(~np.isnan(buts), axis=0)
+    if etat is not None:
+        somme_buts = etat['somme_buts'] + somme_buts
+        n_buts = etat['n_buts'] + n_buts
+
+    return {
+        'span': span,
+        'domicile': _replier_serie(
+            etat and etat['domicile'], df['home_team'], df['match_order'],
+            df[['home_goals_adj', 'away_goals_adj']], span
+        ),
+        'exterieur': _replier_serie(
+            etat and etat['exterieur'], df['away_team'], df['match_order'],
+            df[['away_goals_adj', 'home_goals_adj']], span
+        ),
+        'somme_buts': somme_buts,
+        'n_buts': n_buts,
+        'n_matchs': (etat['n_matchs'] if etat is not None else 0) + len(df)
+    }
+
+def stats_depuis_etat(etat):
+    """(stats_globales, avg_h, avg_a) à partir d'un état EWMA"""
+    avg_h = etat['somme_buts'][0] / etat['n_buts'][0]
+    avg_a = etat['somme_buts'][1] / etat['n_buts'][1]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ewma_dom = etat['domicile']['somme'] / etat['domicile']['norme']
+        ewma_ext = etat['exterieur']['somme'] / etat['exterieur']['norme']
+    equipes_dom = pd.Index(etat['domicile']['equipes'])
+    equipes_ext = pd.Index(etat['exterieur']['equipes'])
+
+    domicile = pd.DataFrame(ewma_dom, index=equipes_dom, columns=['attaque_domicile', 'defense_domicile'])
+    exterieur = pd.DataFrame(ewma_ext, index=equipes_ext, columns=['attaque_exterieur', 'defense_exterieur'])
+    index = equipes_dom.union(equipes_ext, sort=False)
+    stats_globales = pd.concat([domicile.reindex(index), exterieur.reindex(index)], axis=1)
+
+    stats_globales = stats_globales.fillna(avg_h)
+
+    stats_globales['force_att_domicile'] = stats_globales['attaque_domicile'] / avg_h
+    stats_globales['force_att_exterieur'] = stats_globales['attaque_exterieur'] / avg_a
+    stats_globales['faibl_def_domicile'] = stats_globales['defense_domicile'] / avg_a
+    stats_globales['faibl_def_exterieur'] = stats_globales['defense_exterieur'] / avg_h
+
+    return stats_globales, avg_h, avg_a
+
+class ForcesEquipes:
+    """
+    Forces des équipes d'un championnat sous forme compacte : index nom -> ligne et tableau float64
+    (n_equipes x 4, colonnes COLONNES_FORCES) contigu et en lecture seule. Les prédictions y lisent
+    par indices entiers au lieu de recherches .loc sur le DataFrame de stats.
+    """
+    __slots__ = ('equipes', 'index', 'forces')
+
+    def __init__(self, equipes, forces):
+        self.equipes = tuple(equipes)
+        self.index = {equipe: i for i, equipe in enumerate(self.equipes)}
+        self.forces = np.array(forces, dtype=np.float64, order='C')
+        self.forces.flags.writeable = False
+
+    @classmethod
+    def depuis_stats(cls, stats):
+        """Depuis le DataFrame de stats_depuis_etat / entrainer_modele"""
+        return cls(stats.index.tolist(), stats[list(COLONNES_FORCES)].to_numpy())
+
+    def __contains__(self, equipe):
+        return equipe in self.index
+
+    def __len__(self):
+        return len(self.equipes)
+
+    def indices(self, equipes):
+        """Lignes des équipes (KeyError pour une équipe inconnue)"""
+        index = self.index
+        return np.fromiter((index[equipe] for equipe in equipes), dtype=np.intp, count=len(equipes))
+
+    def vers_dataframe(self):
+        """Vue DataFrame (équipes x COLONNES_FORCES), pour l'affichage en ligne de commande"""
+        return pd.DataFrame(self.forces, index=pd.Index(self.equipes), columns=list(COLONNES_FORCES))
+
+def forces_equipes(stats):
+    """ForcesEquipes d'un DataFrame de stats ; un ForcesEquipes est renvoyé tel quel"""
+    return stats if isinstance(stats, ForcesEquipes) else ForcesEquipes.depuis_stats(stats)
+
+def entrainer_modele(df, span=10):
+    """Entraîne le modèle avec EWMA"""
+    return stats_depuis_etat(replier_matchs(None, df, span))
+
+def ajuster_modele(df, span=10, type_modele='ewma'):
+    """(stats, avg_h, avg_a, rho) du type de modèle choisi ; rho (Dixon-Coles) est nul pour l'EWMA"""
+    if type_modele not in TYPES_MODELE:
+        raise ValueError("Type de modèle invalide")
+    if type_modele == 'dixon_coles':
+        # Import différé : dixon_coles importe ce module
+        from dixon_coles import entrainer_dixon_coles
+        return entrainer_dixon_coles(df, span)
+    return (*entrainer_modele(df, span), 0.0)
+
+def mettre_a_jour(modele, nouvelles_lignes, empreinte=None):
+    """
+    Intègre des matchs ajoutés en fin de saison sans réentraîner : seul le coût des nouvelles
+    lignes est payé. Même résultat qu'entrainer_modele sur la saison complète, aux arrondis près.
+    Les hachages des lignes intégrées suivent l'état, pour qu'actualiser_depuis_csv puisse
+    reprendre à partir du modèle obtenu.
+    """
+    precedent = modele['etat_ewma']
+    hachages = precedent.get('hachages_lignes')
+    etat = {
+        **replier_matchs(precedent, nouvelles_lignes, precedent['span']),
+        # Sans hachages dans l'état précédent, le prochain rafraîchissement réentraînera
+        'hachages_lignes': None if hachages is None else np.concatenate([hachages, _hachages_lignes(nouvelles_lignes)])
+    }
+    stats_equipes, avg_home, avg_away = stats_depuis_etat(etat)
+    classement = modele.get('classement')
+    if classement is not None:
+        classement = classement_actuel(nouvelles_lignes, stats_equipes.index.tolist(), classement)
+    return construire_modele(
+        stats_equipes, avg_home, avg_away, empreinte, etat, modele.get('parametres'), classement=classement
+    )
+
+# --- CLASSEMENT ---
+def classement_vide(equipes):
+    """Classement sans match joué : points, différence de buts, buts marqués, matchs joués, affiches jouées"""
+    n = len(equipes)
+    return {
+        'equipes': tuple(equipes),
+        'points': np.zeros(n),
+        'diff_buts': np.zeros(n),
+        'buts_pour': np.zeros(n),
+        'joues': np.zeros(n, dtype=np.int64),
+        'affiches_jouees': np.zeros((n, n), dtype=bool)
+    }
+
+def reindexer_classement(classement, equipes):
+    """Classement reporté sur une autre liste d'équipes (une équipe absente n'a rien joué)"""
+    resultat = classement_vide(equipes)
+    # Sans pandas : le modèle se construit aussi depuis un snapshot, pandas non importé
+    position = {equipe: i for i, equipe in enumerate(equipes)}
+    idx = np.array([position.get(equipe, -1) for equipe in classement['equipes']], dtype=np.intp)
+    connues = idx >= 0
+    idx = idx[connues]
+    for cle in ('points', 'diff_buts', 'buts_pour', 'joues'):
+        resultat[cle][idx] = np.asarray(classement[cle])[connues]
+    resultat['affiches_jouees'][np.ix_(idx, idx)] = np.asarray(classement['affiches_jouees'])[np.ix_(connues, connues)]
+    return resultat
+
+def classement_actuel(df, equipes, precedent=None):
+    """
+    Classement des matchs avec score de df, cumulé à un classement précédent (mise à jour
+    incrémentale) : tableaux alignés sur equipes, et matrice dom. x ext. des affiches déjà jouées.
+    Conservé par le modèle, il évite de relire le CSV pour projeter la fin de saison.
+    """
+    resultat = classement_vide(equipes) if precedent is None else reindexer_classement(precedent, equipes)
+    joues = df.dropna(subset=['home_goals', 'away_goals'])
+    idx_dom = pd.Index(equipes).get_indexer(joues['home_team'])
+    idx_ext = pd.Index(equipes).get_indexer(joues['away_team'])
+    buts_dom = joues['home_goals'].to_numpy(dtype=float)
+    buts_ext = joues['away_goals'].to_numpy(dtype=float)
+    n = len(equipes)
+
+    points_dom = np.where(buts_dom > buts_ext, 3, np.where(buts_dom == buts_ext, 1, 0))
+    points_ext = np.where(buts_ext > buts_dom, 3, np.where(buts_dom == buts_ext, 1, 0))
+    resultat['points'] += np.bincount(idx_dom, points_dom, n) + np.bincount(idx_ext, points_ext, n)
+    resultat['diff_buts'] += np.bincount(idx_dom, buts_dom - buts_ext, n) + np.bincount(idx_ext, buts_ext - buts_dom, n)
+    resultat['buts_pour'] += np.bincount(idx_dom, buts_dom, n) + np.bincount(idx_ext, buts_ext, n)
+    resultat['joues'] += np.bincount(idx_dom, minlength=n) + np.bincount(idx_ext, minlength=n)
+    resultat['affiches_jouees'][idx_dom, idx_ext] = True
+    return resultat
+
+# --- PRÉDICTION ---
+def generateur_aleatoire(seed=None):
+    """
+    Générateur NumPy (PCG64) : reproductible si seed est donné, sinon le flux du thread courant,
+    engendré une fois depuis la SeedSequence racine (flux indépendants, sans verrou au tirage).
+    """
+    if seed is not None:
+        return np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed)))
+    generateur = getattr(_FLUX_THREAD, 'generateur', None)
+    if generateur is None:
+        with _VERROU_ALEATOIRE:
+            graine = _RACINE_ALEATOIRE.spawn(1)[0]
+        generateur = _FLUX_THREAD.generateur = np.random.Generator(np.random.PCG64(graine))
+    return generateur
+
+def lois_poisson(lam, max_buts=MAX_BUTS):
+    """Probabilités P(X = k) pour k = 0..max_buts, vectorisé sur lam (dernier axe = k)"""
+    lam = np.asarray(lam, dtype=float)[..., None]
+    k = np.arange(1, max_buts + 1)
+    # Récurrence p_k = p_(k-1) * lam / k, sans factorielle ni log(0)
+    ratios = np.concatenate([np.ones_like(lam), lam / k], axis=-1)
+    return np.exp(-lam) * np.cumprod(ratios, axis=-1)
+
+def table_dixon_coles(buts_dom, buts_ext, rho):
+    """
+    Facteurs τ de Dixon-Coles (..., 2, 2) des scores 0-0, 0-1, 1-0 et 1-1 ([buts dom., buts ext.]) :
+    ρ < 0 rend 0-0 et 1-1 plus probables, 1-0 et 0-1 moins, sans changer leur masse totale.
+    """
+    lam, mu, rho = np.broadcast_arrays(
+        np.asarray(buts_dom, dtype=float), np.asarray(buts_ext, dtype=float), np.asarray(rho, dtype=float)
+    )
+    table = np.stack([1 - lam * mu * rho, 1 + lam * rho, 1 + mu * rho, 1 - rho], axis=-1)
+    return np.maximum(table, 0).reshape(lam.shape + (2, 2))
+
+def matrice_scores(buts_dom, buts_ext, max_buts=MAX_BUTS, rho=0.0):
+    """
+    Matrice P(dom = i, ext = j) des scores exacts, tronquée à max_buts buts par équipe.
+    rho (scalaire ou par match) : correction de Dixon-Coles des petits scores, Poisson indépendants si nul.
+    """
+    matrice = lois_poisson(buts_dom, max_buts)[..., :, None] * lois_poisson(buts_ext, max_buts)[..., None, :]
+    if np.any(rho):
+        matrice[..., :2, :2] *= table_dixon_coles(buts_dom, buts_ext, rho)
+    return matrice
+
+def corriger_tirages(tirages_dom, tirages_ext, buts_dom, buts_ext, rho, generateur):
+    """
+    Tirages de Poisson indépendants (..., n) -> tirages de Dixon-Coles. τ ne touche que 0-0, 0-1, 1-0
+    et 1-1 et conserve leur masse : les tirages tombés sur l'un de ces scores sont retirés parmi les
+    quatre selon leurs probabilités corrigées, les autres sont gardés. Loi exacte, sans pondération.
+    """
+    petits = (tirages_dom < 2) & (tirages_ext < 2)
+    if not petits.any():
+        return tirages_dom, tirages_ext
+    probas = matrice_scores(buts_dom, buts_ext, 1, rho)
+    repartition = np.cumsum(probas.reshape(probas.shape[:-2] + (4,)), axis=-1)
+    repartition = repartition / repartition[..., -1:]
+
+    position = np.nonzero(petits)
+    lignes = repartition[position[:-1]]
+    scores = (generateur.random(len(position[-1]))[:, None] >= lignes[..., :3]).sum(axis=-1)
+    tirages_dom, tirages_ext = tirages_dom.copy(), tirages_ext.copy()
+    tirages_dom[position] = scores // 2
+    tirages_ext[position] = scores % 2
+    return tirages_dom, tirages_ext
+
+def probabilites_1n2(matrice):
+    """Victoire dom. (triangle inférieur), nul (diagonale), victoire ext. (triangle supérieur)"""
+    prob_1 = np.tril(matrice, -1).sum(axis=(-2, -1))
+    prob_N = np.trace(matrice, axis1=-2, axis2=-1)
+    prob_2 = np.triu(matrice, 1).sum(axis=(-2, -1))
+    return prob_1, prob_N, prob_2
+
+def buts_attendus(stats, avg_h, avg_a, equipes_dom, equipes_ext, avantage_domicile=1.0):
+    """
+    Buts projetés (domicile, extérieur) pour des listes d'affiches, en une passe.
+    stats : ForcesEquipes ou DataFrame de stats ; une équipe inconnue lève KeyError.
+    """
+    forces = forces_equipes(stats)
+    idx_dom = forces.indices(equipes_dom)
+    idx_ext = forces.indices(equipes_ext)
+    f = forces.forces
+    buts_dom = f[idx_dom, 0] * f[idx_ext, 1] * avg_h * avantage_domicile
+    buts_ext = f[idx_ext, 2] * f[idx_dom, 3] * avg_a
+    return buts_dom, buts_ext
+
+def distribution_scores(buts_dom, buts_ext, n_simulations=10000, engine='montecarlo', max_buts=MAX_BUTS,
+                        generateur=None, rho=0.0):
+    """
+    Distribution des scores P(dom = i, ext = j) de chaque match (derniers axes i, j) : matrice de Poisson
+    exacte tronquée à max_buts, ou fréquences empiriques des tirages Monte Carlo (sans troncature,
+    complétées par des zéros jusqu'à MAX_BUTS_SCORE_EXACT buts).
+    rho : correction de Dixon-Coles (matrice_scores, corriger_tirages).
+    """
+    if engine not in MOTEURS:
+        raise ValueError("Moteur invalide")
+    buts_dom = np.asarray(buts_dom, dtype=float)
+    buts_ext = np.asarray(buts_ext, dtype=float)
+
+    if engine == 'exact':
+        # Produit extérieur des deux lois de Poisson : déterministe, sans tirage
+        return matrice_scores(buts_dom, buts_ext, max_buts, rho)
+
+    # Simulation Monte Carlo : n_simulations tirages par match, comptés par score
+    generateur = generateur or generateur_aleatoire()
+    forme = buts_dom.shape + (n_simulations,)
+    buts_simules_dom = generateur.poisson(buts_dom[..., None], forme)
+    buts_simules_ext = generateur.poisson(buts_ext[..., None], forme)
+    if np.any(rho):
+        buts_simules_dom, buts_simules_ext = corriger_tirages(
+            buts_simules_dom, buts_simules_ext, buts_dom, buts_ext, rho, generateur
+        )
+
+    n_matchs = buts_dom.size
+    # Au moins la grille du score exact : les clés de correct_score ne dépendent pas des tirages
+    taille = max(
+        int(max(buts_simules_dom.max(initial=0), buts_simules_ext.max(initial=0))) + 1, MAX_BUTS_SCORE_EXACT + 1
+    )
+    cles = (np.arange(n_matchs).reshape(buts_dom.shape)[..., None] * taille + buts_simules_dom) * taille + buts_simules_ext
+    comptes = np.bincount(cles.ravel(), minlength=n_matchs * taille * taille)
+    return comptes.reshape(buts_dom.shape + (taille, taille)) / n_simulations
+
+def simuler_adaptatif(buts_dom, buts_ext, tolerance=0.25, max_simulations=MAX_SIMULATIONS_ADAPTATIF,
+                      antithetique=True, generateur=None, taille_lot=TAILLE_LOT_ADAPTATIF, rho=0.0):
+    """
+    Monte Carlo par lots avec arrêt anticipé, vectorisé sur les matchs : un match cesse d'être tiré dès
+    que l'erreur standard de chacune de ses probabilités 1/N/2 (en points de %) passe sous tolerance,
+    ou quand il atteint max_simulations tirages.
+
+    Les scores sont tirés par inversion de la fonction de répartition de Poisson, par paires (U, 1 - U)
+    en mode antithétique : 1 et 2 sont monotones en chaque score, la paire est donc négativement
+    corrélée et l'erreur baisse plus vite. L'erreur standard est estimée sur les moyennes de paires.
+    Avec rho, les tirages sur les petits scores sont corrigés par corriger_tirages (Dixon-Coles).
+    Renvoie (distribution des scores, tirages par match, erreurs standard (..., 3) en %).
+    """
+    generateur = generateur or generateur_aleatoire()
+    buts_dom = np.asarray(buts_dom, dtype=float)
+    buts_ext = np.asarray(buts_ext, dtype=float)
+    forme = buts_dom.shape
+    lam = np.stack([buts_dom.ravel(), buts_ext.ravel()])
+    dixon_coles = bool(np.any(rho))
+    rho = np.broadcast_to(np.asarray(rho, dtype=float), forme).ravel()
+
+    # Table de répartition assez longue pour une queue négligeable (< 1e-12) ; le reste est rabattu sur la dernière case
+    lam_max = float(lam.max(initial=0))
+    taille = int(np.ceil(lam_max + 10 * np.sqrt(lam_max) + 10)) + 1
+    repartition = np.cumsum(lois_poisson(lam, taille - 1), axis=-1)
+    repartition[..., -1] = np.inf
+
+    n_matchs = lam.shape[1]
+    comptes = np.zeros((n_matchs, taille * taille))
+    sommes = np.zeros((n_matchs, 3))
+    carres = np.zeros((n_matchs, 3))
+    paires = np.zeros(n_matchs, dtype=np.int64)
+    erreur = np.full((n_matchs, 3), np.inf)
+    demi_lot = max(1, min(taille_lot, max_simulations) // 2)
+    actifs = np.arange(n_matchs)
+
+    while actifs.size:
+        uniformes = generateur.random((2, actifs.size, demi_lot))
+        miroirs = 1 - uniformes if antithetique else generateur.random((2, actifs.size, demi_lot))
+        issues = 0
+        for tirage in (uniformes, miroirs):
+            # Inversion : nombre de cases de la répartition strictement sous le tirage uniforme
+            scores = [(tirage[k][..., None] >= repartition[k, actifs][:, None, :]).sum(axis=-1) for k in (0, 1)]
+            if dixon_coles:
+                scores = corriger_tirages(scores[0], scores[1], lam[0, actifs], lam[1, actifs], rho[actifs], generateur)
+            issues = issues + np.stack([scores[0] > scores[1], scores[0] == scores[1], scores[0] < scores[1]], axis=-1)
+            cles = (np.arange(actifs.size)[:, None] * taille + scores[0]) * taille + scores[1]
+            comptes[actifs] += np.bincount(cles.ravel(), minlength=actifs.size * taille * taille).reshape(actifs.size, -1)
+
+        moyennes_paires = issues / 2
+        sommes[actifs] += moyennes_paires.sum(axis=1)
+        carres[actifs] += (moyennes_paires ** 2).sum(axis=1)
+        paires[actifs] += demi_lot
+
+        n = paires[actifs][:, None]
+        variance = np.maximum(carres[actifs] / n - (sommes[actifs] / n) ** 2, 0)
+        erreur[actifs] = np.sqrt(variance / n) * 100
+        continuer = (erreur[actifs].max(axis=1) > tolerance) & (2 * (paires[actifs] + demi_lot) <= max_simulations)
+        actifs = actifs[continuer]
+
+    n_tirages = 2 * paires
+    matrice = (comptes / n_tirages[:, None]).reshape(forme + (taille, taille))
+    return matrice, n_tirages.reshape(forme), erreur.reshape(forme + (3,))
+
+def resume_1n2(matrice, engine):
+    """Probabilités 1/N/2 et masse tronquée (en %, None pour Monte Carlo) d'une distribution des scores"""
+    prob_1, prob_N, prob_2 = (p * 100 for p in probabilites_1n2(matrice))
+    masse_tronquee = (1 - matrice.sum(axis=(-2, -1))) * 100 if engine == 'exact' else None
+    return prob_1, prob_N, prob_2, masse_tronquee
+
+def simuler_1n2(buts_dom, buts_ext, n_simulations=10000, engine='montecarlo', max_buts=MAX_BUTS, generateur=None,
+                rho=0.0):
+    """Probabilités 1/N/2 (en %) pour des tableaux de buts attendus, vectorisé sur les matchs"""
+    return resume_1n2(distribution_scores(buts_dom, buts_ext, n_simulations, engine, max_buts, generateur, rho), engine)
+
+def _cote(prob):
+    """Cote juste d'une probabilité en %, arrondie (inf si la probabilité est nulle)"""
+    prob = float(prob)
+    return round(100 / prob, 2) if prob > 0 else float('inf')
+
+def _cote_handicap(gain, perte):
+    """Cote juste avec remboursement possible : espérance nulle, gain * (cote - 1) = perte"""
+    return round(1 + perte / gain, 2) if gain > 0 else float('inf')
+
+def calculer_marches(matrice, marches=MARCHES):
+    """
+    Marchés dérivés d'une distribution des scores par masques vectorisés, sur tous les axes de tête
+    (un ou plusieurs matchs). Probabilités en %, sans nouveau tirage.
+    """
+    marches = tuple(marches)
+    inconnus = set(marches) - set(MARCHES)
+    if inconnus:
+        raise ValueError(f"Marché invalide : {', '.join(sorted(inconnus))}")
+
+    taille = matrice.shape[-1]
+    buts_dom, buts_ext = np.indices((taille, taille))
+    total = buts_dom + buts_ext
+    ecart = buts_dom - buts_ext
+
+    def masse(masque):
+        return (matrice * masque).sum(axis=(-2, -1)) * 100
+
+    resultat = {}
+    if 'over_under' in marches:
+        resultat['over_under'] = {ligne: (masse(total > ligne), masse(total < ligne)) for ligne in LIGNES_OVER_UNDER}
+    if 'btts' in marches:
+        resultat['btts'] = (masse((buts_dom > 0) & (buts_ext > 0)), masse((buts_dom == 0) | (buts_ext == 0)))
+    if 'correct_score' in marches:
+        limite = min(MAX_BUTS_SCORE_EXACT + 1, taille)
+        scores = matrice[..., :limite, :limite] * 100
+        resultat['correct_score'] = (scores, masse(np.maximum(buts_dom, buts_ext) > MAX_BUTS_SCORE_EXACT))
+    if 'asian_handicap' in marches:
+        # Ligne en quart = demi-mise sur chacune des deux lignes voisines (ex. -0.75 -> -0.5 et -1)
+        lignes = {}
+        for ligne in LIGNES_HANDICAP:
+            demi_lignes = {np.floor(ligne * 2) / 2, np.ceil(ligne * 2) / 2}
+            marge = [ecart + demi_ligne for demi_ligne in demi_lignes]
+            gain_dom = sum(masse(m > 0) for m in marge) / len(marge)
+            gain_ext = sum(masse(m < 0) for m in marge) / len(marge)
+            lignes[ligne] = (gain_dom, gain_ext)
+        resultat['asian_handicap'] = lignes
+    return resultat
+
+def formater_precision(n_tirages, erreur):
+    """Tirages utilisés et erreurs standard (points de %) d'une prédiction Monte Carlo adaptative"""
+    return {
+        'n_simulations': int(n_tirages),
+        'erreur_standard': {issue: round(float(e), 3) for issue, e in zip(('prob_1', 'prob_N', 'prob_2'), erreur)}
+    }
+
+def formater_marches(marches, i=None):
+    """Réponse JSON des marchés de calculer_marches (du match i si plusieurs matchs) : probabilités et cotes justes"""
+    def valeur(tableau):
+        return float(tableau if i is None else tableau[i])
+
+    resultat = {}
+    if 'over_under' in marches:
+        resultat['over_under'] = {}
+        for ligne, (over, under) in marches['over_under'].items():
+            over, under = valeur(over), valeur(under)
+            resultat['over_under'][str(ligne)] = {
+                'over': round(over, 1), 'under': round(under, 1), 'cote_over': _cote(over), 'cote_under': _cote(under)
+            }
+    if 'btts' in marches:
+        oui, non = (valeur(p) for p in marches['btts'])
+        resultat['btts'] = {'oui': round(oui, 1), 'non': round(non, 1), 'cote_oui': _cote(oui), 'cote_non': _cote(non)}
+    if 'correct_score' in marches:
+        scores, autre = marches['correct_score']
+        scores = scores if i is None else scores[i]
+        resultat['correct_score'] = {
+            f'{dom}-{ext}': {'prob': round(float(scores[dom, ext]), 2), 'cote': _cote(scores[dom, ext])}
+            for dom in range(scores.shape[0]) for ext in range(scores.shape[1])
+        }
+        resultat['correct_score']['autre'] = {'prob': round(valeur(autre), 2), 'cote': _cote(valeur(autre))}
+    if 'asian_handicap' in marches:
+        resultat['asian_handicap'] = {}
+        for ligne, (gain_dom, gain_ext) in marches['asian_handicap'].items():
+            gain_dom, gain_ext = valeur(gain_dom), valeur(gain_ext)
+            resultat['asian_handicap'][f'{ligne:+g}'] = {
+                'dom': round(gain_dom, 1),
+                'ext': round(gain_ext, 1),
+                'rembourse': round(100 - gain_dom - gain_ext, 1),
+                'cote_dom': _cote_handicap(gain_dom, gain_ext),
+                'cote_ext': _cote_handicap(gain_ext, gain_dom)
+            }
+    return resultat
+
+def formater_resultat(buts_dom, buts_ext, prob_1, prob_N, prob_2, engine, masse_tronquee=None):
+    """Réponse JSON d'une prédiction : buts attendus, probabilités et cotes justes"""
+    buts_dom, buts_ext = float(buts_dom), float(buts_ext)
+    prob_1, prob_N, prob_2 = float(prob_1), float(prob_N), float(prob_2)
+    resultat = {
+        'buts_dom': round(buts_dom, 2),
+        'buts_ext': round(buts_ext, 2),
+        'prob_1': round(prob_1, 1),
+        'prob_N': round(prob_N, 1),
+        'prob_2': round(prob_2, 1),
+        'cote_1': _cote(prob_1),
+        'cote_N': _cote(prob_N),
+        'cote_2': _cote(prob_2),
+        'engine': engine
+    }
+    if masse_tronquee is not None:
+        resultat['masse_tronquee'] = float(masse_tronquee)
+    return resultat
+
+def predire_et_simuler(equipe_dom, equipe_ext, stats, avg_h, avg_a, n_simulations=10000,
+                       engine='montecarlo', max_buts=MAX_BUTS, avantage_domicile=1.0, marches=(),
+                       generateur=None, tolerance=None, max_simulations=MAX_SIMULATIONS_ADAPTATIF, antithetique=True,
+                       rho=0.0):
+    """
+    Prédit le résultat d'un match (Monte Carlo ou matrice de Poisson exacte) et les marchés demandés.
+    Avec tolerance, le Monte Carlo est adaptatif (simuler_adaptatif) et la réponse indique les tirages
+    utilisés et l'erreur standard atteinte. stats : ForcesEquipes du modèle ou DataFrame de stats ;
+    rho : corrélation des petits scores d'un modèle Dixon-Coles (nulle pour l'EWMA).
+    """
+    if engine not in MOTEURS:
+        raise ValueError("Moteur invalide")
+    
+    with METRIQUES.chrono('foot_etape_duree_secondes', etape='lookup'):
+        forces = forces_equipes(stats)
+        force_att_dom, _, _, faibl_def_dom = forces.forces[forces.index[equipe_dom]].tolist()
+        _, faibl_def_ext, force_att_ext, _ = forces.forces[forces.index[equipe_ext]].tolist()
+        buts_projetes_dom = force_att_dom * faibl_def_ext * avg_h * avantage_domicile
+        buts_projetes_ext = force_att_ext * faibl_def_dom * avg_a
+    
+    with METRIQUES.chrono('foot_etape_duree_secondes', etape='simulate'):
+        # Une seule distribution des scores pour le 1/N/2 et tous les marchés
+        adaptatif = tolerance is not None and engine == 'montecarlo'
+        if adaptatif:
+            matrice, n_tirages, erreur = simuler_adaptatif(
+                buts_projetes_dom, buts_projetes_ext, tolerance, max_simulations, antithetique, generateur, rho=rho
+            )
+        else:
+            matrice = distribution_scores(
+                buts_projetes_dom, buts_projetes_ext, n_simulations, engine, max_buts, generateur, rho
+            )
+        prob_1, prob_N, prob_2, masse_tronquee = resume_1n2(matrice, engine)
+        resultat = formater_resultat(
+            buts_projetes_dom, buts_projetes_ext, prob_1, prob_N, prob_2, engine, masse_tronquee
+        )
+        if adaptatif:
+            resultat.update(formater_precision(n_tirages, erreur))
+        if marches:
+            resultat['marches'] = formater_marches(calculer_marches(matrice, marches))
+    return resultat
+
+def predire_affiches(buts_dom, buts_ext, n_simulations=10000, engine='montecarlo', max_buts=MAX_BUTS, marches=(),
+                     generateur=None, tolerance=None, max_simulations=MAX_SIMULATIONS_ADAPTATIF, antithetique=True,
+                     rho=0.0):
+    """
+    Résultats (formater_resultat, marchés, précision) d'affiches dont les buts attendus sont connus,
+    simulées en une passe vectorisée ; une entrée par affiche, dans l'ordre. rho : scalaire ou par affiche.
+    """
+    buts_dom = np.asarray(buts_dom, dtype=float)
+    buts_ext = np.asarray(buts_ext, dtype=float)
+    adaptatif = tolerance is not None and engine == 'montecarlo'
+    with METRIQUES.chrono('foot_etape_duree_secondes', etape='simulate'):
+        if adaptatif:
+            matrice, n_tirages, erreur = simuler_adaptatif(
+                buts_dom, buts_ext, tolerance, max_simulations, antithetique, generateur, rho=rho
+            )
+        else:
+            matrice = distribution_scores(buts_dom, buts_ext, n_simulations, engine, max_buts, generateur, rho)
+        prob_1, prob_N, prob_2, masse_tronquee = resume_1n2(matrice, engine)
+        marches_lot = calculer_marches(matrice, marches) if marches else None
+
+    resultats = []
+    for k in range(len(buts_dom)):
+        resultat = formater_resultat(
+            buts_dom[k], buts_ext[k], prob_1[k], prob_N[k], prob_2[k], engine,
+            None if masse_tronquee is None else masse_tronquee[k]
+        )
+        if adaptatif:
+            resultat.update(formater_precision(n_tirages[k], erreur[k]))
+        if marches_lot is not None:
+            resultat['marches'] = formater_marches(marches_lot, k)
+        resultats.append(resultat)
+    return resultats
+
+# --- LOTS D'AFFICHES ---
+def normaliser_affiche(affiche, championnat_defaut=CHAMPIONNAT_DEFAUT):
+    """Affiche {league, home_team, away_team} nettoyée ; None (affiche invalide) si un champ n'est pas du texte"""
+    if not isinstance(affiche, dict):
+        return None
+    resultat = {}
+    for cle, defaut in (('league', championnat_defaut), ('home_team', ''), ('away_team', '')):
+        valeur = affiche.get(cle)
+        if valeur is not None and not isinstance(valeur, str):
+            return None
+        resultat[cle] = (valeur or defaut).strip()
+    return resultat
+
+def regrouper_affiches(affiches, championnat_defaut=CHAMPIONNAT_DEFAUT):
+    """
+    Valide un lot d'affiches brutes (/predict_batch, main.py batch) et les regroupe par championnat.
+    Renvoie (affiches normalisées, résultats, {championnat: [indices]}) : les résultats contiennent
+    déjà l'erreur des affiches invalides, None pour celles à prédire.
+    """
+    affiches = [normaliser_affiche(affiche, championnat_defaut) for affiche in affiches]
+    resultats = [None] * len(affiches)
+    par_championnat = {}
+    for i, affiche in enumerate(affiches):
+        if affiche is None:
+            resultats[i] = {'error': 'Affiche invalide'}
+        elif affiche['league'] not in CHAMPIONNATS:
+            resultats[i] = {**affiche, 'error': 'Championnat invalide'}
+        elif not affiche['home_team'] or not affiche['away_team']:
+            resultats[i] = {**affiche, 'error': 'Équipes manquantes'}
+        elif affiche['home_team'] == affiche['away_team']:
+            resultats[i] = {**affiche, 'error': 'Les deux équipes doivent être différentes'}
+        else:
+            par_championnat.setdefault(affiche['league'], []).append(i)
+    return affiches, resultats, par_championnat
+
+def affiches_connues(affiches, indices, forces, resultats):
+    """Indices dont les deux équipes existent dans forces ; les autres reçoivent leur erreur dans resultats"""
+    valides = []
+    for i in indices:
+        for equipe in (affiches[i]['home_team'], affiches[i]['away_team']):
+            if equipe not in forces:
+                resultats[i] = {**affiches[i], 'error': f"L'équipe '{equipe}' n'existe pas"}
+                break
+        else:
+            valides.append(i)
+    return valides
+
+# --- MATRICE DES AFFICHES ---
+def calculer_matrice_affiches(stats, avg_h, avg_a, equipes, max_buts=MAX_BUTS, avantage_domicile=1.0, rho=0.0):
+    """
+    Toutes les affiches dom./ext. d'un championnat en une passe (broadcasting N x N) :
+    buts attendus et probabilités 1/N/2 du moteur exact. La diagonale vaut NaN.
+    """
+    forces = forces_equipes(stats)
+    force_att_dom, faibl_def_ext, force_att_ext, faibl_def_dom = forces.forces[forces.indices(equipes)].T
+
+    # Ligne = équipe à domicile, colonne = équipe à l'extérieur
+    buts_dom = force_att_dom[:, None] * faibl_def_ext[None, :] * avg_h * avantage_domicile
+    buts_ext = force_att_ext[None, :] * faibl_def_dom[:, None] * avg_a
+    prob_1, prob_N, prob_2, masse_tronquee = simuler_1n2(buts_dom, buts_ext, engine='exact', max_buts=max_buts, rho=rho)
+
+    matrice = {
+        'buts_dom': buts_dom,
+        'buts_ext': buts_ext,
+        'prob_1': prob_1,
+        'prob_N': prob_N,
+        'prob_2': prob_2,
+        'masse_tronquee': masse_tronquee
+    }
+    diagonale = np.eye(len(equipes), dtype=bool)
+    for valeurs in matrice.values():
+        valeurs[diagonale] = np.nan
+    with np.errstate(divide='ignore'):
+        for issue in ('1', 'N', '2'):
+            matrice[f'cote_{issue}'] = np.where(matrice[f'prob_{issue}'] > 0, 100 / matrice[f'prob_{issue}'], np.inf)
+    matrice['index'] = {equipe: i for i, equipe in enumerate(equipes)}
+    matrice['rho'] = rho
+    return matrice
+
+def lire_affiche(matrice, equipe_dom, equipe_ext, marches=(), max_buts=MAX_BUTS):
+    """Prédiction exacte d'une affiche lue dans la matrice précalculée, marchés calculés à la demande"""
+    i = matrice['index'][equipe_dom]
+    j = matrice['index'][equipe_ext]
+    resultat = formater_resultat(
+        matrice['buts_dom'][i, j], matrice['buts_ext'][i, j],
+        matrice['prob_1'][i, j], matrice['prob_N'][i, j], matrice['prob_2'][i, j],
+        'exact', matrice['masse_tronquee'][i, j]
+    )
+    if marches:
+        scores = matrice_scores(matrice['buts_dom'][i, j], matrice['buts_ext'][i, j], max_buts, matrice.get('rho', 0.0))
+        resultat['marches'] = formater_marches(calculer_marches(scores, marches))
+    return resultat
+
+def entrainer_depuis_csv(contenu, span=10, plafond=3.5, avantage_domicile=1.0, type_modele='ewma'):
+    """CSV brut -> modèle complet ; fonction de module pour pouvoir tourner dans un pool de processus"""
+    parametres = completer_parametres(
+        {'span': span, 'plafond': plafond, 'avantage_domicile': avantage_domicile, 'type_modele': type_modele}
+    )
+    with METRIQUES.chrono('foot_etape_duree_secondes', etape='parse'):
+        df = preparer_donnees(contenu, plafond)
+    with METRIQUES.chrono('foot_etape_duree_secondes', etape='train'):
+        if type_modele != 'ewma':
+            # Dixon-Coles : ajustement global, sans état incrémental
+            stats_equipes, avg_home, avg_away, rho = ajuster_modele(df, span, type_modele)
+            return construire_modele(
+                stats_equipes, avg_home, avg_away, empreinte_donnees(contenu), parametres=parametres, rho=rho,
+                classement=classement_actuel(df, stats_equipes.index.tolist())
+            )
+        etat = {**replier_matchs(None, df, span), 'hachages_lignes': _hachages_lignes(df)}
+        stats_equipes, avg_home, avg_away = stats_depuis_etat(etat)
+        return construire_modele(
+            stats_equipes, avg_home, avg_away, empreinte_donnees(contenu), etat, parametres,
+            classement=classement_actuel(df, stats_equipes.index.tolist())
+        )
+
+def actualiser_depuis_csv(modele, contenu, span=10, plafond=3.5, avantage_domicile=1.0, type_modele='ewma'):
+    """
+    Nouveau modèle pour un CSV rafraîchi. Si la saison n'a fait que s'allonger, seules les lignes
+    ajoutées sont intégrées (mettre_a_jour, EWMA uniquement) ; sinon, réentraînement complet.
+    Renvoie le modèle inchangé (même objet) si le CSV et les paramètres sont identiques.
+    """
+    parametres = completer_parametres(
+        {'span': span, 'plafond': plafond, 'avantage_domicile': avantage_domicile, 'type_modele': type_modele}
+    )
+    if modele is None or dict(modele.get('parametres') or {}) != parametres:
+        return entrainer_depuis_csv(contenu, **parametres)
+
+    empreinte = empreinte_donnees(contenu)
+    if empreinte == modele['empreinte']:
+        return modele
+    if modele.get('etat_ewma') is None:
+        return entrainer_depuis_csv(contenu, **parametres)
+
+    with METRIQUES.chrono('foot_etape_duree_secondes', etape='parse'):
+        df = preparer_donnees(contenu, plafond)
+    n_matchs = modele['etat_ewma']['n_matchs']
+    hachages = modele['etat_ewma'].get('hachages_lignes')
+    if hachages is None or len(df) < n_matchs or not np.array_equal(_hachages_lignes(df.iloc[:n_matchs]), hachages):
+        return entrainer_depuis_csv(contenu, **parametres)
+    # Un match ajouté daté avant un match déjà intégré (report rejoué) changerait l'ordre des EWMA
+    ordre = df['match_order'].to_numpy()
+    if n_matchs and len(df) > n_matchs and ordre[n_matchs:].min() < ordre[:n_matchs].max():
+        return entrainer_depuis_csv(contenu, **parametres)
+
+    with METRIQUES.chrono('foot_etape_duree_secondes', etape='train'):
+        return mettre_a_jour(modele, df.iloc[n_matchs:], empreinte)
+
+def construire_modele(stats_equipes, avg_home, avg_away, empreinte=None, etat_ewma=None, parametres=None, rho=0.0,
+                      classement=None):
+    """
+    Modèle d'un championnat tel que servi par l'application (forces, moyennes, équipes, matrice).
+    Seules les forces compactes sont conservées, pas le DataFrame de stats. rho : Dixon-Coles, nul pour l'EWMA.
+    classement : classement_actuel des matchs du modèle, lu par /season (None si inconnu).
+    """
+    parametres = completer_parametres(parametres)
+    forces = forces_equipes(stats_equipes)
+    equipes = sorted(forces.equipes)
+    return {
+        'forces': forces,
+        'avg_home': avg_home,
+        'avg_away': avg_away,
+        'equipes': equipes,
+        'matrice': calculer_matrice_affiches(
+            forces, avg_home, avg_away, equipes, avantage_domicile=parametres['avantage_domicile'], rho=rho
+        ),
+        'empreinte': empreinte,
+        'etat_ewma': etat_ewma,
+        'parametres': parametres,
+        'rho': rho,
+        'classement': None if classement is None else reindexer_classement(classement, equipes)
+    }
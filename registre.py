@@ -0,0 +1,94 @@
+"""
+Registre thread-safe des modèles de championnat.
+
+- Chargement single-flight : des requêtes concurrentes sur un championnat absent attendent
+  un seul téléchargement + entraînement au lieu de le refaire chacune.
+- Versions immuables publiées par échange atomique : un lecteur voit l'ancienne ou la nouvelle
+  version, jamais une entrée à moitié mise à jour.
+- Chaque version porte un numéro et une date de publication, renvoyés par /predict.
+- Les abonnés (caches dérivés d'un modèle) sont prévenus de chaque publication.
+"""
+import threading
+from datetime import datetime, timezone
+from types import MappingProxyType
+import numpy as np
+
+def _figer(valeur):
+    """Copie en lecture seule des structures du modèle (dict, listes, tableaux NumPy)"""
+    if isinstance(valeur, dict):
+        return MappingProxyType({cle: _figer(v) for cle, v in valeur.items()})
+    if isinstance(valeur, list):
+        return tuple(valeur)
+    if isinstance(valeur, np.ndarray):
+        vue = valeur.view()
+        vue.flags.writeable = False
+        return vue
+    return valeur
+
+class RegistreModeles:
+    """Modèles publiés par championnat, avec chargement single-flight et échange atomique"""
+
+    def __init__(self):
+        self._versions = {}
+        self._numeros = {}
+        self._verrou = threading.Lock()
+        self._verrous_chargement = {}
+        self._abonnes = []
+
+    def _verrou_chargement(self, championnat):
+        with self._verrou:
+            return self._verrous_chargement.setdefault(championnat, threading.Lock())
+
+    def abonner(self, fonction):
+        """fonction(championnat, version) sera appelée après chaque publication"""
+        self._abonnes.append(fonction)
+
+    def publier(self, championnat, modele):
+        """Fige le modèle, lui attribue un numéro de version et le rend visible d'un seul coup"""
+        with self._verrou:
+            numero = self._numeros.get(championnat, 0) + 1
+            self._numeros[championnat] = numero
+            version = _figer({
+                **modele,
+                'version': numero,
+                'publie_le': datetime.now(timezone.utc).isoformat(timespec='seconds')
+            })
+            self._versions[championnat] = version
+        for fonction in self._abonnes:
+            fonction(championnat, version)
+        return version
+
+    def obtenir(self, championnat, construire, force_reload=False):
+        """
+        Version courante du championnat ; sinon construire() est appelé par un seul thread
+        et les autres attendent son résultat. Avec force_reload, une reconstruction publiée
+        pendant l'attente est réutilisée plutôt que refaite.
+        """
+        courante = self._versions.get(championnat)
+        if courante is not None and not force_reload:
+            return courante
+
+        with self._verrou_chargement(championnat):
+            publiee = self._versions.get(championnat)
+            if publiee is not None and (not force_reload or publiee is not courante):
+                return publiee
+            modele = construire()
+            # construire() peut renvoyer la version publiée telle quelle (données inchangées)
+            if modele is publiee:
+                return publiee
+            return self.publier(championnat, modele)
+
+    def get(self, championnat, defaut=None):
+        return self._versions.get(championnat, defaut)
+
+    def __getitem__(self, championnat):
+        return self._versions[championnat]
+
+    def __contains__(self, championnat):
+        return championnat in self._versions
+
+    def __iter__(self):
+        return iter(list(self._versions))
+
+    def __len__(self):
+        return len(self._versions)
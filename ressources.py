@@ -0,0 +1,51 @@
+"""
+Réponses précalculées (page d'accueil, liste des équipes) servies avec ETag et compression.
+
+Le contenu est rendu une fois par version de modèle, puis compressé d'avance en gzip et, si le
+paquet brotli est installé, en brotli. Une requête conditionnelle (If-None-Match) qui correspond
+reçoit un 304 sans corps.
+"""
+import gzip
+import hashlib
+from flask import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CACHE_CONTROL = 'public, no-cache'
+
+class Ressource:
+    """Corps figé d'une réponse, ses variantes compressées et son ETag"""
+
+    def __init__(self, contenu, type_contenu):
+        if isinstance(contenu, str):
+            contenu = contenu.encode('utf-8')
+        self.type_contenu = type_contenu
+        empreinte = hashlib.sha256(contenu).hexdigest()[:32]
+        # Une variante par encodage, chacune avec son ETag fort
+        self.variantes = {None: (contenu, f'"{empreinte}"')}
+        self.variantes['gzip'] = (gzip.compress(contenu, 9, mtime=0), f'"{empreinte}-gz"')
+        if brotli is not None:
+            self.variantes['br'] = (brotli.compress(contenu, quality=11), f'"{empreinte}-br"')
+
+    def etags(self):
+        return [etag for _, etag in self.variantes.values()]
+
+    def servir(self, requete):
+        """Réponse Flask : 304 si le client a déjà une variante, sinon la meilleure variante acceptée"""
+        encodage = None
+        for candidat in ('br', 'gzip'):
+            if candidat in self.variantes and requete.accept_encodings[candidat] > 0:
+                encodage = candidat
+                break
+        contenu, etag = self.variantes[encodage]
+
+        entetes = {'ETag': etag, 'Cache-Control': CACHE_CONTROL, 'Vary': 'Accept-Encoding'}
+        if any(requete.if_none_match.contains_weak(e.strip('"')) for e in self.etags()):
+            return Response(status=304, headers=entetes)
+
+        if encodage is not None:
+            entetes['Content-Encoding'] = encodage
+        return Response(contenu, content_type=self.type_contenu, headers=entetes)
@@ -0,0 +1,176 @@
+"""
+Simulation Monte Carlo de la fin de saison : distribution du classement final de chaque équipe.
+
+Les matchs restants (calendrier fourni, ou matchs aller-retour pas encore joués) sont tirés en une
+passe de Poisson (n_simulations x n_matchs) à partir des buts attendus du modèle. Points, différence
+de buts et buts marqués sont cumulés par scatter-add (np.bincount), puis chaque saison simulée est
+classée par np.lexsort : points, différence de buts, buts marqués, puis tirage au sort.
+
+Usage :
+    python saison.py [--league F1] [-n 100000]
+"""
+import argparse
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from modele import (
+    CHAMPIONNATS, CHAMPIONNAT_DEFAUT, buts_attendus, charger_donnees, ajuster_modele, matrice_scores,
+    corriger_tirages, probabilites_1n2, parametres_championnat, generateur_aleatoire, forces_equipes,
+    classement_actuel, reindexer_classement
+)
+
+# Places européennes et places de relégation (barrages compris) de chaque championnat
+ZONES_CLASSEMENT = {
+    'F1': {'europe': 6, 'relegation': 3},
+    'E0': {'europe': 7, 'relegation': 3},
+    'SP1': {'europe': 7, 'relegation': 3},
+    'D1': {'europe': 7, 'relegation': 3},
+    'I1': {'europe': 7, 'relegation': 3}
+}
+# Taille des blocs de tirages (simulations x matchs restants), pour borner la mémoire
+TAILLE_BLOC = 2_000_000
+
+def matchs_restants(classement, equipes, calendrier=None):
+    """
+    Affiches (dom, ext) restant à jouer, d'après les affiches jouées du classement (aligné sur equipes).
+    Sans calendrier, toutes les affiches aller-retour du championnat pas encore jouées ;
+    sinon, les affiches du calendrier non jouées.
+    """
+    jouees = classement['affiches_jouees']
+    position = {equipe: i for i, equipe in enumerate(equipes)}
+    if calendrier is None:
+        calendrier = [(dom, ext) for dom in equipes for ext in equipes if dom != ext]
+    return [
+        (dom, ext) for dom, ext in calendrier
+        if not (dom in position and ext in position and jouees[position[dom], position[ext]])
+    ]
+
+def simuler_saison(actuel, idx_dom, idx_ext, buts_dom, buts_ext, n_simulations=10000, generateur=None, rho=0.0):
+    """
+    Positions finales simulées (n_simulations, n_equipes), 0 = premier, à partir du classement
+    actuel et des buts attendus des matchs restants (indices d'équipes idx_dom / idx_ext).
+    rho : correction de Dixon-Coles des petits scores (modele.corriger_tirages).
+    """
+    generateur = generateur or generateur_aleatoire()
+    n_equipes = len(actuel['points'])
+    n_matchs = len(idx_dom)
+    positions = np.empty((n_simulations, n_equipes), dtype=np.int16)
+    taille = max(1, TAILLE_BLOC // max(n_matchs, 1))
+
+    for debut in range(0, n_simulations, taille):
+        n = min(taille, n_simulations - debut)
+        tirage_dom = generateur.poisson(buts_dom, (n, n_matchs))
+        tirage_ext = generateur.poisson(buts_ext, (n, n_matchs))
+        if rho:
+            tirage_dom, tirage_ext = (t.T for t in corriger_tirages(
+                tirage_dom.T, tirage_ext.T, buts_dom, buts_ext, rho, generateur
+            ))
+        points_dom = np.where(tirage_dom > tirage_ext, 3, np.where(tirage_dom == tirage_ext, 1, 0))
+        points_ext = np.where(tirage_ext > tirage_dom, 3, np.where(tirage_dom == tirage_ext, 1, 0))
+
+        # Scatter-add sur (simulation, équipe) aplati : une ligne par saison simulée
+        decalage = np.arange(n)[:, None] * n_equipes
+        cle_dom = (decalage + idx_dom).ravel()
+        cle_ext = (decalage + idx_ext).ravel()
+
+        def cumuler(valeurs_dom, valeurs_ext):
+            somme = (np.bincount(cle_dom, valeurs_dom.ravel(), n * n_equipes)
+                     + np.bincount(cle_ext, valeurs_ext.ravel(), n * n_equipes))
+            return somme.reshape(n, n_equipes)
+
+        points = actuel['points'] + cumuler(points_dom, points_ext)
+        diff_buts = actuel['diff_buts'] + cumuler(tirage_dom - tirage_ext, tirage_ext - tirage_dom)
+        buts_pour = actuel['buts_pour'] + cumuler(tirage_dom, tirage_ext)
+
+        # Dernière clé de lexsort = critère principal ; ordre décroissant par négation
+        ordre = np.lexsort((generateur.random((n, n_equipes)), -buts_pour, -diff_buts, -points), axis=-1)
+        np.put_along_axis(positions[debut:debut + n], ordre, np.arange(n_equipes, dtype=np.int16), axis=-1)
+    return positions
+
+def projeter_saison(classement, stats, avg_h, avg_a, championnat=CHAMPIONNAT_DEFAUT, n_simulations=10000,
+                    calendrier=None, avantage_domicile=1.0, generateur=None, rho=0.0):
+    """
+    Projection de fin de saison d'un championnat : une entrée par équipe (points actuels, points
+    et position moyens, distribution des positions et probabilités titre / Europe / relégation, en %),
+    triée par position moyenne. classement : modele.classement_actuel des matchs joués (celui du modèle
+    publié pour /season) ; stats : ForcesEquipes du modèle ou DataFrame de stats ;
+    rho : corrélation des petits scores d'un modèle Dixon-Coles.
+    """
+    if calendrier is not None and any(dom == ext for dom, ext in calendrier):
+        raise ValueError("Une équipe ne peut pas se rencontrer elle-même")
+    stats = forces_equipes(stats)
+    equipes = sorted(stats.equipes)
+    actuel = reindexer_classement(classement, equipes)
+    restants = matchs_restants(actuel, equipes, calendrier)
+    inconnues = {equipe for affiche in restants for equipe in affiche} - set(equipes)
+    if inconnues:
+        raise ValueError(f"Équipes inconnues dans le calendrier : {', '.join(sorted(inconnues))}")
+
+    dom = [affiche[0] for affiche in restants]
+    ext = [affiche[1] for affiche in restants]
+    buts_dom, buts_ext = buts_attendus(stats, avg_h, avg_a, dom, ext, avantage_domicile)
+    index = pd.Index(equipes)
+    positions = simuler_saison(
+        actuel, index.get_indexer(dom), index.get_indexer(ext), buts_dom, buts_ext, n_simulations, generateur, rho
+    )
+
+    # Points attendus exacts (moteur exact), sans bruit de simulation
+    points_attendus = actuel['points'].astype(float)
+    if restants:
+        prob_1, prob_N, prob_2 = probabilites_1n2(matrice_scores(buts_dom, buts_ext, rho=rho))
+        points_attendus += np.bincount(index.get_indexer(dom), 3 * prob_1 + prob_N, len(equipes))
+        points_attendus += np.bincount(index.get_indexer(ext), 3 * prob_2 + prob_N, len(equipes))
+
+    n_equipes = len(equipes)
+    distribution = np.stack([np.bincount(positions[:, j], minlength=n_equipes) for j in range(n_equipes)])
+    distribution = distribution / n_simulations * 100
+    zones = ZONES_CLASSEMENT.get(championnat, {'europe': 0, 'relegation': 0})
+
+    classement = []
+    for j, equipe in enumerate(equipes):
+        classement.append({
+            'equipe': equipe,
+            'joues': int(actuel['joues'][j]),
+            'points': int(actuel['points'][j]),
+            'points_attendus': round(float(points_attendus[j]), 1),
+            'position_moyenne': round(float(positions[:, j].mean() + 1), 2),
+            'prob_titre': round(float(distribution[j, 0]), 1),
+            'prob_europe': round(float(distribution[j, :zones['europe']].sum()), 1),
+            'prob_relegation': round(float(distribution[j, n_equipes - zones['relegation']:].sum()), 1)
+                               if zones['relegation'] else 0.0,
+            'positions': [round(float(p), 2) for p in distribution[j]]
+        })
+    classement.sort(key=lambda ligne: ligne['position_moyenne'])
+    return {'matchs_restants': len(restants), 'classement': classement}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulation Monte Carlo de la fin de saison")
+    parser.add_argument('--league', choices=list(CHAMPIONNATS), default=CHAMPIONNAT_DEFAUT)
+    parser.add_argument('-n', '--simulations', type=int, default=100000)
+    parser.add_argument('--seed', type=int, help="Graine des tirages (résultats reproductibles)")
+    args = parser.parse_args(argv)
+
+    parametres = parametres_championnat(args.league)
+    df = charger_donnees(args.league, plafond=parametres['plafond'])
+    stats, avg_h, avg_a, rho = ajuster_modele(df, parametres['span'], parametres['type_modele'])
+    debut = time.perf_counter()
+    projection = projeter_saison(
+        classement_actuel(df, stats.index.tolist()), stats, avg_h, avg_a, args.league, args.simulations,
+        avantage_domicile=parametres['avantage_domicile'], generateur=generateur_aleatoire(args.seed),
+        rho=rho
+    )
+    duree = time.perf_counter() - debut
+
+    print(f"{CHAMPIONNATS[args.league]} : {projection['matchs_restants']} matchs restants, "
+          f"{args.simulations} saisons simulées en {duree:.2f}s")
+    print(f"{'Équipe':<25} {'Pts':>4} {'Pts att.':>8} {'Pos. moy.':>9} {'Titre':>7} {'Europe':>7} {'Relég.':>7}")
+    for ligne in projection['classement']:
+        print(f"{ligne['equipe']:<25} {ligne['points']:>4} {ligne['points_attendus']:>8.1f} "
+              f"{ligne['position_moyenne']:>9.2f} {ligne['prob_titre']:>6.1f}% "
+              f"{ligne['prob_europe']:>6.1f}% {ligne['prob_relegation']:>6.1f}%")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Snapshot binaire des modèles entraînés, pour démarrer le serveur sans téléchargement ni entraînement.
+
+Format : un unique fichier .npy contenant un tableau structuré NumPy, une ligne par équipe
+(championnat, équipe, 8 statistiques, moyennes du championnat, empreinte SHA-256 du CSV source,
+paramètres du modèle, corrélation rho d'un modèle Dixon-Coles, classement actuel et adversaires
+déjà reçus, dans l'ordre des équipes du championnat).
+Il se charge en mémoire partagée avec np.load(mmap_mode='r').
+
+Usage :
+    python snapshot.py build [--output modeles.npy] [--leagues F1 E0]
+    python snapshot.py check [--output modeles.npy]
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+from cache_donnees import ecrire_atomique
+from modele import (
+    CHAMPIONNATS, COLONNES_STATS, COLONNES_FORCES, ForcesEquipes, lire_csv_brut, empreinte_donnees,
+    preparer_donnees, ajuster_modele, construire_modele, parametres_championnat, classement_actuel
+)
+
+CHEMIN_DEFAUT = os.getenv('FOOT_SNAPSHOT', 'modeles.npy')
+CHAMPS_SNAPSHOT = (
+    'championnat', 'equipe', 'stats', 'avg_home', 'avg_away', 'empreinte', 'span', 'plafond', 'avantage_domicile',
+    'type_modele', 'rho', 'classement', 'affiches_jouees'
+)
+# Snapshots plus anciens, toujours lisibles : sans classement (/season indisponible), puis sans Dixon-Coles (rho nul)
+CHAMPS_SNAPSHOT_SANS_CLASSEMENT = CHAMPS_SNAPSHOT[:-2]
+CHAMPS_SNAPSHOT_EWMA = CHAMPS_SNAPSHOT[:-4]
+# Colonnes du champ classement
+COLONNES_CLASSEMENT = ('points', 'diff_buts', 'buts_pour', 'joues')
+
+def _dtype_snapshot(largeur_nom, n_equipes):
+    return np.dtype([
+        ('championnat', 'U8'),
+        ('equipe', f'U{largeur_nom}'),
+        ('stats', 'f8', (len(COLONNES_STATS),)),
+        ('avg_home', 'f8'),
+        ('avg_away', 'f8'),
+        ('empreinte', 'U64'),
+        ('span', 'i4'),
+        ('plafond', 'f8'),
+        ('avantage_domicile', 'f8'),
+        ('type_modele', 'U12'),
+        ('rho', 'f8'),
+        ('classement', 'f8', (len(COLONNES_CLASSEMENT),)),
+        # Ligne i, colonne j : l'équipe i a déjà reçu la j-ième équipe de son championnat
+        ('affiches_jouees', '?', (n_equipes,))
+    ])
+
+def construire_snapshot(chemin=CHEMIN_DEFAUT, championnats=None, cache=None):
+    """Télécharge (via le cache), entraîne avec les paramètres de chaque championnat et sérialise"""
+    blocs = []
+    for championnat in championnats or CHAMPIONNATS:
+        debut = time.perf_counter()
+        contenu = lire_csv_brut(championnat, cache)
+        parametres = parametres_championnat(championnat)
+        df = preparer_donnees(contenu, parametres['plafond'])
+        stats, avg_h, avg_a, rho = ajuster_modele(df, parametres['span'], parametres['type_modele'])
+        classement = classement_actuel(df, stats.index.tolist())
+        blocs.append((championnat, stats, avg_h, avg_a, empreinte_donnees(contenu), parametres, rho, classement))
+        print(f"✅ {CHAMPIONNATS[championnat]} : {len(stats)} équipes ({time.perf_counter() - debut:.2f}s)")
+
+    largeur_nom = max(len(equipe) for _, stats, *_ in blocs for equipe in stats.index)
+    n_equipes = max(len(stats) for _, stats, *_ in blocs)
+    lignes = []
+    for championnat, stats, avg_h, avg_a, empreinte, parametres, rho, classement in blocs:
+        bloc = np.zeros(len(stats), dtype=_dtype_snapshot(largeur_nom, n_equipes))
+        bloc['championnat'] = championnat
+        bloc['equipe'] = stats.index.tolist()
+        bloc['stats'] = stats[COLONNES_STATS].to_numpy()
+        bloc['avg_home'] = avg_h
+        bloc['avg_away'] = avg_a
+        bloc['empreinte'] = empreinte
+        for cle, valeur in parametres.items():
+            bloc[cle] = valeur
+        bloc['rho'] = rho
+        bloc['classement'] = np.column_stack([classement[cle] for cle in COLONNES_CLASSEMENT])
+        bloc['affiches_jouees'][:, :len(stats)] = classement['affiches_jouees']
+        lignes.append(bloc)
+    tableau = np.concatenate(lignes)
+
+    # Écriture atomique : un serveur qui démarre ne lit jamais un snapshot à moitié écrit
+    def ecrire(temporaire):
+        # Fichier ouvert plutôt que chemin : np.save ajouterait .npy au nom temporaire
+        with open(temporaire, 'wb') as f:
+            np.save(f, tableau)
+
+    ecrire_atomique(chemin, ecrire)
+    return tableau
+
+def _lire_tableau(chemin):
+    tableau = np.load(chemin, mmap_mode='r')
+    if tableau.dtype.names not in (CHAMPS_SNAPSHOT, CHAMPS_SNAPSHOT_SANS_CLASSEMENT, CHAMPS_SNAPSHOT_EWMA):
+        raise ValueError(f"Format de snapshot incompatible : {chemin}")
+    return tableau
+
+def _modele_depuis_bloc(bloc):
+    """Forces compactes, moyennes, empreinte, paramètres, rho et classement d'un bloc du snapshot, sans pandas"""
+    colonnes = [COLONNES_STATS.index(colonne) for colonne in COLONNES_FORCES]
+    avec_rho = 'rho' in bloc.dtype.names
+    classement = None
+    if 'classement' in bloc.dtype.names:
+        classement = {'equipes': tuple(bloc['equipe'].tolist())}
+        classement.update({cle: bloc['classement'][:, k].copy() for k, cle in enumerate(COLONNES_CLASSEMENT)})
+        classement['joues'] = classement['joues'].astype(np.int64)
+        classement['affiches_jouees'] = bloc['affiches_jouees'][:, :len(bloc)].copy()
+    return {
+        'forces': ForcesEquipes(bloc['equipe'].tolist(), bloc['stats'][:, colonnes]),
+        'avg_home': float(bloc['avg_home'][0]),
+        'avg_away': float(bloc['avg_away'][0]),
+        'empreinte': str(bloc['empreinte'][0]),
+        'parametres': {
+            'span': int(bloc['span'][0]),
+            'plafond': float(bloc['plafond'][0]),
+            'avantage_domicile': float(bloc['avantage_domicile'][0]),
+            'type_modele': str(bloc['type_modele'][0]) if avec_rho else 'ewma'
+        },
+        'rho': float(bloc['rho'][0]) if avec_rho else 0.0,
+        'classement': classement
+    }
+
+def lire_modele_snapshot(chemin, championnat):
+    """Forces et paramètres d'un seul championnat (None s'il est absent), pour la ligne de commande"""
+    tableau = _lire_tableau(chemin)
+    bloc = tableau[tableau['championnat'] == championnat]
+    return _modele_depuis_bloc(bloc) if len(bloc) else None
+
+def charger_snapshot(chemin=CHEMIN_DEFAUT):
+    """Modèles {championnat: modèle} reconstruits depuis le snapshot, prêts pour MODELES_CHAMPIONNAT"""
+    tableau = _lire_tableau(chemin)
+    codes = tableau['championnat']
+    modeles = {}
+    for championnat in dict.fromkeys(codes.tolist()):
+        lu = _modele_depuis_bloc(tableau[codes == championnat])
+        modeles[championnat] = construire_modele(
+            lu['forces'], lu['avg_home'], lu['avg_away'], lu['empreinte'], parametres=lu['parametres'], rho=lu['rho'],
+            classement=lu['classement']
+        )
+    return modeles
+
+def championnats_perimes(chemin=CHEMIN_DEFAUT, championnats=None, cache=None):
+    """Championnats dont le CSV source a changé depuis le snapshot (ou qui en sont absents)"""
+    tableau = _lire_tableau(chemin)
+    empreintes = dict(zip(tableau['championnat'].tolist(), tableau['empreinte'].tolist()))
+    perimes = []
+    for championnat in championnats or list(empreintes):
+        if empreintes.get(championnat) != empreinte_donnees(lire_csv_brut(championnat, cache)):
+            perimes.append(championnat)
+    return perimes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot des modèles entraînés")
+    sous_commandes = parser.add_subparsers(dest='commande', required=True)
+    for nom, aide in (('build', "Entraîne et écrit le snapshot"), ('check', "Vérifie si le snapshot est périmé")):
+        sous_parser = sous_commandes.add_parser(nom, help=aide)
+        sous_parser.add_argument('--output', default=CHEMIN_DEFAUT, help="Chemin du snapshot (.npy)")
+        sous_parser.add_argument('--leagues', nargs='+', choices=list(CHAMPIONNATS), help="Championnats (défaut : tous)")
+    args = parser.parse_args(argv)
+
+    if args.commande == 'build':
+        tableau = construire_snapshot(args.output, args.leagues)
+        print(f"💾 Snapshot écrit : {args.output} ({len(tableau)} équipes, {os.path.getsize(args.output)} octets)")
+        return 0
+
+    perimes = championnats_perimes(args.output, args.leagues)
+    if perimes:
+        print(f"⚠️ Snapshot périmé pour : {', '.join(perimes)}")
+        return 1
+    print("✅ Snapshot à jour")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
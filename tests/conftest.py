@@ -0,0 +1,93 @@
+"""
+Environnement des tests : données locales (tests/donnees), sans réseau, configuration et cache isolés.
+Le dossier contient F1.csv (championnat par défaut, entraîné à l'import d'app.py) et E0.csv.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+DOSSIER_DONNEES = Path(__file__).parent / 'donnees'
+
+os.environ.setdefault('FOOT_DOSSIER_DONNEES', str(DOSSIER_DONNEES))
+os.environ.setdefault('FOOT_CACHE_DIR', tempfile.mkdtemp(prefix='foot-cache-'))
+os.environ.setdefault('FOOT_CONFIG_MODELES', os.path.join(tempfile.mkdtemp(prefix='foot-config-'), 'config_modeles.json'))
+os.environ.setdefault('FOOT_PRECHAUFFAGE', '0')
+
+def prefixe(contenu, n_matchs):
+    """CSV limité à l'en-tête et aux n_matchs premières lignes"""
+    return b''.join(contenu.splitlines(keepends=True)[:n_matchs + 1])
+
+@pytest.fixture
+def contenu_csv():
+    """CSV football-data d'une saison complète de Premier League (380 matchs)"""
+    return (DOSSIER_DONNEES / 'E0.csv').read_bytes()
+
+@pytest.fixture
+def contenu_csv_f1():
+    """CSV football-data d'une saison complète de Ligue 1 (306 matchs), championnat par défaut de l'application"""
+    return (DOSSIER_DONNEES / 'F1.csv').read_bytes()
+
+class ServeurCSV:
+    """
+    Source HTTP locale à la place de football-data.co.uk : sert tests/donnees avec un ETag,
+    répond 304 à If-None-Match, peut simuler des pannes (5xx) et de la latence, compte les requêtes.
+    """
+
+    def __init__(self):
+        self.requetes = []
+        self.pannes = 0
+        self.latence = 0.0
+        self._verrou = threading.Lock()
+        serveur = self
+
+        class Gestionnaire(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with serveur._verrou:
+                    serveur.requetes.append((self.path, self.headers.get('If-None-Match')))
+                    panne = serveur.pannes > 0
+                    serveur.pannes -= panne
+                time.sleep(serveur.latence)
+                if panne:
+                    self.send_error(503)
+                    return
+                chemin = DOSSIER_DONNEES / self.path.rsplit('/', 1)[-1]
+                if not chemin.exists():
+                    self.send_error(404)
+                    return
+                contenu = chemin.read_bytes()
+                etag = f'"{hashlib.sha256(contenu).hexdigest()[:16]}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(contenu)))
+                self.end_headers()
+                self.wfile.write(contenu)
+
+            def log_message(self, *args):
+                pass
+
+        self._http = ThreadingHTTPServer(('127.0.0.1', 0), Gestionnaire)
+        self.url = f'http://127.0.0.1:{self._http.server_port}'
+        threading.Thread(target=self._http.serve_forever, args=(0.05,), daemon=True).start()
+
+    def url_csv(self, championnat, saison='2526'):
+        return f'{self.url}/mmz4281/{saison}/{championnat}.csv'
+
+    def arreter(self):
+        self._http.shutdown()
+        self._http.server_close()
+
+@pytest.fixture
+def serveur_csv():
+    serveur = ServeurCSV()
+    yield serveur
+    serveur.arreter()
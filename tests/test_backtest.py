@@ -0,0 +1,43 @@
+"""Backtest walk-forward : mêmes buts attendus qu'un réentraînement sur les matchs précédents, échauffement"""
+import numpy as np
+import pytest
+
+import modele
+from backtest import backtester, matchs_notes, rejouer, tableaux_matchs
+
+@pytest.mark.parametrize('span, plafond', [(10, 3.5), (4, 2.5)])
+def test_rejouer_egal_reentrainement(contenu_csv, span, plafond):
+    df = modele.preparer_donnees(contenu_csv, plafond).sort_values('match_order', kind='stable')
+    t = tableaux_matchs(df)
+    buts_dom, buts_ext = rejouer(t['dom'], t['ext'], t['buts_dom'], t['buts_ext'], len(t['equipes']), span, plafond)
+
+    verifies = 0
+    for i in range(1, len(df), 7):
+        stats, avg_h, avg_a = modele.entrainer_modele(df.iloc[:i], span)
+        dom, ext = df['home_team'].iloc[i], df['away_team'].iloc[i]
+        if dom not in stats.index or ext not in stats.index:
+            continue
+        attendu_dom, attendu_ext = modele.buts_attendus(stats, avg_h, avg_a, [dom], [ext])
+        assert buts_dom[i] == pytest.approx(attendu_dom[0], rel=1e-9)
+        assert buts_ext[i] == pytest.approx(attendu_ext[0], rel=1e-9)
+        verifies += 1
+    assert verifies > 40
+
+def test_matchs_notes():
+    dom = np.array([0, 1, 0, 2, 0, 1])
+    ext = np.array([1, 2, 2, 0, 1, 0])
+    # Matchs antérieurs : dom. [0, 0, 1, 0, 2, 1], ext. [0, 0, 1, 0, 1, 1]
+    np.testing.assert_array_equal(matchs_notes(dom, ext, 0), np.ones(6, dtype=bool))
+    np.testing.assert_array_equal(matchs_notes(dom, ext, 1), [False, False, True, False, True, True])
+    np.testing.assert_array_equal(matchs_notes(dom, ext, 2), [False] * 6)
+
+def test_echauffement_par_defaut(contenu_csv):
+    df = modele.preparer_donnees(contenu_csv)
+    _, sans_echauffement = backtester(df, echauffement=0)
+    details, resultat = backtester(df)
+
+    # Les premières journées, sans historique, ne comptent plus : mieux qu'avant et que le hasard
+    assert resultat['n_matchs'] < sans_echauffement['n_matchs']
+    assert resultat['log_loss'] < sans_echauffement['log_loss']
+    assert resultat['log_loss'] < 1.2
+    assert len(details) == len(df)
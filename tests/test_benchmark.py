@@ -0,0 +1,30 @@
+"""Banc d'essai : comparaison à la référence versionnée"""
+import json
+
+import benchmark
+
+def test_comparer():
+    reference = {'a': {'median_ms': 10.0}, 'b': {'median_ms': 10.0}, 'c': {'median_ms': 0.0}}
+    resultats = {'a': {'median_ms': 12.0}, 'b': {'median_ms': 13.0}, 'c': {'median_ms': 1.0}, 'd': {'median_ms': 1.0}}
+
+    lignes, regressions = benchmark.comparer(resultats, reference, seuil=0.25)
+
+    assert [ligne[0] for ligne in lignes] == ['a', 'b']
+    assert [ligne[0] for ligne in regressions] == ['b']
+
+def test_reference_versionnee():
+    with open(benchmark.REFERENCE_DEFAUT, encoding='utf-8') as f:
+        reference = json.load(f)
+
+    # Exécution complète : toutes les mesures par défaut ont une valeur de référence
+    attendues = {'simulation/exact', 'simulation/adaptatif/tolerance=0.5'}
+    for n_equipes in benchmark.EQUIPES_DEFAUT:
+        for n_journees in benchmark.JOURNEES_DEFAUT:
+            for etape in ('lecture', 'ewma'):
+                attendues.add(f'entrainement/{etape}/equipes={n_equipes},journees={n_journees}')
+    attendues |= {f'simulation/montecarlo/n={n}' for n in benchmark.SIMULATIONS_DEFAUT}
+    assert attendues <= set(reference['resultats'])
+    assert sum(nom.startswith('http/') for nom in reference['resultats']) == 5
+    assert all(mesure['median_ms'] > 0 for mesure in reference['resultats'].values())
+    assert not benchmark.ecarts_environnement(reference['environnement'], reference['environnement'])
+    assert set(benchmark.CHAMPS_ENVIRONNEMENT) <= set(reference['environnement'])
@@ -0,0 +1,91 @@
+"""Cache disque des CSV : revalidation conditionnelle, repli sur la copie locale, mode hors ligne"""
+import hashlib
+import os
+
+import pytest
+
+from cache_donnees import CacheCSV, RecuperateurDossier, RecuperateurHTTP, ecrire_atomique
+from conftest import DOSSIER_DONNEES
+
+class RecuperateurInterdit:
+    """Source qui ne doit jamais être contactée"""
+
+    def recuperer(self, url, etag=None, last_modified=None):
+        raise AssertionError(f"source contactée : {url}")
+
+def test_revalidation_304(serveur_csv, tmp_path, contenu_csv):
+    cache = CacheCSV(str(tmp_path), RecuperateurHTTP(timeout=5))
+    url = serveur_csv.url_csv('E0')
+
+    assert cache.lire(url) == contenu_csv
+    etag = cache.metadonnees(url)['etag']
+    assert cache.lire(url) == contenu_csv
+
+    # Deuxième lecture : requête conditionnelle, 304 sans corps, copie locale servie
+    assert serveur_csv.requetes == [('/mmz4281/2526/E0.csv', None), ('/mmz4281/2526/E0.csv', etag)]
+    assert cache.metadonnees(url)['sha256'] == hashlib.sha256(contenu_csv).hexdigest()
+
+def test_repli_si_source_indisponible(serveur_csv, tmp_path, contenu_csv):
+    cache = CacheCSV(str(tmp_path), RecuperateurHTTP(timeout=5))
+    url = serveur_csv.url_csv('E0')
+    cache.lire(url)
+
+    serveur_csv.arreter()
+    assert cache.lire(url) == contenu_csv
+
+def test_source_indisponible_sans_copie(serveur_csv, tmp_path):
+    cache = CacheCSV(str(tmp_path), RecuperateurHTTP(timeout=5))
+    serveur_csv.pannes = 1
+
+    with pytest.raises(OSError):
+        cache.lire(serveur_csv.url_csv('E0'))
+    assert cache.metadonnees(serveur_csv.url_csv('E0')) is None
+
+def test_hors_ligne(serveur_csv, tmp_path, contenu_csv):
+    url = serveur_csv.url_csv('E0')
+    CacheCSV(str(tmp_path), RecuperateurHTTP(timeout=5)).lire(url)
+
+    hors_ligne = CacheCSV(str(tmp_path), RecuperateurInterdit(), hors_ligne=True)
+    assert hors_ligne.lire(url) == contenu_csv
+    with pytest.raises(FileNotFoundError):
+        hors_ligne.lire(serveur_csv.url_csv('F1'))
+
+def test_recuperateur_dossier(tmp_path, contenu_csv):
+    # Dossier par saison prioritaire, dossier racine sinon
+    (tmp_path / '2425').mkdir()
+    (tmp_path / '2425' / 'E0.csv').write_bytes(b'ancienne saison')
+    (tmp_path / 'E0.csv').write_bytes(contenu_csv)
+    recuperateur = RecuperateurDossier(str(tmp_path))
+
+    assert recuperateur.recuperer('https://source/mmz4281/2425/E0.csv').contenu == b'ancienne saison'
+    reponse = recuperateur.recuperer('https://source/mmz4281/2526/E0.csv')
+    assert (reponse.statut, reponse.contenu) == (200, contenu_csv)
+    assert recuperateur.recuperer('https://source/mmz4281/2526/E0.csv', etag=reponse.etag).statut == 304
+
+    # Fichier modifié : nouvel ETag, nouveau contenu
+    os.utime(tmp_path / 'E0.csv', ns=(0, 0))
+    assert recuperateur.recuperer('https://source/mmz4281/2526/E0.csv', etag=reponse.etag).statut == 200
+
+def test_cache_sur_dossier(tmp_path, contenu_csv):
+    cache = CacheCSV(str(tmp_path / 'cache'), RecuperateurDossier(str(DOSSIER_DONNEES)))
+    url = 'https://source/mmz4281/2526/E0.csv'
+
+    assert cache.lire(url) == contenu_csv
+    assert cache.lire(url) == contenu_csv
+    assert cache.metadonnees(url)['etag'] is not None
+
+def test_ecriture_atomique(tmp_path):
+    chemin = str(tmp_path / 'sous-dossier' / 'fichier.json')
+    ecrire_atomique(chemin, b'{"version": 1}')
+    assert open(chemin, 'rb').read() == b'{"version": 1}'
+
+    def ecriture_interrompue(temporaire):
+        with open(temporaire, 'wb') as f:
+            f.write(b'{"vers')
+        raise OSError("disque plein")
+
+    # Échec en cours d'écriture : l'ancien fichier reste intact et le temporaire est supprimé
+    with pytest.raises(OSError, match='disque plein'):
+        ecrire_atomique(chemin, ecriture_interrompue)
+    assert open(chemin, 'rb').read() == b'{"version": 1}'
+    assert os.listdir(tmp_path / 'sous-dossier') == ['fichier.json']
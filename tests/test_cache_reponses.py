@@ -0,0 +1,117 @@
+"""Cache des réponses de /predict : LRU borné, durée de vie, purge par championnat et stockage partagé"""
+import types
+
+import pytest
+
+import app
+import cache_reponses
+from cache_reponses import CacheReponses, StockageMemoire
+
+class Horloge:
+    def __init__(self):
+        self.maintenant = 1000.0
+
+    def __call__(self):
+        return self.maintenant
+
+@pytest.fixture
+def horloge(monkeypatch):
+    horloge = Horloge()
+    monkeypatch.setattr(cache_reponses, 'time', types.SimpleNamespace(monotonic=horloge))
+    return horloge
+
+def test_lru_borne():
+    cache = CacheReponses(taille_max=2)
+    for nom in ('a', 'b'):
+        cache.stocker(CacheReponses.cle('F1', nom), {'nom': nom})
+    # 'a' relu : c'est 'b' le moins récemment utilisé
+    assert cache.obtenir(CacheReponses.cle('F1', 'a')) == {'nom': 'a'}
+    cache.stocker(CacheReponses.cle('F1', 'c'), {'nom': 'c'})
+
+    assert cache.obtenir(CacheReponses.cle('F1', 'b')) is None
+    assert cache.obtenir(CacheReponses.cle('F1', 'a')) == {'nom': 'a'}
+    stats = cache.statistiques()
+    assert (stats['entrees'], stats['evictions'], stats['hits'], stats['misses']) == (2, 1, 2, 1)
+
+def test_duree_de_vie(horloge):
+    cache = CacheReponses(duree_vie=300)
+    cle = CacheReponses.cle('F1', 'Paris SG', 'Lyon')
+    cache.stocker(cle, {'prob_1': 60.0})
+
+    horloge.maintenant += 299
+    assert cache.obtenir(cle) == {'prob_1': 60.0}
+    horloge.maintenant += 1
+    assert cache.obtenir(cle) is None
+    assert cache.statistiques()['expirations'] == 1 and cache.statistiques()['entrees'] == 0
+
+def test_copie_independante():
+    cache = CacheReponses()
+    cle = CacheReponses.cle('F1', 'x')
+    cache.stocker(cle, {'prob_1': 60.0})
+    # /predict ajoute la version à la réponse lue : l'entrée en cache ne doit pas changer
+    cache.obtenir(cle)['version_modele'] = 3
+    assert cache.obtenir(cle) == {'prob_1': 60.0}
+
+def test_invalidation_par_championnat():
+    cache = CacheReponses()
+    cache.stocker(CacheReponses.cle('F1', 'x'), {'n': 1})
+    cache.stocker(CacheReponses.cle('F1', 'y'), {'n': 2})
+    cache.stocker(CacheReponses.cle('F10', 'x'), {'n': 3})
+
+    cache.invalider('F1')
+    assert cache.obtenir(CacheReponses.cle('F1', 'x')) is None
+    assert cache.obtenir(CacheReponses.cle('F10', 'x')) == {'n': 3}
+    assert cache.statistiques()['invalidations'] == 2
+
+def test_stockage_partage_entre_workers(horloge):
+    stockage = StockageMemoire()
+    premier = CacheReponses(duree_vie=60, stockage=stockage)
+    second = CacheReponses(duree_vie=60, stockage=stockage)
+    cle = CacheReponses.cle('F1', 'x')
+
+    premier.stocker(cle, {'n': 1})
+    assert second.obtenir(cle) == {'n': 1}
+    assert second.statistiques()['hits_partages'] == 1
+    # Recopiée en local : la lecture suivante ne passe plus par le stockage partagé
+    assert second.obtenir(cle) == {'n': 1}
+    assert second.statistiques()['hits'] == 1
+
+    horloge.maintenant += 60
+    assert CacheReponses(stockage=stockage).obtenir(cle) is None
+
+def test_stockage_partage_indisponible():
+    class StockageEnPanne:
+        def lire(self, cle):
+            raise ConnectionError("redis injoignable")
+
+        def ecrire(self, cle, valeur, duree_vie):
+            raise ConnectionError("redis injoignable")
+
+    cache = CacheReponses(stockage=StockageEnPanne())
+    cle = CacheReponses.cle('F1', 'x')
+    assert cache.obtenir(cle) is None
+    cache.stocker(cle, {'n': 1})
+    assert cache.obtenir(cle) == {'n': 1}
+    assert cache.statistiques()['erreurs_partage'] == 2
+
+def test_cache_desactive():
+    cache = CacheReponses(taille_max=0)
+    cache.stocker(CacheReponses.cle('F1', 'x'), {'n': 1})
+    assert cache.obtenir(CacheReponses.cle('F1', 'x')) is None
+    assert cache.statistiques()['entrees'] == 0
+
+def test_predict_hit_puis_purge_a_la_publication(monkeypatch):
+    monkeypatch.setattr(app, 'CACHE_REPONSES', CacheReponses())
+    client = app.app.test_client()
+    requete = {'league': 'F1', 'home_team': 'Paris SG', 'away_team': 'Marseille', 'engine': 'exact'}
+
+    premiere = client.post('/predict', json=requete)
+    seconde = client.post('/predict', json=requete)
+    assert (premiere.headers['X-Cache'], seconde.headers['X-Cache']) == ('MISS', 'HIT')
+    assert premiere.get_json() == seconde.get_json()
+
+    # Nouvelle version publiée : ses entrées locales sont purgées
+    app.MODELES_CHAMPIONNAT.publier('F1', dict(app.MODELES_CHAMPIONNAT['F1']))
+    troisieme = client.post('/predict', json=requete)
+    assert troisieme.headers['X-Cache'] == 'MISS'
+    assert troisieme.get_json()['version_modele'] == seconde.get_json()['version_modele'] + 1
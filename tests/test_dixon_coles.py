@@ -0,0 +1,72 @@
+"""Dixon-Coles : gradient analytique, convergence du L-BFGS, tirages Monte Carlo corrigés"""
+import json
+
+import numpy as np
+import pytest
+
+import modele
+from dixon_coles import ITERATIONS_MAX, RHO_MAX, ajuster_dixon_coles, objectif, tableaux_dixon_coles
+
+@pytest.fixture
+def tableaux(contenu_csv):
+    return tableaux_dixon_coles(modele.preparer_donnees(contenu_csv), span=10)
+
+def test_gradient_differences_finies(tableaux):
+    n = len(tableaux['equipes'])
+    generateur = np.random.default_rng(0)
+    theta = np.concatenate([generateur.normal(0, 0.3, 2 * n), [0.2, 0.25, -0.4]])
+
+    _, gradient = objectif(theta, tableaux)
+    pas = 1e-6
+    numerique = np.empty_like(theta)
+    for k in range(len(theta)):
+        ecart = np.zeros_like(theta)
+        ecart[k] = pas
+        numerique[k] = (objectif(theta + ecart, tableaux)[0] - objectif(theta - ecart, tableaux)[0]) / (2 * pas)
+
+    np.testing.assert_allclose(gradient, numerique, rtol=1e-5, atol=1e-8)
+
+def test_ajustement_converge(contenu_csv, tableaux):
+    df = modele.preparer_donnees(contenu_csv)
+    ajustement = ajuster_dixon_coles(df, span=10)
+
+    assert ajustement['iterations'] < ITERATIONS_MAX
+    theta = np.concatenate([
+        ajustement['attaque'], ajustement['defense'],
+        [ajustement['intercept'], ajustement['avantage'], np.arctanh(ajustement['rho'] / RHO_MAX)]
+    ])
+    valeur, gradient = objectif(theta, tableaux)
+    assert np.max(np.abs(gradient)) < 1e-5
+    assert -valeur == pytest.approx(ajustement['log_vraisemblance'])
+    # Mieux que le point de départ : forces nulles, moyennes de buts pondérées
+    depart = np.zeros_like(theta)
+    depart[-3] = np.log(np.average(tableaux['y'], weights=tableaux['poids']))
+    depart[-2] = np.log(np.average(tableaux['x'], weights=tableaux['poids'])) - depart[-3]
+    assert valeur < objectif(depart, tableaux)[0]
+    assert abs(ajustement['rho']) < RHO_MAX
+
+@pytest.mark.parametrize('rho', [-0.15, 0.1])
+def test_tirages_corriges_egaux_au_moteur_exact(rho):
+    forces = modele.ForcesEquipes(['A', 'B'], np.ones((2, 4)))
+    exact = modele.predire_et_simuler('A', 'B', forces, 1.3, 0.9, engine='exact', rho=rho)
+    simule = modele.predire_et_simuler(
+        'A', 'B', forces, 1.3, 0.9, n_simulations=400000, generateur=modele.generateur_aleatoire(3), rho=rho
+    )
+    for issue in ('prob_1', 'prob_N', 'prob_2'):
+        assert simule[issue] == pytest.approx(exact[issue], abs=0.5)
+
+    # Petits scores : fréquences tirées = probabilités corrigées
+    matrice = modele.distribution_scores([1.3], [0.9], 400000, generateur=modele.generateur_aleatoire(4), rho=rho)
+    attendu = modele.matrice_scores([1.3], [0.9], rho=rho)
+    np.testing.assert_allclose(matrice[0, :2, :2], attendu[0, :2, :2], atol=3e-3)
+
+def test_avantage_domicile_neutre(contenu_csv, tmp_path):
+    chemin = tmp_path / 'config_modeles.json'
+    chemin.write_text(json.dumps({'E0': {'type_modele': 'dixon_coles', 'avantage_domicile': 1.2}}))
+    parametres = modele.parametres_championnat('E0', str(chemin))
+    assert parametres['avantage_domicile'] == 1.0
+
+    mod = modele.entrainer_depuis_csv(contenu_csv, avantage_domicile=1.2, type_modele='dixon_coles')
+    assert mod['parametres']['avantage_domicile'] == 1.0
+    # Mêmes paramètres, même CSV : le modèle publié est réutilisé, pas réentraîné
+    assert modele.actualiser_depuis_csv(mod, contenu_csv, avantage_domicile=1.2, type_modele='dixon_coles') is mod
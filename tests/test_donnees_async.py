@@ -0,0 +1,87 @@
+"""Chargement asynchrone : requêtes conditionnelles httpx, nouvelles tentatives, repli et single-flight"""
+import asyncio
+import threading
+
+import pytest
+
+import modele
+from cache_donnees import CacheCSV, RecuperateurHTTP
+from donnees_async import ChargeurAsync, RecuperateurAsync
+from registre import RegistreModeles
+
+def lire(cache, url, recuperateur):
+    async def lecture():
+        try:
+            return await cache.lire_async(url, recuperateur)
+        finally:
+            await recuperateur.fermer()
+    return asyncio.run(lecture())
+
+def test_revalidation_304(serveur_csv, tmp_path, contenu_csv):
+    cache = CacheCSV(str(tmp_path))
+    url = serveur_csv.url_csv('E0')
+
+    assert lire(cache, url, RecuperateurAsync(timeout=5)) == contenu_csv
+    etag = cache.metadonnees(url)['etag']
+    assert lire(cache, url, RecuperateurAsync(timeout=5)) == contenu_csv
+
+    assert [entetes for _, entetes in serveur_csv.requetes] == [None, etag]
+
+def test_nouvelles_tentatives(serveur_csv, tmp_path, contenu_csv):
+    serveur_csv.pannes = 2
+
+    recuperateur = RecuperateurAsync(timeout=5, tentatives=3, delai=0.01)
+    contenu = lire(CacheCSV(str(tmp_path)), serveur_csv.url_csv('E0'), recuperateur)
+
+    assert contenu == contenu_csv
+    assert len(serveur_csv.requetes) == 3
+
+def test_erreur_client_sans_nouvelle_tentative(serveur_csv, tmp_path):
+    with pytest.raises(ConnectionError, match='HTTP 404'):
+        lire(CacheCSV(str(tmp_path)), serveur_csv.url_csv('XX'), RecuperateurAsync(tentatives=3, delai=0.01))
+    assert len(serveur_csv.requetes) == 1
+
+def test_repli_sur_la_copie_en_cache(serveur_csv, tmp_path, contenu_csv):
+    cache = CacheCSV(str(tmp_path))
+    url = serveur_csv.url_csv('E0')
+    lire(cache, url, RecuperateurAsync(timeout=5))
+
+    # Source en panne à chaque tentative : la copie en cache est servie
+    serveur_csv.pannes = 10
+    assert lire(cache, url, RecuperateurAsync(timeout=5, tentatives=2, delai=0.01)) == contenu_csv
+    assert len(serveur_csv.requetes) == 3
+
+    serveur_csv.arreter()
+    assert lire(cache, url, RecuperateurAsync(timeout=5, tentatives=2, delai=0.01)) == contenu_csv
+
+def test_echec_sans_copie_en_cache(serveur_csv, tmp_path):
+    serveur_csv.pannes = 10
+    with pytest.raises(ConnectionError, match='2 tentatives'):
+        lire(CacheCSV(str(tmp_path)), serveur_csv.url_csv('E0'), RecuperateurAsync(tentatives=2, delai=0.01))
+
+def test_chargements_concurrents_single_flight(serveur_csv, tmp_path, monkeypatch):
+    monkeypatch.setattr(modele, 'URL_DONNEES', serveur_csv.url + '/mmz4281/{saison}/{championnat}.csv')
+    serveur_csv.latence = 0.2
+    registre = RegistreModeles()
+    chargeur = ChargeurAsync(registre, CacheCSV(str(tmp_path), RecuperateurHTTP()), RecuperateurAsync(timeout=5))
+
+    # Tous les threads démarrent avant la fin du premier téléchargement
+    depart = threading.Barrier(8)
+    bilans = []
+
+    def charger():
+        depart.wait()
+        bilans.append(chargeur.soumettre(['E0']).result())
+
+    threads = [threading.Thread(target=charger) for _ in range(8)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        chargeur.fermer()
+
+    assert len(serveur_csv.requetes) == 1
+    assert registre['E0']['version'] == 1
+    assert all('error' not in bilan.get('E0', {}) for bilan in bilans)
@@ -0,0 +1,56 @@
+"""Entraînement EWMA vectorisé : équivalence avec la boucle par équipe d'origine (Series.ewm(span).mean())"""
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+import modele
+
+def entrainer_boucle(df, span=10):
+    """Boucle d'origine : une EWMA pandas par équipe et par lieu, dernière valeur conservée"""
+    avg_h = df['home_goals_adj'].mean()
+    avg_a = df['away_goals_adj'].mean()
+
+    stats_globales = pd.DataFrame()
+
+    for team in df['home_team'].unique():
+        home_data = df[df['home_team'] == team].sort_values('match_order')
+        stats_globales.loc[team, 'attaque_domicile'] = home_data['home_goals_adj'].ewm(span=span).mean().iloc[-1]
+        stats_globales.loc[team, 'defense_domicile'] = home_data['away_goals_adj'].ewm(span=span).mean().iloc[-1]
+
+    for team in df['away_team'].unique():
+        away_data = df[df['away_team'] == team].sort_values('match_order')
+        stats_globales.loc[team, 'attaque_exterieur'] = away_data['away_goals_adj'].ewm(span=span).mean().iloc[-1]
+        stats_globales.loc[team, 'defense_exterieur'] = away_data['home_goals_adj'].ewm(span=span).mean().iloc[-1]
+
+    stats_globales = stats_globales.fillna(avg_h)
+
+    stats_globales['force_att_domicile'] = stats_globales['attaque_domicile'] / avg_h
+    stats_globales['force_att_exterieur'] = stats_globales['attaque_exterieur'] / avg_a
+    stats_globales['faibl_def_domicile'] = stats_globales['defense_domicile'] / avg_a
+    stats_globales['faibl_def_exterieur'] = stats_globales['defense_exterieur'] / avg_h
+
+    return stats_globales, avg_h, avg_a
+
+def verifier_equivalence(df, span):
+    stats, avg_h, avg_a = modele.entrainer_modele(df, span)
+    attendu, avg_h_attendu, avg_a_attendu = entrainer_boucle(df, span)
+
+    assert avg_h == pytest.approx(avg_h_attendu, rel=1e-12)
+    assert avg_a == pytest.approx(avg_a_attendu, rel=1e-12)
+    assert_frame_equal(stats, attendu, rtol=1e-12)
+
+@pytest.mark.parametrize('span', [3, 10, 25])
+def test_saison_complete(contenu_csv, span):
+    verifier_equivalence(modele.preparer_donnees(contenu_csv), span)
+
+@pytest.mark.parametrize('n_matchs', [1, 7, 15])
+def test_debut_de_saison(contenu_csv, n_matchs):
+    # Préfixe tronqué : certaines équipes n'ont encore joué qu'à domicile ou qu'à l'extérieur
+    df = modele.preparer_donnees(contenu_csv).iloc[:n_matchs]
+    assert set(df['home_team']) != set(df['away_team'])
+    verifier_equivalence(df, span=10)
+
+def test_plafond(contenu_csv):
+    df = modele.preparer_donnees(contenu_csv, plafond=2.5)
+    assert df['home_goals_adj'].max() == 2.5
+    verifier_equivalence(df, span=10)
@@ -0,0 +1,127 @@
+"""Historique multi-saisons : lecture compacte des CSV et magasin Parquet partitionné par championnat et saison"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import historique
+from cache_donnees import CacheCSV, RecuperateurDossier
+from conftest import prefixe
+
+pytest.importorskip('pyarrow')
+
+def format_ancien(contenu):
+    """Même saison au format des années 2000 : en-têtes HT/AT, dates jj/mm/aa, encodage latin-1"""
+    lignes = contenu.decode('utf-8').splitlines(keepends=True)
+    entete = lignes[0].replace('HomeTeam', 'HT').replace('AwayTeam', 'AT')
+    corps = [ligne.replace('/2025,', '/25,').replace('/2026,', '/26,') for ligne in lignes[1:]]
+    return (entete + ''.join(corps)).replace('Wolves', 'Wolves Wanderers é').encode('latin-1')
+
+@pytest.fixture
+def source(tmp_path, contenu_csv):
+    """Trois saisons d'E0 : 0506 au format ancien, 2324 réduite à 150 matchs, 2425 complète"""
+    dossier = tmp_path / 'source'
+    for saison, contenu in (('0506', format_ancien(contenu_csv)), ('2324', prefixe(contenu_csv, 150)),
+                            ('2425', contenu_csv)):
+        (dossier / saison).mkdir(parents=True)
+        (dossier / saison / 'E0.csv').write_bytes(contenu)
+    return dossier
+
+@pytest.fixture
+def cache(source, tmp_path):
+    return CacheCSV(str(tmp_path / 'cache'), RecuperateurDossier(str(source)))
+
+def test_saison_compacte(contenu_csv):
+    df = historique.lire_saison(contenu_csv)
+    assert list(df.columns) == list(historique.COLONNES_HISTORIQUE)
+    assert len(df) == 380
+    assert isinstance(df['home_team'].dtype, pd.CategoricalDtype)
+    assert df['home_team'].dtype == df['away_team'].dtype
+    assert df['home_goals'].dtype == np.int8 and df['date'].dtype == 'datetime64[s]'
+
+    # Lecture par morceaux : même résultat qu'en un seul bloc
+    pd.testing.assert_frame_equal(historique.lire_saison(contenu_csv, taille_morceau=37), df)
+
+def test_format_ancien(contenu_csv):
+    ancien = historique.lire_saison(format_ancien(contenu_csv))
+    moderne = historique.lire_saison(contenu_csv)
+    np.testing.assert_array_equal(ancien['date'], moderne['date'])
+    np.testing.assert_array_equal(ancien['home_goals'], moderne['home_goals'])
+    assert 'Wolves Wanderers é' in ancien['home_team'].cat.categories
+
+def test_matchs_non_joues_ignores(contenu_csv):
+    lignes = contenu_csv.splitlines(keepends=True)
+    a_jouer = lignes[1].replace(b',2,1,H', b',,,')
+    df = historique.lire_saison(lignes[0] + a_jouer + b''.join(lignes[2:]))
+    assert len(df) == 379
+
+def test_ordre_chronologique_entre_saisons(cache):
+    df = historique.charger_saisons('E0', ['2425', '0506', '2324'], cache)
+    assert df['season'].cat.categories.tolist() == ['0506', '2324', '2425']
+    assert (df['match_order'].to_numpy() == np.arange(len(df))).all()
+    # Saison par saison, puis par date
+    assert df['season'].is_monotonic_increasing
+    for _, saison in df.groupby('season', observed=True):
+        assert saison['date'].is_monotonic_increasing
+    assert len(df) == 380 + 150 + 380
+
+def test_magasin_aller_retour(cache, tmp_path):
+    magasin = str(tmp_path / 'magasin')
+    saisons = ['0506', '2324', '2425']
+    manifeste = historique.construire_magasin(magasin, ['E0'], saisons, cache, workers=2)
+
+    assert sorted(manifeste['E0']) == saisons
+    assert manifeste['E0']['2324']['matchs'] == 150
+    assert os.path.exists(os.path.join(magasin, 'league=E0', 'season=2425.parquet'))
+    assert not [nom for _, _, noms in os.walk(magasin) for nom in noms if nom.endswith('.tmp')]
+
+    lu = historique.lire_magasin(magasin, ['E0'])
+    attendu = historique.charger_saisons('E0', saisons, cache)
+    pd.testing.assert_frame_equal(
+        lu.drop(columns='league'), attendu, check_categorical=False, check_dtype=False
+    )
+    assert lu['home_goals'].dtype == np.int8
+    assert isinstance(lu['home_team'].dtype, pd.CategoricalDtype)
+
+def test_reconstruction_incrementale(cache, source, tmp_path, capsys, contenu_csv):
+    magasin = str(tmp_path / 'magasin')
+    historique.construire_magasin(magasin, ['E0'], ['2324', '2425'], cache)
+    capsys.readouterr()
+
+    historique.construire_magasin(magasin, ['E0'], ['2324', '2425'], cache)
+    assert '0 partition(s) écrite(s)' in capsys.readouterr().out
+
+    (source / '2324' / 'E0.csv').write_bytes(prefixe(contenu_csv, 200))
+    manifeste = historique.construire_magasin(magasin, ['E0'], ['2324', '2425', '1920'], cache)
+    sortie = capsys.readouterr().out
+    assert '1 partition(s) écrite(s)' in sortie
+    # Saison absente de la source : signalée et ignorée
+    assert 'E0 1920 ignorée' in sortie and '1920' not in manifeste['E0']
+    assert manifeste['E0']['2324']['matchs'] == 200
+
+def test_lecture_des_seules_partitions_demandees(cache, tmp_path):
+    magasin = str(tmp_path / 'magasin')
+    historique.construire_magasin(magasin, ['E0'], ['2324', '2425'], cache)
+    os.remove(os.path.join(magasin, 'league=E0', 'season=2324.parquet'))
+
+    df = historique.lire_magasin(magasin, ['E0'], ['2425'])
+    assert df['season'].unique().tolist() == ['2425'] and len(df) == 380
+    with pytest.raises(FileNotFoundError):
+        historique.lire_magasin(magasin, ['F1'])
+
+def test_charger_historique(cache, tmp_path):
+    magasin = str(tmp_path / 'magasin')
+    historique.construire_magasin(magasin, ['E0'], ['2425'], cache)
+
+    depuis_magasin = historique.charger_historique('E0', ['2425'], magasin, cache)
+    assert 'league' not in depuis_magasin
+    # Saison absente du magasin : tout est relu depuis la source
+    depuis_source = historique.charger_historique('E0', ['2324', '2425'], magasin, cache)
+    assert len(depuis_source) == 150 + 380
+
+def test_plage_saisons():
+    assert historique.plage_saisons('1998-2001') == ['9899', '9900', '0001', '0102']
+    assert historique.annee_saison('9900') == 1999
+    with pytest.raises(ValueError):
+        historique.plage_saisons('2025-2020')
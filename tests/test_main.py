@@ -0,0 +1,49 @@
+"""Ligne de commande : mode batch (affiches invalides, --csv limité au championnat --league)"""
+import json
+
+import pytest
+
+import main
+from conftest import DOSSIER_DONNEES
+
+@pytest.fixture(autouse=True)
+def sans_snapshot(tmp_path, monkeypatch):
+    # Aucun modeles.npy du dossier courant ne doit servir les modèles
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('FOOT_SNAPSHOT', str(tmp_path / 'absent.npy'))
+
+def executer_batch(tmp_path, capsys, lignes, *options):
+    affiches = tmp_path / 'affiches.jsonl'
+    affiches.write_text('\n'.join(lignes) + '\n', encoding='utf-8')
+    assert main.main(['batch', str(affiches), '--engine', 'exact', *options]) == 0
+    return [json.loads(ligne) for ligne in capsys.readouterr().out.splitlines()]
+
+def test_champ_non_textuel(tmp_path, capsys):
+    resultats = executer_batch(tmp_path, capsys, [
+        '{"league": "E0", "home_team": "Arsenal", "away_team": "Chelsea"}',
+        '{"league": 5, "home_team": "Arsenal", "away_team": "Chelsea"}',
+        '{"league": "E0", "home_team": ["Arsenal"], "away_team": "Chelsea"}',
+        '{"league": "E0", "home_team": "Liverpool", "away_team": "Everton"}'
+    ])
+
+    assert len(resultats) == 4
+    assert 'prob_1' in resultats[0] and 'prob_1' in resultats[3]
+    assert resultats[1] == {'error': 'Affiche invalide'}
+    assert resultats[2] == {'error': 'Affiche invalide'}
+
+def test_csv_limite_au_championnat(tmp_path, capsys):
+    resultats = executer_batch(tmp_path, capsys, [
+        '{"league": "E0", "home_team": "Arsenal", "away_team": "Chelsea"}',
+        '{"league": "F1", "home_team": "Paris SG", "away_team": "Lyon"}'
+    ], '--league', 'E0', '--csv', str(DOSSIER_DONNEES / 'E0.csv'))
+
+    # F1 n'est pas entraîné sur le CSV de Premier League passé pour --league E0
+    assert all('error' not in resultat for resultat in resultats)
+    assert [resultat['league'] for resultat in resultats] == ['E0', 'F1']
+
+@pytest.mark.parametrize('n', ['0', '-5', 'beaucoup'])
+def test_simulations_invalides(tmp_path, capsys, n):
+    with pytest.raises(SystemExit) as erreur:
+        main.main(['predict', 'Paris SG', 'Lyon', '-n', n])
+    assert erreur.value.code == 2
+    assert '--simulations' in capsys.readouterr().err
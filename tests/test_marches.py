@@ -0,0 +1,57 @@
+"""Marchés dérivés de la distribution des scores : même schéma quel que soit le moteur"""
+import numpy as np
+import pytest
+
+import modele
+
+# Deux équipes aux forces neutres : les buts attendus valent avg_h et avg_a
+FORCES = modele.ForcesEquipes(['A', 'B'], np.ones((2, 4)))
+
+@pytest.mark.parametrize('buts', [0.3, 1.4, 3.0])
+def test_correct_score_meme_grille(buts):
+    exact = modele.predire_et_simuler('A', 'B', FORCES, buts, buts, engine='exact', marches=('correct_score',))
+    simule = modele.predire_et_simuler(
+        'A', 'B', FORCES, buts, buts, n_simulations=10000, marches=('correct_score',),
+        generateur=modele.generateur_aleatoire(1)
+    )
+
+    cles = list(exact['marches']['correct_score'])
+    assert len(cles) == (modele.MAX_BUTS_SCORE_EXACT + 1) ** 2 + 1
+    assert list(simule['marches']['correct_score']) == cles
+
+def test_faibles_buts_attendus_monte_carlo():
+    # λ = 0,3 : 10 000 tirages ne dépassent presque jamais 4 buts, la grille reste 6 x 6
+    matrice = modele.distribution_scores([0.3], [0.3], 10000, generateur=modele.generateur_aleatoire(0))
+    assert matrice.shape == (1, modele.MAX_BUTS_SCORE_EXACT + 1, modele.MAX_BUTS_SCORE_EXACT + 1)
+    assert matrice.sum() == pytest.approx(1.0)
+
+    scores, autre = modele.calculer_marches(matrice, ('correct_score',))['correct_score']
+    assert scores.shape == (1, 6, 6)
+    assert autre[0] == 0.0
+
+def test_lot_meme_grille():
+    resultats = modele.predire_affiches(
+        [0.3, 2.5], [0.3, 1.0], n_simulations=5000, marches=('correct_score',), generateur=modele.generateur_aleatoire(2)
+    )
+    assert all(len(r['marches']['correct_score']) == 37 for r in resultats)
+
+def test_lignes_handicap_en_quart():
+    resultat = modele.predire_et_simuler('A', 'B', FORCES, 1.6, 1.1, engine='exact', marches=('asian_handicap',))
+    handicap = resultat['marches']['asian_handicap']
+    assert len(handicap) == 21
+    assert {'-0.25', '+0.25', '-0.75', '+0.75', '-2.25', '+2.25'} <= set(handicap)
+
+    matrice = modele.distribution_scores([1.6], [1.1], engine='exact')
+    lignes = modele.calculer_marches(matrice, ('asian_handicap',))['asian_handicap']
+    # Ligne en quart : demi-mise sur chacune des lignes voisines
+    for quart, (bas, haut) in {-0.75: (-1.0, -0.5), -0.25: (-0.5, 0.0), 0.25: (0.0, 0.5), 1.75: (1.5, 2.0)}.items():
+        for issue in range(2):
+            assert lignes[quart][issue] == pytest.approx((lignes[bas][issue] + lignes[haut][issue]) / 2)
+
+    # -0.25 : le nul rend la moitié de la mise et perd l'autre moitié
+    buts_dom, buts_ext = np.indices(matrice.shape[-2:])
+    victoire = matrice[0][buts_dom > buts_ext].sum() * 100
+    nul = matrice[0][buts_dom == buts_ext].sum() * 100
+    assert handicap['-0.25']['dom'] == round(victoire, 1)
+    assert handicap['-0.25']['rembourse'] == pytest.approx(nul / 2, abs=0.15)
+    assert handicap['-0.25']['cote_dom'] > handicap['+0']['cote_dom']
@@ -0,0 +1,55 @@
+"""Matrice des affiches précalculée : mêmes prédictions exactes que le calcul à la demande"""
+import numpy as np
+import pytest
+
+import app
+import modele
+from conftest import DOSSIER_DONNEES
+
+@pytest.fixture(scope='module', params=['ewma', 'dixon_coles'])
+def modele_e0(request):
+    return modele.entrainer_depuis_csv((DOSSIER_DONNEES / 'E0.csv').read_bytes(), type_modele=request.param)
+
+def test_toutes_les_affiches(modele_e0):
+    matrice = modele_e0['matrice']
+    equipes = modele_e0['equipes']
+    assert matrice['prob_1'].shape == (len(equipes), len(equipes))
+    assert np.isnan(np.diagonal(matrice['prob_1'])).all()
+
+    hors_diagonale = ~np.eye(len(equipes), dtype=bool)
+    # Scores au-delà de MAX_BUTS : masse tronquée, reportée à part
+    total = matrice['prob_1'] + matrice['prob_N'] + matrice['prob_2'] + matrice['masse_tronquee']
+    assert np.allclose(total[hors_diagonale], 100)
+
+    for dom, ext in [(equipes[0], equipes[1]), (equipes[1], equipes[0]), (equipes[5], equipes[-1])]:
+        attendu = modele.predire_et_simuler(
+            dom, ext, modele_e0['forces'], modele_e0['avg_home'], modele_e0['avg_away'], engine='exact',
+            avantage_domicile=modele_e0['parametres']['avantage_domicile'], rho=modele_e0['rho']
+        )
+        assert modele.lire_affiche(matrice, dom, ext) == attendu
+
+def test_marches_a_la_demande(modele_e0):
+    dom, ext = modele_e0['equipes'][2], modele_e0['equipes'][7]
+    marches = ('over_under', 'btts', 'correct_score', 'asian_handicap')
+    attendu = modele.predire_et_simuler(
+        dom, ext, modele_e0['forces'], modele_e0['avg_home'], modele_e0['avg_away'], engine='exact',
+        avantage_domicile=modele_e0['parametres']['avantage_domicile'], marches=marches, rho=modele_e0['rho']
+    )
+    assert modele.lire_affiche(modele_e0['matrice'], dom, ext, marches) == attendu
+
+def test_route_matrix():
+    reponse = app.app.test_client().get('/matrix?league=F1')
+    assert reponse.status_code == 200
+    donnees = reponse.get_json()
+
+    equipes = donnees['equipes']
+    i, j = equipes.index('Paris SG'), equipes.index('Lyon')
+    assert donnees['prob_1'][i][i] is None
+    unitaire = app.app.test_client().post('/predict', json={
+        'league': 'F1', 'home_team': 'Paris SG', 'away_team': 'Lyon', 'engine': 'exact'
+    }).get_json()
+    assert donnees['prob_1'][i][j] == unitaire['prob_1']
+    assert donnees['buts_dom'][i][j] == round(unitaire['buts_dom'], 2)
+
+def test_route_matrix_championnat_invalide():
+    assert app.app.test_client().get('/matrix?league=XX').status_code == 400
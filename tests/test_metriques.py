@@ -0,0 +1,82 @@
+"""Métriques : compteurs, histogrammes cumulés, export Prometheus et instrumentation des routes"""
+import app
+from metriques import Metriques, TYPE_CONTENU
+
+def series(texte):
+    """{ligne sans valeur: valeur} des échantillons d'un export Prometheus"""
+    valeurs = {}
+    for ligne in texte.splitlines():
+        if ligne and not ligne.startswith('#'):
+            serie, valeur = ligne.rsplit(' ', 1)
+            valeurs[serie] = float(valeur)
+    return valeurs
+
+def test_compteurs_et_etiquettes():
+    metriques = Metriques()
+    metriques.incrementer('foot_csv_total', resultat='telecharge')
+    metriques.incrementer('foot_csv_total', resultat='telecharge')
+    metriques.incrementer('foot_csv_total', 3, resultat='inchange')
+    metriques.incrementer('foot_chargements_total', mode='erreur', league='F1')
+
+    texte = metriques.exporter()
+    assert '# TYPE foot_csv_total counter' in texte
+    assert series(texte) == {
+        'foot_csv_total{resultat="telecharge"}': 2,
+        'foot_csv_total{resultat="inchange"}': 3,
+        # Étiquettes triées : une même série quel que soit l'ordre des arguments
+        'foot_chargements_total{league="F1",mode="erreur"}': 1
+    }
+
+def test_histogramme_cumule():
+    metriques = Metriques(seuils=(0.01, 0.1, 1.0))
+    for duree in (0.005, 0.01, 0.05, 0.5, 3.0):
+        metriques.observer('foot_etape_duree_secondes', duree, etape='train')
+
+    valeurs = series(metriques.exporter())
+    prefixe = 'foot_etape_duree_secondes'
+    # Bornes inclusives (le="0.01" compte 0,01) et comptes cumulés jusqu'à +Inf
+    assert [valeurs[f'{prefixe}_bucket{{etape="train",le="{seuil}"}}'] for seuil in ('0.01', '0.1', '1.0', '+Inf')] \
+        == [2, 3, 4, 5]
+    assert valeurs[f'{prefixe}_count{{etape="train"}}'] == 5
+    assert valeurs[f'{prefixe}_sum{{etape="train"}}'] == sum((0.005, 0.01, 0.05, 0.5, 3.0))
+
+def test_chrono_et_collecteurs():
+    metriques = Metriques()
+    with metriques.chrono('foot_etape_duree_secondes', etape='lookup'):
+        pass
+    metriques.collecter(lambda: [('foot_modele_version', 'gauge', "Version", [({'league': 'F1'}, 4)])])
+
+    texte = metriques.exporter()
+    assert series(texte)['foot_etape_duree_secondes_count{etape="lookup"}'] == 1
+    assert '# TYPE foot_modele_version gauge' in texte
+    assert series(texte)['foot_modele_version{league="F1"}'] == 4
+
+def test_echappement_des_etiquettes():
+    metriques = Metriques()
+    metriques.incrementer('foot_requetes_total', route='/a"b\\c\n')
+    assert 'foot_requetes_total{route="/a\\"b\\\\c\\n"} 1' in metriques.exporter()
+
+def test_desactivees():
+    metriques = Metriques(actif=False)
+    metriques.incrementer('foot_csv_total', resultat='telecharge')
+    with metriques.chrono('foot_etape_duree_secondes', etape='train'):
+        pass
+    assert metriques.exporter() == '\n'
+
+def test_route_metrics():
+    client = app.app.test_client()
+    client.post('/predict', json={'league': 'F1', 'home_team': 'Paris SG', 'away_team': 'Lyon', 'engine': 'exact'})
+    client.get('/teams?league=XX')
+
+    reponse = client.get('/metrics')
+    assert reponse.status_code == 200
+    assert reponse.content_type == TYPE_CONTENU
+    valeurs = series(reponse.get_data(as_text=True))
+
+    assert valeurs['foot_requetes_total{code="200",route="/predict"}'] >= 1
+    assert valeurs['foot_requete_duree_secondes_count{league="F1",route="/predict"}'] >= 1
+    assert valeurs['foot_etape_duree_secondes_count{etape="lookup"}'] >= 1
+    assert valeurs['foot_modele_version{league="F1"}'] == app.MODELES_CHAMPIONNAT['F1']['version']
+    # Championnat inconnu : étiquette vide plutôt qu'une nouvelle série par valeur envoyée
+    assert not any('league="XX"' in serie for serie in valeurs)
+    assert valeurs['foot_requete_duree_secondes_count{league="",route="/teams"}'] >= 1
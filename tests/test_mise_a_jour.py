@@ -0,0 +1,67 @@
+"""Mise à jour incrémentale de l'état EWMA : mêmes forces qu'un réentraînement complet"""
+import numpy as np
+import pytest
+
+import modele
+from conftest import prefixe
+
+def verifier_identiques(obtenu, attendu):
+    assert obtenu['forces'].equipes == attendu['forces'].equipes
+    np.testing.assert_allclose(obtenu['forces'].forces, attendu['forces'].forces, rtol=1e-12)
+    assert obtenu['avg_home'] == pytest.approx(attendu['avg_home'], rel=1e-12)
+    assert obtenu['avg_away'] == pytest.approx(attendu['avg_away'], rel=1e-12)
+
+def test_mettre_a_jour_egale_reentrainement(contenu_csv):
+    complet = modele.entrainer_depuis_csv(contenu_csv)
+    partiel = modele.entrainer_depuis_csv(prefixe(contenu_csv, 300))
+    df = modele.preparer_donnees(contenu_csv)
+
+    mis_a_jour = modele.mettre_a_jour(partiel, df.iloc[300:], modele.empreinte_donnees(contenu_csv))
+
+    verifier_identiques(mis_a_jour, complet)
+    assert mis_a_jour['etat_ewma']['n_matchs'] == len(df)
+    np.testing.assert_array_equal(mis_a_jour['etat_ewma']['hachages_lignes'], complet['etat_ewma']['hachages_lignes'])
+
+def test_actualiser_reprend_apres_mettre_a_jour(contenu_csv, monkeypatch):
+    partiel = modele.entrainer_depuis_csv(prefixe(contenu_csv, 300))
+    df = modele.preparer_donnees(contenu_csv)
+    intermediaire = modele.mettre_a_jour(partiel, df.iloc[300:340])
+
+    def reentrainement(*args, **kwargs):
+        raise AssertionError("réentraînement complet inattendu")
+
+    attendu = modele.entrainer_depuis_csv(contenu_csv)
+    monkeypatch.setattr(modele, 'entrainer_depuis_csv', reentrainement)
+    actualise = modele.actualiser_depuis_csv(intermediaire, contenu_csv)
+
+    verifier_identiques(actualise, attendu)
+    assert actualise['empreinte'] == modele.empreinte_donnees(contenu_csv)
+
+def test_actualiser_reentraine_si_lignes_modifiees(contenu_csv):
+    partiel = modele.entrainer_depuis_csv(prefixe(contenu_csv, 300))
+    # Score corrigé dans une ligne déjà intégrée : l'état ne peut pas être réutilisé
+    lignes = contenu_csv.splitlines(keepends=True)
+    champs = lignes[1].split(b',')
+    champs[5] = str(int(champs[5]) + 1).encode()
+    modifie = b''.join([lignes[0], b','.join(champs), *lignes[2:]])
+
+    actualise = modele.actualiser_depuis_csv(partiel, modifie)
+
+    verifier_identiques(actualise, modele.entrainer_depuis_csv(modifie))
+
+def test_actualiser_reentraine_si_match_ajoute_anterieur(contenu_csv):
+    partiel = modele.entrainer_depuis_csv(prefixe(contenu_csv, 300))
+    # Match reporté ajouté en fin de fichier, daté avant les derniers matchs déjà intégrés
+    lignes = contenu_csv.splitlines(keepends=True)
+    champs = lignes[301].split(b',')
+    champs[1] = b'01/01/2026'
+    modifie = b''.join([*lignes[:301], b','.join(champs), *lignes[302:]])
+    df = modele.preparer_donnees(modifie)
+    assert df['match_order'].iloc[300] < df['match_order'].iloc[:300].max()
+
+    actualise = modele.actualiser_depuis_csv(partiel, modifie)
+
+    verifier_identiques(actualise, modele.entrainer_depuis_csv(modifie))
+    # Repli naïf (ligne intégrée en dernier) : forces différentes du réentraînement
+    naif = modele.mettre_a_jour(partiel, df.iloc[300:])
+    assert not np.allclose(naif['forces'].forces, actualise['forces'].forces)
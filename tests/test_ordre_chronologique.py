@@ -0,0 +1,55 @@
+"""Ordre chronologique des matchs : par date plutôt que par ligne du fichier (matchs reportés)"""
+import random
+
+import numpy as np
+import pandas as pd
+
+import modele
+
+def test_ordre_stable_et_dates_manquantes():
+    dates = pd.to_datetime(['2025-08-17', '2025-08-16', None, '2025-08-16', '2025-08-10', None])
+    # Même jour : ordre du fichier ; sans date : après les autres, dans l'ordre du fichier
+    assert modele.ordre_chronologique(dates).tolist() == [3, 1, 4, 2, 0, 5]
+
+def test_lire_dates_formats():
+    dates = modele.lire_dates(['16/08/2025', '17/08/25', '31/02/2025', '', None])
+    assert dates[:2].tolist() == [pd.Timestamp('2025-08-16'), pd.Timestamp('2025-08-17')]
+    assert dates[2:].isna().all()
+
+def melanger_journees(contenu, graine=0):
+    """Mêmes matchs, blocs de dates permutés dans le fichier ; l'ordre des matchs d'un même jour est gardé"""
+    entete, *lignes = contenu.splitlines(keepends=True)
+    blocs = {}
+    for ligne in lignes:
+        blocs.setdefault(ligne.split(b',')[1], []).append(ligne)
+    ordre = list(blocs)
+    random.Random(graine).shuffle(ordre)
+    return entete + b''.join(ligne for date in ordre for ligne in blocs[date])
+
+def test_preparer_donnees_ordre_par_date(contenu_csv):
+    df = modele.preparer_donnees(melanger_journees(contenu_csv))
+    dates = df.sort_values('match_order')['date']
+    assert dates.is_monotonic_increasing
+    assert sorted(df['match_order']) == list(range(len(df)))
+
+def test_entrainement_independant_de_l_ordre_du_fichier(contenu_csv):
+    attendu = modele.entrainer_depuis_csv(contenu_csv)
+    melange = modele.entrainer_depuis_csv(melanger_journees(contenu_csv))
+    assert melange['equipes'] == attendu['equipes']
+    # Les lignes de ForcesEquipes suivent l'ordre d'apparition des équipes dans le fichier
+    forces = melange['forces'].forces[melange['forces'].indices(attendu['forces'].equipes)]
+    np.testing.assert_allclose(forces, attendu['forces'].forces, rtol=1e-12)
+
+def test_report_pris_en_compte(contenu_csv):
+    # Un match reporté figure en fin de fichier mais se joue en décembre : l'EWMA le place à sa date
+    entete, *lignes = contenu_csv.splitlines(keepends=True)
+    reporte = lignes[300].replace(lignes[300].split(b',')[1], b'06/12/2025')
+    fichier = entete + b''.join(lignes[:300] + lignes[301:]) + reporte
+    df = modele.preparer_donnees(fichier)
+    assert df['match_order'].iloc[-1] < len(df) - 1
+    assert df.sort_values('match_order')['date'].is_monotonic_increasing
+
+def test_sans_colonne_date(contenu_csv):
+    lignes = [ligne.split(b',') for ligne in contenu_csv.splitlines(keepends=True)]
+    df = modele.preparer_donnees(b''.join(b','.join(ligne[:1] + ligne[2:]) for ligne in lignes))
+    assert df['match_order'].tolist() == list(range(len(df)))
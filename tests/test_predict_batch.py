@@ -0,0 +1,61 @@
+"""/predict_batch : validation par affiche, une affiche invalide n'empêche pas de prédire les autres"""
+import pytest
+
+import app
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+def predire(client, matchs, **options):
+    reponse = client.post('/predict_batch', json={'matches': matchs, 'engine': 'exact', **options})
+    assert reponse.status_code == 200
+    return reponse.get_json()
+
+def test_ordre_et_versions(client):
+    resultats = predire(client, [
+        {'league': 'F1', 'home_team': 'Paris SG', 'away_team': 'Lyon'},
+        {'home_team': 'Lyon', 'away_team': 'Paris SG'}
+    ])
+
+    assert [(r['home_team'], r['away_team'], r['league']) for r in resultats] == [
+        ('Paris SG', 'Lyon', 'F1'), ('Lyon', 'Paris SG', 'F1')
+    ]
+    for resultat in resultats:
+        assert resultat['prob_1'] + resultat['prob_N'] + resultat['prob_2'] == pytest.approx(100, abs=0.5)
+        assert resultat['version_modele'] >= 1
+
+def test_lot_egal_aux_predictions_unitaires(client):
+    attendu = client.post('/predict', json={
+        'league': 'F1', 'home_team': 'Paris SG', 'away_team': 'Lyon', 'engine': 'exact'
+    }).get_json()
+    resultat, = predire(client, [{'league': 'F1', 'home_team': 'Paris SG', 'away_team': 'Lyon'}])
+
+    for cle in ('prob_1', 'prob_N', 'prob_2', 'buts_dom', 'buts_ext'):
+        assert resultat[cle] == attendu[cle]
+
+@pytest.mark.parametrize('affiche, erreur', [
+    ({'league': 'F1', 'home_team': ['Paris SG'], 'away_team': 'Lyon'}, 'Affiche invalide'),
+    ({'league': ['F1'], 'home_team': 'Paris SG', 'away_team': 'Lyon'}, 'Affiche invalide'),
+    ({'league': 'F1', 'home_team': 'Paris SG', 'away_team': {'nom': 'Lyon'}}, 'Affiche invalide'),
+    ('Paris SG - Lyon', 'Affiche invalide'),
+    ({'league': 'XX', 'home_team': 'Paris SG', 'away_team': 'Lyon'}, 'Championnat invalide'),
+    ({'league': 'F1', 'home_team': 'Paris SG'}, 'Équipes manquantes'),
+    ({'league': 'F1', 'home_team': 'Lyon', 'away_team': 'Lyon'}, 'Les deux équipes doivent être différentes'),
+    ({'league': 'F1', 'home_team': 'Paris SG', 'away_team': 'Atlantis'}, "L'équipe 'Atlantis' n'existe pas")
+])
+def test_affiche_invalide(client, affiche, erreur):
+    resultats = predire(client, [
+        {'league': 'F1', 'home_team': 'Paris SG', 'away_team': 'Lyon'},
+        affiche,
+        {'league': 'F1', 'home_team': 'Lyon', 'away_team': 'Paris SG'}
+    ])
+
+    assert len(resultats) == 3
+    assert resultats[1]['error'] == erreur
+    assert 'prob_1' not in resultats[1]
+    assert 'prob_1' in resultats[0] and 'prob_1' in resultats[2]
+
+@pytest.mark.parametrize('corps', [{'matches': 'F1'}, {'engine': 'exact'}, 'matches', 42])
+def test_corps_invalide(client, corps):
+    assert client.post('/predict_batch', json=corps).status_code == 400
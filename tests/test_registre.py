@@ -0,0 +1,106 @@
+"""Registre des modèles : versions figées, publication atomique et chargement single-flight"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from registre import RegistreModeles
+
+def modele_jouet(valeur=1.0):
+    return {'forces': np.full((2, 4), valeur), 'equipes': ['A', 'B'], 'parametres': {'span': 10}}
+
+def test_version_figee():
+    registre = RegistreModeles()
+    source = modele_jouet()
+    version = registre.publier('F1', source)
+
+    assert version['version'] == 1 and version['publie_le']
+    assert version['equipes'] == ('A', 'B')
+    with pytest.raises(TypeError):
+        version['forces'] = None
+    with pytest.raises(TypeError):
+        version['parametres']['span'] = 20
+    with pytest.raises(ValueError):
+        version['forces'][0, 0] = 5.0
+
+    # Le dictionnaire source reste modifiable et n'altère pas la version publiée
+    source['forces'][0, 0] = 5.0
+    source['equipes'].append('C')
+    assert version['equipes'] == ('A', 'B')
+
+def test_numeros_et_abonnes():
+    registre = RegistreModeles()
+    publications = []
+    registre.abonner(lambda championnat, version: publications.append((championnat, version['version'])))
+
+    registre.publier('F1', modele_jouet())
+    registre.publier('E0', modele_jouet())
+    registre.publier('F1', modele_jouet(2.0))
+
+    assert publications == [('F1', 1), ('E0', 1), ('F1', 2)]
+    assert registre['F1']['forces'][0, 0] == 2.0
+    assert sorted(registre) == ['E0', 'F1'] and len(registre) == 2 and 'SP1' not in registre
+
+def test_chargement_single_flight():
+    registre = RegistreModeles()
+    appels = []
+
+    def construire():
+        appels.append(threading.get_ident())
+        time.sleep(0.1)
+        return modele_jouet()
+
+    depart = threading.Barrier(8)
+    versions = []
+
+    def obtenir():
+        depart.wait()
+        versions.append(registre.obtenir('F1', construire))
+
+    threads = [threading.Thread(target=obtenir) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(appels) == 1
+    assert all(version is versions[0] for version in versions)
+    assert versions[0]['version'] == 1
+
+def test_rechargements_simultanes_partages():
+    registre = RegistreModeles()
+    initiale = registre.publier('F1', modele_jouet())
+    appels = []
+
+    def construire():
+        appels.append(1)
+        time.sleep(0.1)
+        return modele_jouet(2.0)
+
+    depart = threading.Barrier(4)
+    versions = []
+
+    def recharger():
+        depart.wait()
+        versions.append(registre.obtenir('F1', construire, force_reload=True))
+
+    threads = [threading.Thread(target=recharger) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Les rechargements arrivés pendant la reconstruction réutilisent la version qu'elle a publiée
+    assert len(appels) == 1
+    assert {version['version'] for version in versions} == {initiale['version'] + 1}
+
+def test_reconstruction_inchangee_sans_nouvelle_version():
+    registre = RegistreModeles()
+    publications = []
+    registre.abonner(lambda championnat, version: publications.append(version['version']))
+    initiale = registre.publier('F1', modele_jouet())
+
+    # construire() renvoie la version publiée telle quelle quand les données n'ont pas changé
+    assert registre.obtenir('F1', lambda: registre['F1'], force_reload=True) is initiale
+    assert publications == [1]
@@ -0,0 +1,69 @@
+"""Page d'accueil et /teams : rendus une fois par version, précompressés, revalidés par ETag (304)"""
+import gzip
+import json
+
+import pytest
+
+import app
+import ressources
+from ressources import Ressource
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+def test_variantes_et_etags():
+    ressource = Ressource('{"equipes": ["A", "B"]}' * 50, 'application/json')
+    contenu, etag = ressource.variantes[None]
+    assert gzip.decompress(ressource.variantes['gzip'][0]) == contenu
+    # Un ETag fort par variante : deux encodages ne partagent jamais le même
+    assert len(set(ressource.etags())) == len(ressource.variantes)
+    assert Ressource('{"equipes": ["A", "B"]}' * 50, 'application/json').etags() == ressource.etags()
+
+def test_teams_gzip_puis_304(client):
+    reponse = client.get('/teams?league=F1', headers={'Accept-Encoding': 'gzip'})
+    assert reponse.status_code == 200
+    assert reponse.headers['Content-Encoding'] == 'gzip'
+    assert reponse.headers['Vary'] == 'Accept-Encoding'
+    donnees = json.loads(gzip.decompress(reponse.data))
+    assert 'Paris SG' in donnees['equipes']
+
+    etag = reponse.headers['ETag']
+    revalidation = client.get('/teams?league=F1', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert revalidation.status_code == 304
+    assert revalidation.data == b''
+    assert revalidation.headers['ETag'] == etag
+
+def test_sans_compression(client):
+    reponse = client.get('/teams?league=F1', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in reponse.headers
+    assert 'Paris SG' in reponse.get_json()['equipes']
+
+    # L'ETag d'une autre variante du même contenu vaut aussi revalidation
+    compresse = client.get('/teams?league=F1', headers={'Accept-Encoding': 'gzip'})
+    revalidation = client.get('/teams?league=F1', headers={'If-None-Match': compresse.headers['ETag']})
+    assert revalidation.status_code == 304
+
+@pytest.mark.skipif(ressources.brotli is None, reason="paquet brotli absent")
+def test_brotli_prefere(client):
+    reponse = client.get('/', headers={'Accept-Encoding': 'gzip, br'})
+    assert reponse.headers['Content-Encoding'] == 'br'
+    assert b'<!DOCTYPE html>' in ressources.brotli.decompress(reponse.data)
+
+def test_rendu_une_fois_par_version(client, monkeypatch):
+    rendus = []
+    rendre = app.render_template_string
+    monkeypatch.setattr(
+        app, 'render_template_string', lambda *args, **kwargs: rendus.append(1) or rendre(*args, **kwargs)
+    )
+    app.RESSOURCES_PRECALCULEES.pop(('index', 'F1'), None)
+
+    premiere = client.get('/')
+    client.get('/')
+    assert len(rendus) == 1
+
+    # Nouvelle version publiée : la page est rendue à nouveau ; mêmes équipes, même ETag, le client garde sa copie
+    app.MODELES_CHAMPIONNAT.publier('F1', dict(app.MODELES_CHAMPIONNAT['F1']))
+    seconde = client.get('/', headers={'If-None-Match': premiere.headers['ETag']})
+    assert len(rendus) == 2
+    assert seconde.status_code == 304
@@ -0,0 +1,95 @@
+"""Projection de fin de saison : classement porté par le modèle, sans relecture du CSV"""
+import numpy as np
+import pytest
+
+import modele
+import snapshot
+from saison import projeter_saison
+from conftest import prefixe
+
+def verifier_classements_egaux(obtenu, attendu):
+    assert tuple(obtenu['equipes']) == tuple(attendu['equipes'])
+    for cle in ('points', 'diff_buts', 'buts_pour', 'joues', 'affiches_jouees'):
+        np.testing.assert_array_equal(obtenu[cle], attendu[cle])
+
+def test_classement_du_modele(contenu_csv):
+    contenu = prefixe(contenu_csv, 200)
+    df = modele.preparer_donnees(contenu)
+    mod = modele.entrainer_depuis_csv(contenu)
+    classement = mod['classement']
+
+    assert tuple(classement['equipes']) == tuple(mod['equipes'])
+    assert classement['joues'].sum() == 2 * len(df)
+    assert classement['affiches_jouees'].sum() == len(df)
+    i, j = mod['equipes'].index(df['home_team'].iloc[0]), mod['equipes'].index(df['away_team'].iloc[0])
+    assert classement['affiches_jouees'][i, j]
+
+def test_classement_incremental(contenu_csv):
+    df = modele.preparer_donnees(contenu_csv)
+    partiel = modele.entrainer_depuis_csv(prefixe(contenu_csv, 150))
+    mis_a_jour = modele.mettre_a_jour(partiel, df.iloc[150:])
+
+    verifier_classements_egaux(mis_a_jour['classement'], modele.entrainer_depuis_csv(contenu_csv)['classement'])
+
+def test_projection_depuis_le_modele(contenu_csv):
+    contenu = prefixe(contenu_csv, 300)
+    df = modele.preparer_donnees(contenu)
+    mod = modele.entrainer_depuis_csv(contenu)
+
+    def projeter(classement):
+        return projeter_saison(
+            classement, mod['forces'], mod['avg_home'], mod['avg_away'], 'E0', 2000,
+            generateur=modele.generateur_aleatoire(7)
+        )
+
+    projection = projeter(mod['classement'])
+    assert projection['matchs_restants'] == 380 - 300
+    assert projection == projeter(modele.classement_actuel(df, mod['equipes']))
+
+def test_snapshot_conserve_le_classement(contenu_csv, tmp_path):
+    class Cache:
+        def lire(self, url):
+            return contenu_csv
+
+    chemin = str(tmp_path / 'modeles.npy')
+    snapshot.construire_snapshot(chemin, ['E0'], Cache())
+    charge = snapshot.charger_snapshot(chemin)['E0']
+
+    verifier_classements_egaux(charge['classement'], modele.entrainer_depuis_csv(contenu_csv)['classement'])
+
+def test_season_ne_relit_pas_le_csv(monkeypatch):
+    import app
+
+    def lecture(*args, **kwargs):
+        raise AssertionError("CSV relu sur le thread de requête")
+
+    monkeypatch.setattr(modele.CACHE_DONNEES, 'lire', lecture)
+    reponse = app.app.test_client().get('/season?league=F1&n=500&seed=1')
+
+    assert reponse.status_code == 200
+    donnees = reponse.get_json()
+    assert donnees['matchs_restants'] == 0
+    assert sum(ligne['joues'] for ligne in donnees['classement']) == 2 * 306
+
+@pytest.mark.parametrize('affiche', [
+    {'home_team': ['Paris SG'], 'away_team': 'Lyon'},
+    {'home_team': 'Paris SG', 'away_team': 7},
+    {'home_team': 'Paris SG'},
+    {'home_team': 'Lyon', 'away_team': 'Lyon'},
+    {'home_team': 'Paris SG', 'away_team': 'Atlantis'}
+])
+def test_season_calendrier_invalide(affiche):
+    import app
+
+    reponse = app.app.test_client().post('/season', json={
+        'league': 'F1', 'n': 100, 'fixtures': [{'home_team': 'Paris SG', 'away_team': 'Lyon'}, affiche]
+    })
+
+    assert reponse.status_code == 400
+    assert 'error' in reponse.get_json()
+
+def test_projection_refuse_une_equipe_contre_elle_meme(contenu_csv):
+    mod = modele.entrainer_depuis_csv(prefixe(contenu_csv, 300))
+    with pytest.raises(ValueError):
+        projeter_saison(mod['classement'], mod['forces'], mod['avg_home'], mod['avg_away'], 'E0', 100,
+                        [('Arsenal', 'Arsenal')])
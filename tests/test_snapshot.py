@@ -0,0 +1,75 @@
+"""Snapshot des modèles : mêmes forces qu'un entraînement, lecture sans copie et détection d'un CSV modifié"""
+import shutil
+
+import numpy as np
+import pytest
+
+import modele
+import snapshot
+from cache_donnees import CacheCSV, RecuperateurDossier
+from conftest import DOSSIER_DONNEES, prefixe
+
+@pytest.fixture
+def source(tmp_path):
+    """Copie de tests/donnees, modifiable par un test"""
+    dossier = tmp_path / 'source'
+    shutil.copytree(DOSSIER_DONNEES, dossier)
+    return dossier
+
+@pytest.fixture
+def cache(source, tmp_path):
+    return CacheCSV(str(tmp_path / 'cache'), RecuperateurDossier(str(source)))
+
+@pytest.fixture
+def chemin(cache, tmp_path):
+    chemin = str(tmp_path / 'modeles.npy')
+    snapshot.construire_snapshot(chemin, ['F1', 'E0'], cache)
+    return chemin
+
+def test_modeles_identiques_a_l_entrainement(chemin, source):
+    charges = snapshot.charger_snapshot(chemin)
+    assert list(charges) == ['F1', 'E0']
+
+    for championnat, charge in charges.items():
+        contenu = (source / f'{championnat}.csv').read_bytes()
+        attendu = modele.entrainer_depuis_csv(contenu, **modele.parametres_championnat(championnat))
+        assert charge['equipes'] == attendu['equipes']
+        np.testing.assert_allclose(charge['forces'].forces, attendu['forces'].forces, rtol=1e-12)
+        assert charge['avg_home'] == pytest.approx(attendu['avg_home'], rel=1e-12)
+        assert charge['empreinte'] == modele.empreinte_donnees(contenu)
+        assert charge['parametres'] == attendu['parametres']
+        np.testing.assert_allclose(charge['matrice']['prob_1'], attendu['matrice']['prob_1'], rtol=1e-9)
+
+def test_lecture_d_un_championnat(chemin, tmp_path):
+    lu = snapshot.lire_modele_snapshot(chemin, 'E0')
+    assert 'Arsenal' in lu['forces'] and 'Paris SG' not in lu['forces']
+    assert snapshot.lire_modele_snapshot(chemin, 'SP1') is None
+
+    # Projection mémoire : le fichier n'est pas recopié au chargement
+    assert isinstance(np.load(chemin, mmap_mode='r'), np.memmap)
+    # Écriture atomique : aucun fichier temporaire ne reste à côté du snapshot
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['cache', 'modeles.npy', 'source']
+
+def test_check_detecte_un_csv_modifie(chemin, cache, source):
+    assert snapshot.championnats_perimes(chemin, cache=cache) == []
+
+    (source / 'E0.csv').write_bytes(prefixe((source / 'E0.csv').read_bytes(), 300))
+    assert snapshot.championnats_perimes(chemin, cache=cache) == ['E0']
+    # Championnat absent du snapshot : périmé lui aussi
+    shutil.copy(source / 'E0.csv', source / 'SP1.csv')
+    assert snapshot.championnats_perimes(chemin, ['F1', 'SP1'], cache=cache) == ['SP1']
+
+def test_commande_check(chemin, cache, source, monkeypatch, capsys):
+    monkeypatch.setattr(modele, 'CACHE_DONNEES', cache)
+    assert snapshot.main(['check', '--output', chemin]) == 0
+    assert 'à jour' in capsys.readouterr().out
+
+    (source / 'F1.csv').write_bytes(prefixe((source / 'F1.csv').read_bytes(), 100))
+    assert snapshot.main(['check', '--output', chemin]) == 1
+    assert 'périmé pour : F1' in capsys.readouterr().out
+
+def test_format_incompatible(tmp_path):
+    chemin = str(tmp_path / 'autre.npy')
+    np.save(chemin, np.zeros(3))
+    with pytest.raises(ValueError, match='incompatible'):
+        snapshot.charger_snapshot(chemin)
@@ -0,0 +1,64 @@
+"""Workers gunicorn : un /refresh reçu par un autre worker atteint ce worker par le cache disque partagé"""
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app
+from cache_donnees import CacheCSV, RecuperateurDossier
+from conftest import prefixe
+from modele import empreinte_donnees, url_donnees
+
+@pytest.fixture
+def source(tmp_path, monkeypatch, contenu_csv):
+    """Source commune aux workers, ici un dossier local ; E0 commence avec ses 200 premiers matchs"""
+    (tmp_path / 'E0.csv').write_bytes(prefixe(contenu_csv, 200))
+    monkeypatch.setattr(app.CACHE_DONNEES, 'recuperateur', RecuperateurDossier(str(tmp_path)))
+    monkeypatch.setattr(app, 'INTERVALLE_SYNCHRONISATION', 0.001)
+    monkeypatch.setattr(app, 'DERNIERES_SYNCHRONISATIONS', {})
+    yield tmp_path
+    # Le worker repart de la saison complète de tests/donnees pour les autres tests
+    monkeypatch.undo()
+    app.charger_modele_championnat('E0', force_reload=True)
+
+def attendre_version(championnat, version, delai=10):
+    limite = time.monotonic() + delai
+    while time.monotonic() < limite:
+        if app.MODELES_CHAMPIONNAT[championnat]['version'] > version:
+            return app.MODELES_CHAMPIONNAT[championnat]
+        time.sleep(0.01)
+    raise AssertionError(f"{championnat} n'a pas été republié")
+
+def test_rafraichissement_d_un_autre_worker(source, contenu_csv):
+    modele = app.charger_modele_championnat('E0', force_reload=True)
+    assert modele['empreinte'] != empreinte_donnees(contenu_csv)
+
+    # Rien de nouveau sur le disque : le modèle publié reste servi
+    time.sleep(0.01)
+    assert app.charger_modele_championnat('E0') is modele
+    assert app.MODELES_CHAMPIONNAT['E0'] is modele
+
+    # Un autre worker (autre processus, même FOOT_CACHE_DIR) reçoit /refresh après la mise à jour de la source
+    (source / 'E0.csv').write_bytes(contenu_csv)
+    autre_worker = CacheCSV(app.CACHE_DONNEES.dossier, RecuperateurDossier(str(source)))
+    assert autre_worker.lire(url_donnees('E0')) == contenu_csv
+
+    # Ce worker sert encore sa version pendant le rafraîchissement lancé en arrière-plan, puis la nouvelle
+    time.sleep(0.01)
+    assert app.charger_modele_championnat('E0') is modele
+    nouveau = attendre_version('E0', modele['version'])
+    assert nouveau['empreinte'] == empreinte_donnees(contenu_csv)
+
+def test_copie_disque_plus_ancienne_ignoree(source, monkeypatch):
+    modele = app.charger_modele_championnat('E0', force_reload=True)
+    # Modèle publié après la copie disque (snapshot lu au démarrage) : pas de rechargement
+    plus_tard = datetime.now(timezone.utc) + timedelta(minutes=1)
+    monkeypatch.setitem(app.MODELES_CHAMPIONNAT._versions, 'E0', {
+        **modele, 'empreinte': 'snapshot', 'publie_le': plus_tard.isoformat(timespec='seconds')
+    })
+    soumissions = []
+    monkeypatch.setattr(app.CHARGEUR_ASYNC, 'soumettre', lambda *args, **kwargs: soumissions.append(args))
+
+    time.sleep(0.01)
+    app.charger_modele_championnat('E0')
+    assert soumissions == []
@@ -0,0 +1,21 @@
+"""Recherche des paramètres : mêmes scores que le backtest, même échauffement par défaut"""
+import pytest
+
+import modele
+import tuning
+from backtest import backtester, tableaux_matchs
+
+def test_evaluer_egal_backtest(contenu_csv, monkeypatch):
+    df = modele.preparer_donnees(contenu_csv)
+    t = tableaux_matchs(df)
+    monkeypatch.setitem(tuning._TABLEAUX, 'E0', {
+        'n_equipes': len(t['equipes']), **{nom: t[nom] for nom in tuning.CHAMPS_MATCHS}
+    })
+
+    _, _, _, notes = tuning.evaluer('E0', 10, 3.5, [1.0, 1.2])
+
+    for avantage, note in notes:
+        attendu = backtester(df, 10, 3.5, avantage)[1]
+        assert note['n_matchs'] == attendu['n_matchs'] < len(df)
+        for metrique in tuning.METRIQUES:
+            assert note[metrique] == pytest.approx(attendu[metrique], rel=1e-9)
@@ -0,0 +1,212 @@
+"""
+Recherche des paramètres du modèle (span EWMA, plafond de buts, avantage domicile) par championnat.
+
+Chaque combinaison est évaluée par backtest walk-forward (backtest.rejouer, moteur exact).
+Les tableaux de matchs sont chargés une fois dans un bloc de mémoire partagée que les processus
+du pool lisent sans copie ; une tâche rejoue la saison pour un couple (span, plafond) puis note
+toutes les valeurs d'avantage domicile, qui ne font que multiplier les buts attendus à domicile.
+Les meilleurs paramètres sont écrits dans le fichier de configuration lu par parametres_championnat.
+
+Usage :
+    python tuning.py [--leagues F1 E0] [--spans 5 10 15] [--caps 3 3.5 4] [--home-advantages 1 1.1 1.2]
+                     [--random 200] [--metric rps] [--warmup 5] [--workers 4] [--dry-run]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import shared_memory
+import numpy as np
+
+from backtest import ECHAUFFEMENT_DEFAUT, matchs_notes, tableaux_matchs, rejouer, scores
+from cache_donnees import ecrire_atomique
+from modele import CHAMPIONNATS, CHEMIN_CONFIG, PARAMETRES_DEFAUT, charger_donnees, simuler_1n2
+
+METRIQUES = ('rps', 'log_loss', 'brier')
+CHAMPS_MATCHS = ('dom', 'ext', 'buts_dom', 'buts_ext')
+
+# Tableaux de matchs du processus courant, vues sur la mémoire partagée : {championnat: {champ: ndarray}}
+_TABLEAUX = {}
+_MEMOIRE = None
+
+def partager_tableaux(tableaux):
+    """
+    Copie les tableaux {championnat: {champ: ndarray}} dans un seul bloc de mémoire partagée.
+    Renvoie (bloc, disposition) ; la disposition (décalages, types, formes) suffit à s'y rattacher.
+    """
+    disposition = {}
+    taille = 0
+    for championnat, champs in tableaux.items():
+        disposition[championnat] = {'n_equipes': champs['n_equipes']}
+        for nom in CHAMPS_MATCHS:
+            tableau = np.ascontiguousarray(champs[nom])
+            taille = -(-taille // 8) * 8
+            disposition[championnat][nom] = (taille, tableau.dtype.str, tableau.shape)
+            taille += tableau.nbytes
+
+    bloc = shared_memory.SharedMemory(create=True, size=max(taille, 1))
+    for championnat, champs in tableaux.items():
+        for nom in CHAMPS_MATCHS:
+            decalage, type_, forme = disposition[championnat][nom]
+            np.ndarray(forme, dtype=type_, buffer=bloc.buf, offset=decalage)[...] = champs[nom]
+    return bloc, disposition
+
+def _vues(bloc, disposition):
+    vues = {}
+    for championnat, champs in disposition.items():
+        vues[championnat] = {'n_equipes': champs['n_equipes']}
+        for nom in CHAMPS_MATCHS:
+            decalage, type_, forme = champs[nom]
+            vue = np.ndarray(forme, dtype=type_, buffer=bloc.buf, offset=decalage)
+            vue.flags.writeable = False
+            vues[championnat][nom] = vue
+    return vues
+
+def _attacher(nom, disposition):
+    """Initialiseur des processus du pool : vues en lecture seule sur le bloc partagé, sans copie"""
+    global _MEMOIRE, _TABLEAUX
+    try:
+        _MEMOIRE = shared_memory.SharedMemory(name=nom, track=False)
+    except TypeError:
+        # Python < 3.13 : le suivi est partagé avec le parent (même resource_tracker), qui libère le bloc
+        _MEMOIRE = shared_memory.SharedMemory(name=nom)
+    _TABLEAUX = _vues(_MEMOIRE, disposition)
+
+def evaluer(championnat, span, plafond, avantages, echauffement=ECHAUFFEMENT_DEFAUT):
+    """Scores walk-forward de (span, plafond) pour chaque avantage domicile : [(avantage, scores)]"""
+    t = _TABLEAUX[championnat]
+    buts_dom, buts_ext = rejouer(t['dom'], t['ext'], t['buts_dom'], t['buts_ext'], t['n_equipes'], span, plafond)
+    predit = np.isfinite(buts_dom) & np.isfinite(buts_ext) & matchs_notes(t['dom'], t['ext'], echauffement)
+
+    resultats = []
+    for avantage in avantages:
+        probabilites = np.full((len(buts_dom), 3), np.nan)
+        if predit.any():
+            prob_1, prob_N, prob_2, _ = simuler_1n2(buts_dom[predit] * avantage, buts_ext[predit], engine='exact')
+            probabilites[predit] = np.column_stack([prob_1, prob_N, prob_2]) / 100
+        resultats.append((avantage, scores(probabilites, t['buts_dom'], t['buts_ext'])))
+    return championnat, span, plafond, resultats
+
+def grille(spans, plafonds, avantages):
+    """Combinaisons (span, plafond, avantages) : toutes les valeurs d'avantage pour chaque couple"""
+    return [(int(span), float(plafond), [float(a) for a in avantages]) for span, plafond in product(spans, plafonds)]
+
+def tirage_aleatoire(n, spans, plafonds, avantages, graine=None):
+    """n combinaisons tirées uniformément entre les bornes (min, max) de chaque paramètre"""
+    generateur = np.random.default_rng(graine)
+    tirages = zip(
+        generateur.integers(min(spans), max(spans) + 1, n),
+        generateur.uniform(min(plafonds), max(plafonds), n),
+        generateur.uniform(min(avantages), max(avantages), n)
+    )
+    return [(int(span), round(float(plafond), 3), [round(float(avantage), 3)]) for span, plafond, avantage in tirages]
+
+def rechercher(tableaux, combinaisons, metrique='rps', echauffement=ECHAUFFEMENT_DEFAUT, processus=None):
+    """
+    Évalue les combinaisons sur chaque championnat dans un pool de processus.
+    Renvoie {championnat: [{'span', 'plafond', 'avantage_domicile', 'scores'}]} trié du meilleur au pire.
+    """
+    if metrique not in METRIQUES:
+        raise ValueError("Métrique invalide")
+
+    bloc, disposition = partager_tableaux(tableaux)
+    resultats = {championnat: [] for championnat in tableaux}
+    try:
+        with ProcessPoolExecutor(max_workers=processus, initializer=_attacher,
+                                 initargs=(bloc.name, disposition)) as pool:
+            taches = [
+                pool.submit(evaluer, championnat, span, plafond, avantages, echauffement)
+                for championnat in tableaux
+                for span, plafond, avantages in combinaisons
+            ]
+            for tache in taches:
+                championnat, span, plafond, notes = tache.result()
+                for avantage, note in notes:
+                    resultats[championnat].append(
+                        {'span': span, 'plafond': plafond, 'avantage_domicile': avantage, 'scores': note}
+                    )
+    finally:
+        bloc.close()
+        bloc.unlink()
+
+    for essais in resultats.values():
+        essais.sort(key=lambda essai: np.nan_to_num(essai['scores'][metrique], nan=np.inf))
+    return resultats
+
+def ecrire_config(meilleurs, chemin=None):
+    """Fusionne {championnat: paramètres} dans le fichier de configuration (écriture atomique)"""
+    chemin = chemin or CHEMIN_CONFIG
+    config = {}
+    if os.path.exists(chemin):
+        with open(chemin, encoding='utf-8') as f:
+            config = json.load(f)
+    # Fusion par championnat : les clés non réglées ici (type_modele) sont conservées ;
+    # avantage_domicile, réglé sur l'EWMA, est ignoré par Dixon-Coles (modele.completer_parametres)
+    for championnat, parametres in meilleurs.items():
+        config[championnat] = {**config.get(championnat, {}), **parametres}
+
+    ecrire_atomique(chemin, json.dumps(config, indent=2, ensure_ascii=False).encode('utf-8'))
+    return config
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recherche des paramètres du modèle par backtest walk-forward")
+    parser.add_argument('--leagues', nargs='+', choices=list(CHAMPIONNATS), help="Championnats (défaut : tous)")
+    parser.add_argument('--spans', nargs='+', type=int, default=list(range(4, 24, 2)))
+    parser.add_argument('--caps', nargs='+', type=float, default=[2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 6.0, 7.0, 8.0, 10.0])
+    parser.add_argument('--home-advantages', nargs='+', type=float,
+                        default=[0.9, 0.95, 1.0, 1.05, 1.1, 1.15, 1.2, 1.25, 1.3, 1.35])
+    parser.add_argument('--random', type=int, help="Recherche aléatoire : nombre de tirages entre les bornes des listes")
+    parser.add_argument('--seed', type=int, help="Graine de la recherche aléatoire")
+    parser.add_argument('--metric', choices=METRIQUES, default='rps')
+    parser.add_argument('--warmup', type=int, default=ECHAUFFEMENT_DEFAUT,
+                        help="Matchs déjà joués par chaque équipe dans son rôle avant qu'un match soit noté")
+    parser.add_argument('--workers', type=int, help="Processus du pool (défaut : nombre de CPU)")
+    parser.add_argument('--output', default=CHEMIN_CONFIG, help="Fichier de configuration des modèles")
+    parser.add_argument('--dry-run', action='store_true', help="Affiche les résultats sans écrire la configuration")
+    args = parser.parse_args(argv)
+
+    tableaux = {}
+    for championnat in args.leagues or CHAMPIONNATS:
+        t = tableaux_matchs(charger_donnees(championnat))
+        tableaux[championnat] = {'n_equipes': len(t['equipes']), **{nom: t[nom] for nom in CHAMPS_MATCHS}}
+
+    if args.random:
+        combinaisons = tirage_aleatoire(args.random, args.spans, args.caps, args.home_advantages, args.seed)
+    else:
+        combinaisons = grille(args.spans, args.caps, args.home_advantages)
+    # Référence : paramètres par défaut, toujours évalués
+    defaut = (PARAMETRES_DEFAUT['span'], PARAMETRES_DEFAUT['plafond'], [PARAMETRES_DEFAUT['avantage_domicile']])
+    n_essais = sum(len(avantages) for _, _, avantages in combinaisons)
+
+    debut = time.perf_counter()
+    resultats = rechercher(tableaux, combinaisons + [defaut], args.metric, args.warmup, args.workers)
+    print(f"⏱️ {n_essais} combinaisons x {len(tableaux)} championnats en {time.perf_counter() - debut:.1f}s")
+
+    meilleurs = {}
+    for championnat, essais in resultats.items():
+        meilleur = essais[0]
+        reference = next(
+            essai for essai in essais
+            if (essai['span'], essai['plafond'], essai['avantage_domicile']) == (defaut[0], defaut[1], defaut[2][0])
+        )
+        meilleurs[championnat] = {
+            'span': meilleur['span'],
+            'plafond': meilleur['plafond'],
+            'avantage_domicile': meilleur['avantage_domicile'],
+            args.metric: meilleur['scores'][args.metric],
+            'n_matchs': meilleur['scores']['n_matchs']
+        }
+        print(f"{CHAMPIONNATS[championnat]:<30} span {meilleur['span']:>3}  plafond {meilleur['plafond']:<5g} "
+              f"avantage {meilleur['avantage_domicile']:<5g} {args.metric} {meilleur['scores'][args.metric]:.4f} "
+              f"(défaut {reference['scores'][args.metric]:.4f})")
+
+    if not args.dry_run:
+        ecrire_config(meilleurs, args.output)
+        print(f"💾 Configuration écrite : {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,29 @@
+"""
+Point d'entrée de production (gunicorn, voir gunicorn.conf.py).
+
+Avec preload_app, ce module est importé une seule fois dans le processus maître : tous les
+championnats y sont téléchargés (ou lus dans le snapshot) et entraînés avant le fork, puis
+partagés par copie sur écriture entre les workers. /ready répond 200 dès le premier worker.
+
+Chaque worker a son propre registre : /refresh ne republie que dans le worker qui le reçoit. Les autres
+le suivent par le cache disque partagé (FOOT_CACHE_DIR, voir app.synchroniser_championnat) au plus
+FOOT_SYNCHRONISATION secondes plus tard, le temps d'un rafraîchissement en arrière-plan.
+"""
+import gc
+import os
+import time
+
+# Pas de thread de préchauffage : un thread ne survit pas au fork, le maître préchauffe lui-même
+os.environ['FOOT_PRECHAUFFAGE'] = '0'
+
+from app import app, PRET, prechauffer_championnats
+
+PRET.clear()
+debut = time.perf_counter()
+prechauffer_championnats()
+print(f"✅ Championnats prêts en {time.perf_counter() - debut:.2f}s, fork des workers")
+
+# Objets du maître figés hors du ramasse-miettes : leurs pages ne sont pas recopiées dans chaque worker
+gc.collect()
+gc.freeze()
+PRET.set()